@@ -8,7 +8,7 @@ from ewatercycle_model_testing.mocks import VarDoesntExistException
 
 #pylint:disable=import-error
 #pylint:disable=no-member
-from ewatercycle_model_testing.test import Test, TestType
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 
@@ -39,7 +39,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method initialize() works with a correct file.",
           critical=True,
-          enabled=False)
+          enabled=False,
+          fresh_instance=True)
     def initialize_wrong_config_condition(model, _):
         """
         Tests if the bmi method initialize() works with a correct file.
@@ -75,7 +76,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the model has all required methods.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_required_methods_condition(model, _):
         """
         Tests if the model has all required methods.
@@ -124,7 +126,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi method get_start_time() "
                       "gets the correct start time.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def correct_start_time_condition(model, _):
         """
         Tests if the bmi method get_start_time() gets the correct start time.
@@ -143,7 +146,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi method get_current_time()"
                       " gets the correct time at the start.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def correct_time_condition(model, _):
         """
         Tests if the bmi method get_current_time() gets the correct time at the start.
@@ -162,7 +166,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi method get_end_time()"
                       " gets the correct end time.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def correct_end_time_condition(model, _):
         """
         Tests if the bmi method get_end_time() gets the correct end time.
@@ -207,7 +212,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_grid_type() gets a valid type.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def invalid_grid_type_condition(model, _):
         """
         Tests if the bmi method get_grid_type() gets a valid type.
@@ -232,7 +238,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_grid_rank() gets a valid rank.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def invalid_grid_rank_condition(model, _):
         """
         Tests if the bmi method get_grid_rank() gets a valid rank.
@@ -264,7 +271,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi methods get_grid_type() "
                       "and get_grid_rank() give fitting responses.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def grid_type_mismatch_condition(model, _):
         """
         Tests if the bmi methods get_grid_type()
@@ -307,7 +315,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the method get_grid_shape() gets a valid grid shape.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def grid_shape_condition(model, _):
         """
         Tests if the method get_grid_shape() gets a valid grid shape.
@@ -331,7 +340,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_grid_size() gets a valid response.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def grid_size_condition(model, _):
         """
         Tests if the bmi method get_grid_size() gets a valid response.
@@ -356,7 +366,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_grid_x() gets a valid response.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def get_grid_x_condition(model, _):
         """
         Tests if the bmi method get_grid_x() gets a valid response.
@@ -383,7 +394,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_grid_y() gets a valid response.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def get_grid_y_condition(model, _):
         """
         Tests if the bmi method get_grid_y() gets a valid response.
@@ -411,7 +423,8 @@ class BmiSpecTests:
     @Test(description="Tests if bmi method get_output_var_names() "
                       "gets a list of strings.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def get_ouput_var_names_condition(model, _):
         """
         Tests if bmi method get_output_var_names() gets a list of strings.
@@ -435,7 +448,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi method get_time_step() "
                       "gets a correct time step.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def get_time_step_condition(model, _):
         """
         Tests if the bmi method get_time_step() gets a correct time step.
@@ -456,7 +470,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_time_units() works correctly.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_time_units(model, _):
         """
         Tests if the bmi method get_time_units() works correctly.
@@ -487,7 +502,8 @@ class BmiSpecTests:
     @Test(description="Tests if the bmi method get_value_at_indices()"
                       " gets a list of numbers.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_value_at_indices(model, _):
         """
         Tests if the bmi method get_value_at_indices() gets a list of numbers.
@@ -516,7 +532,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_value() gets a list of numbers.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_value(model, _):
         """
         Tests if the bmi method get_value() gets a list of numbers.
@@ -534,7 +551,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_var_grid() returns a number.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_var_grid(model, _):
         """
         Tests if the bmi method get_var_grid() returns a number.
@@ -552,7 +570,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_var_itemsize() returns a number.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_var_itemsize(model, _):
         """
         Tests if the bmi method get_var_itemsize() returns a number.
@@ -570,7 +589,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_var_nbytes() returns a number.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_var_nbytes(model, _):
         """
         Tests if the bmi method get_var_nbytes() returns a number.
@@ -588,7 +608,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method get_var_type() returns a string.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          access=ModelAccess.READ_ONLY)
     def test_get_var_type(model, _):
         """
         Tests if the bmi method get_var_type() returns a string.
@@ -641,7 +662,8 @@ class BmiSpecTests:
     @staticmethod
     @Test(description="Tests if the bmi method finalize() doesn't throw any errors.",
           critical=True,
-          enabled=True)
+          enabled=True,
+          fresh_instance=True)
     def finalize_model_condition(model, _):
         """
         Tests if the bmi method finalize() doesn't throw any errors.
@@ -7,3 +7,35 @@ VERSION: str = "0.0"
 SUITE_PASSED_ATTRIBUTE: str = "passed"
 SUITE_VERSION_ATTRIBUTE: str = "suite-version"
 FORBIDDEN_TEST_NAMES: list[str] = [SUITE_PASSED_ATTRIBUTE, SUITE_VERSION_ATTRIBUTE]
+FORCING_CACHE_DIR_ENV: str = "EWATERCYCLE_FORCING_CACHE"
+FORCING_CACHE_MAX_BYTES_ENV: str = "EWATERCYCLE_FORCING_CACHE_MAX_BYTES"
+FORCING_CACHE_DEFAULT_DIR: str = ".cache/ewatercycle_model_testing/forcings"
+FORCING_CACHE_STALE_LOCK_SECONDS: float = 6 * 60 * 60
+FORCING_CACHE_IN_USE_SECONDS: float = 24 * 60 * 60
+FORCING_CACHE_POLL_SECONDS: float = 0.5
+SCENARIO_SEED: int = 0
+SCENARIO_CHUNK_TIMESTEPS: int = 32
+SCENARIO_COMPRESSION_LEVEL: int | None = 4
+GRDC_DIR_ENV: str = "EWATERCYCLE_GRDC_DIR"
+GRDC_DEFAULT_DIR: str = "grdc-observations"
+GRDC_CACHE_DIR_ENV: str = "EWATERCYCLE_GRDC_CACHE"
+GRDC_CACHE_DEFAULT_DIR: str = ".cache/ewatercycle_model_testing/grdc"
+GRDC_MISSING_VALUE: float = -999.0
+STATION_CATALOG_ENV: str = "EWATERCYCLE_STATION_CATALOG"
+STATION_CATALOG_CELL_DEGREES: float = 1.0
+BOOTSTRAP_RESAMPLES: int = 1000
+BOOTSTRAP_BLOCK_TIMESTEPS: int = 30
+BOOTSTRAP_CONFIDENCE: float = 0.9
+BOOTSTRAP_SEED: int = 0
+MAX_WORKERS_DEFAULT: int = 4
+MAX_WORKERS_ENV: str = "EWATERCYCLE_MAX_WORKERS"
+METRIC_LOWER_BOUND_ENV: str = "EWATERCYCLE_METRIC_LOWER_BOUND"
+OUTPUT_RECORDER_MAX_BYTES_ENV: str = "EWATERCYCLE_OUTPUT_MAX_BYTES"
+SPIN_UP_CACHE_DIR_ENV: str = "EWATERCYCLE_SPIN_UP_CACHE"
+SPIN_UP_CACHE_DEFAULT_DIR: str = ".cache/ewatercycle_model_testing/spin_up"
+SPIN_UP_STEPS_ENV: str = "EWATERCYCLE_SPIN_UP_STEPS"
+SKIPPED_MESSAGE: str = "The test was skipped, as a critical test failed"
+TEST_TIMEOUT_ENV: str = "EWATERCYCLE_TEST_TIMEOUT"
+TIMEOUT_GRACE_SECONDS: float = 10.0
+TIMEOUT_MESSAGE: str = "The test did not finish within the timeout of {} seconds and was stopped"
+UNIT_ERROR_MESSAGE: str = "The test could not run, as its model failed: {}"
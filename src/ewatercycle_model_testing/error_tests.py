@@ -3,7 +3,7 @@ A module that includes a test bank for error testing.
 """
 import numpy as np
 
-from ewatercycle_model_testing.test import Test, TestType
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 
@@ -73,7 +73,7 @@ class ErrorTests:
     @staticmethod
     @Test(description="tests if the model can run from start to " +
           "end without throwing an error",
-          critical=True, enabled=True)
+          critical=True, enabled=True, access=ModelAccess.SHARED_TRAJECTORY)
     def model_runs_to_completion(model, discharge_name):
         """
         Test that looks if no errors are thrown when running model in
@@ -0,0 +1,85 @@
+"""
+Module for choosing how the test suite executes its tests.
+
+This module provides the executor policies that `TestSuite.run_all` accepts:
+    threads: tests run on a thread pool, suited for I/O-bound container models.
+    processes: tests run on a process pool, suited for pure-Python models that
+        would otherwise serialize on the GIL. Only the arguments needed to create a
+        model are sent to the workers, never live model instances.
+    serial: tests run one after the other in the calling thread, for debugging.
+"""
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from ewatercycle_model_testing import constants as c
+
+EXECUTOR_POLICIES: tuple[str, ...] = ("threads", "processes", "serial")
+
+
+class UnknownExecutorException(Exception):
+    """Raised when an executor policy is requested that does not exist."""
+    def __init__(self, policy: str) -> None:
+        super().__init__(f"Executor policy [{policy}] does not exist, choose one of: "
+                         + ", ".join(EXECUTOR_POLICIES))
+
+
+class SerialExecutor(Executor):
+    """An executor that runs every submitted call immediately in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Runs the call and returns a future that is already done.
+
+        Args:
+            fn: The callable to run.
+            *args: Positional arguments for the callable.
+            **kwargs: Keyword arguments for the callable.
+
+        Returns:
+            Future: A future holding the result or exception of the call.
+        """
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:  # pylint:disable=broad-exception-caught
+            future.set_exception(e)
+        return future
+
+
+def default_worker_count() -> int:
+    """Gets the number of workers to use when none is given.
+
+    Every worker may run a model in a container of its own, so the default is kept
+    small instead of one worker per CPU.
+
+    Returns:
+        int: The number in the c.MAX_WORKERS_ENV environment variable, or else
+            c.MAX_WORKERS_DEFAULT or the number of CPUs, whichever is smaller.
+    """
+    if os.environ.get(c.MAX_WORKERS_ENV):
+        return max(int(os.environ[c.MAX_WORKERS_ENV]), 1)
+    return min(c.MAX_WORKERS_DEFAULT, os.cpu_count() or 1)
+
+
+def make_executor(policy: str = "threads", max_workers: int | None = None) -> Executor:
+    """Creates the executor for an executor policy.
+
+    Args:
+        policy (str, optional): One of EXECUTOR_POLICIES. Defaults to "threads".
+        max_workers (int | None, optional): The number of workers of the pool,
+            ignored for serial execution. Defaults to `default_worker_count`.
+
+    Returns:
+        Executor: The executor, to be used as a context manager.
+
+    Raises:
+        UnknownExecutorException: If the policy does not exist.
+    """
+    if max_workers is None:
+        max_workers = default_worker_count()
+    if policy == "threads":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if policy == "processes":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    if policy == "serial":
+        return SerialExecutor()
+    raise UnknownExecutorException(policy)
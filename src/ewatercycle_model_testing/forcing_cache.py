@@ -0,0 +1,285 @@
+"""
+Module for caching generated forcings on disk.
+
+Generating a forcing runs an ESMValTool recipe, which takes minutes even for a year of
+data. This module provides a `ForcingCache` class that stores every generated forcing
+in a directory named after a hash of everything that determines its content: the
+forcing class, the dataset, the time range and the contents of the shape file. When
+the same forcing is requested again, the stored forcing is loaded instead.
+
+Entries are generated into a temporary directory and renamed into place when complete,
+and every entry is guarded by a lock file, so the cache can be shared by several
+processes. Entries that were used least recently are evicted when the cache grows
+beyond its configured size. A forcing is used by models, and by the scenarios that are
+written into its directory, long after it was loaded, so entries that were used within
+the last `in_use_seconds` are never evicted.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from ewatercycle_model_testing import constants as c
+
+# Name of the file inside an entry that points to the forcing directory within it.
+FORCING_POINTER: str = ".forcing_directory"
+
+
+class ForcingCacheLockTimeoutException(Exception):
+    """Raised when a cache entry stays locked for longer than allowed."""
+    def __init__(self, path: Path) -> None:
+        super().__init__(f"Timed out waiting for forcing cache lock [{path}].")
+
+
+class FileLock:
+    """A lock file that is exclusive across threads and processes.
+
+    The lock is taken by atomically creating the lock file. A lock file older than
+    `stale_after` seconds is assumed to be left behind by a crashed process and is
+    broken.
+
+    Args:
+        path (Path): The path of the lock file.
+        timeout (float | None, optional): Seconds to wait for the lock, None to wait
+            forever. Defaults to None.
+        stale_after (float, optional): Age in seconds after which a lock is broken.
+            Defaults to c.FORCING_CACHE_STALE_LOCK_SECONDS.
+    """
+
+    def __init__(self, path: Path, timeout: float | None = None,
+                 stale_after: float = c.FORCING_CACHE_STALE_LOCK_SECONDS):
+        """Initializes the FileLock instance."""
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Takes the lock.
+
+        Args:
+            blocking (bool, optional): Whether to wait for the lock. Defaults to True.
+
+        Returns:
+            bool: Whether the lock was taken.
+
+        Raises:
+            ForcingCacheLockTimeoutException: If the lock was not taken in time.
+        """
+        start = time.monotonic()
+        while True:
+            try:
+                handle = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(handle, str(os.getpid()).encode())
+                os.close(handle)
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+            if not blocking:
+                return False
+            if self.timeout is not None and time.monotonic() - start > self.timeout:
+                raise ForcingCacheLockTimeoutException(self.path)
+            time.sleep(c.FORCING_CACHE_POLL_SECONDS)
+
+    def release(self) -> None:
+        """Releases the lock."""
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class ForcingCache:
+    """A content-addressed, size-bounded on-disk cache of generated forcings.
+
+    Args:
+        root (Path | str | None, optional): Directory of the cache. Defaults to the
+            directory in the c.FORCING_CACHE_DIR_ENV environment variable, or
+            c.FORCING_CACHE_DEFAULT_DIR in the home directory.
+        max_bytes (int | None, optional): Size the cache is evicted down to, None for
+            no limit. Defaults to the c.FORCING_CACHE_MAX_BYTES_ENV environment
+            variable, or no limit.
+        in_use_seconds (float, optional): Seconds after its last use in which an
+            entry counts as in use and is not evicted. Defaults to
+            c.FORCING_CACHE_IN_USE_SECONDS.
+    """
+
+    def __init__(self, root: Path | str | None = None, max_bytes: int | None = None,
+                 in_use_seconds: float = c.FORCING_CACHE_IN_USE_SECONDS):
+        """Initializes the ForcingCache instance."""
+        if root is None:
+            root = os.environ.get(c.FORCING_CACHE_DIR_ENV,
+                                  Path.home() / c.FORCING_CACHE_DEFAULT_DIR)
+        if max_bytes is None and os.environ.get(c.FORCING_CACHE_MAX_BYTES_ENV):
+            max_bytes = int(os.environ[c.FORCING_CACHE_MAX_BYTES_ENV])
+        self.root = Path(root).absolute()
+        self.max_bytes = max_bytes
+        self.in_use_seconds = in_use_seconds
+
+    @staticmethod
+    def key(forcing_class, dataset, start_time: str, end_time: str, shape) -> str:
+        """Computes the cache key of a forcing.
+
+        Args:
+            forcing_class: The forcing class, e.g. GenericLumpedForcing.
+            dataset: The dataset name or dict passed to generate.
+            start_time (str): The start time of the forcing.
+            end_time (str): The end time of the forcing.
+            shape: Path to the shape file. The contents of the shape file and its
+                sidecar files (.shx, .dbf, ...) are part of the key.
+
+        Returns:
+            str: A hex digest that identifies the forcing.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{forcing_class.__module__}.{forcing_class.__qualname__}".encode())
+        digest.update(json.dumps(dataset, sort_keys=True, default=str).encode())
+        digest.update(f"{start_time}/{end_time}".encode())
+        shape = Path(shape)
+        for part in sorted(shape.parent.glob(shape.stem + ".*")):
+            digest.update(part.suffix.encode())
+            digest.update(part.read_bytes())
+        return digest.hexdigest()
+
+    def generate(self, forcing_class, dataset, start_time: str, end_time: str, shape):
+        """Gets a forcing from the cache, generating and storing it on a miss.
+
+        Args:
+            forcing_class: The forcing class, e.g. GenericLumpedForcing.
+            dataset: The dataset name or dict passed to generate.
+            start_time (str): The start time of the forcing.
+            end_time (str): The end time of the forcing.
+            shape: Path to the shape file.
+
+        Returns:
+            The forcing, loaded from its directory inside the cache.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        key = self.key(forcing_class, dataset, start_time, end_time, shape)
+        entry = self.root / key
+        with FileLock(self.root / (key + ".lock")):
+            if not (entry / FORCING_POINTER).exists():
+                self._store(entry, forcing_class.generate(
+                    dataset=dataset,
+                    start_time=start_time,
+                    end_time=end_time,
+                    shape=Path(shape).absolute(),
+                    directory=str(self._staging(key)),
+                ))
+            forcing_dir = entry / (entry / FORCING_POINTER).read_text().strip()
+            forcing = forcing_class.load(forcing_dir)
+            os.utime(entry / FORCING_POINTER)
+        self.evict(keep=key)
+        return forcing
+
+    def _staging(self, key: str) -> Path:
+        """Gets a fresh temporary directory to generate an entry in."""
+        staging = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        return staging
+
+    def _store(self, entry: Path, forcing) -> None:
+        """Moves a freshly generated forcing into place as a complete entry."""
+        staging = self._staging_root(Path(forcing.directory))
+        (staging / FORCING_POINTER).write_text(
+            str(Path(forcing.directory).relative_to(staging)))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+
+    def _staging_root(self, directory: Path) -> Path:
+        """Gets the staging directory that contains a generated forcing directory."""
+        for parent in (directory, *directory.parents):
+            if parent.parent == self.root:
+                return parent
+        raise ValueError(f"Forcing directory [{directory}] is not inside the cache.")
+
+    def entries(self) -> list[Path]:
+        """Gets all complete entries, least recently used first.
+
+        Returns:
+            list[Path]: The entry directories.
+        """
+        entries = [entry for entry in self.root.glob("[!.]*")
+                   if (entry / FORCING_POINTER).exists()]
+        return sorted(entries, key=lambda entry: (entry / FORCING_POINTER).stat().st_mtime)
+
+    @staticmethod
+    def size(entry: Path) -> int:
+        """Gets the size of an entry.
+
+        Args:
+            entry (Path): The entry directory.
+
+        Returns:
+            int: The total size of the files in the entry in bytes.
+        """
+        return sum(path.stat().st_size for path in entry.rglob("*") if path.is_file())
+
+    def in_use(self, entry: Path) -> bool:
+        """Checks if an entry was used recently enough that a model may still run on it.
+
+        Args:
+            entry (Path): The entry directory.
+
+        Returns:
+            bool: Whether the entry was loaded within the last in_use_seconds.
+        """
+        try:
+            last_use = (entry / FORCING_POINTER).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - last_use < self.in_use_seconds
+
+    def evict(self, keep: str | None = None) -> None:
+        """Removes least recently used entries until the cache fits in max_bytes.
+
+        Entries that are in use, see `in_use`, or locked by another thread or process
+        are left alone.
+
+        Args:
+            keep (str | None, optional): Key of an entry that must not be evicted.
+        """
+        if self.max_bytes is None:
+            return
+        entries = self.entries()
+        total = sum(self.size(entry) for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                return
+            if entry.name == keep or self.in_use(entry):
+                continue
+            lock = FileLock(self.root / (entry.name + ".lock"))
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                size = self.size(entry)
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+            finally:
+                lock.release()
+
+
+_default_cache: ForcingCache | None = None
+
+
+def get_forcing_cache() -> ForcingCache:
+    """Gets the forcing cache shared by the whole package.
+
+    Returns:
+        ForcingCache: The shared cache, configured through environment variables.
+    """
+    global _default_cache  # pylint:disable=global-statement
+    if _default_cache is None:
+        _default_cache = ForcingCache()
+    return _default_cache
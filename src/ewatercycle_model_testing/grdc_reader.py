@@ -0,0 +1,201 @@
+"""
+Module for reading GRDC discharge observations from local station files.
+
+The metric tests compare the discharge of a model with the observations of GRDC
+stations, which are shipped with the repository as `<station>_Q_Day.Cmd.txt` files.
+This module parses those files without a network connection. Dates without a time
+of day (`--:--`) are taken at midnight and values of -999 are missing.
+
+A parsed file is stored as a columnar `.npz` file in a cache directory, named after
+the path, size and modification time of the text file. Later loads of an unchanged
+file read the arrays from the cache instead of parsing the text again.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ewatercycle_model_testing import constants as c
+
+# Header of the table of a GRDC station file, the data lines follow it.
+TABLE_HEADER: str = "YYYY-MM-DD;hh:mm"
+# A "# Key: value" field of the header of a GRDC station file.
+HEADER_FIELD = re.compile(r"^# (\S[^:\n]*):(.*)$", re.MULTILINE)
+
+
+class GrdcStationNotFoundException(Exception):
+    """Raised when there is no observation file for a GRDC station."""
+    def __init__(self, station_id: str, directory: Path) -> None:
+        super().__init__(f"No GRDC file for station [{station_id}] in [{directory}].")
+
+
+@dataclass(frozen=True)
+class GrdcSeries:
+    """
+    The observations of a GRDC station.
+
+    Attributes:
+        times (np.ndarray): The time of every observation, as datetime64[ns].
+        values (np.ndarray): The observed discharge, NaN where it is missing.
+        metadata (dict): The header fields of the station file, e.g. "GRDC-No.".
+    """
+    times: np.ndarray
+    values: np.ndarray
+    metadata: dict = field(default_factory=dict)
+
+    def to_dataframe(self, start_time=None, end_time=None,
+                     column: str = "GRDC") -> pd.DataFrame:
+        """Converts the observations between two times into a DataFrame.
+
+        Args:
+            start_time (optional): The first time to include, e.g.
+                "1991-01-01T00:00:00Z". Defaults to the first observation.
+            end_time (optional): The last time to include. Defaults to the last
+                observation.
+            column (str, optional): The name of the column. Defaults to "GRDC".
+
+        Returns:
+            pd.DataFrame: The observations in a column, with a "time" index.
+        """
+        start = 0 if start_time is None else np.searchsorted(
+            self.times, to_datetime64(start_time), side="left")
+        stop = len(self.times) if end_time is None else np.searchsorted(
+            self.times, to_datetime64(end_time), side="right")
+        index = pd.DatetimeIndex(self.times[start:stop], name="time")
+        return pd.DataFrame({column: self.values[start:stop]}, index=index)
+
+
+def to_datetime64(time) -> np.datetime64:
+    """Converts a time to a timezone-naive UTC datetime64[ns].
+
+    Args:
+        time: The time, e.g. an ISO string with a Z suffix as used by forcings.
+
+    Returns:
+        np.datetime64: The time.
+    """
+    timestamp = pd.Timestamp(time)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.to_datetime64().astype("datetime64[ns]")
+
+
+def parse_grdc_file(path: Path | str) -> GrdcSeries:
+    """Parses a GRDC station file.
+
+    Args:
+        path (Path | str): The path of the `.Cmd.txt` file.
+
+    Returns:
+        GrdcSeries: The observations of the station.
+    """
+    text = Path(path).read_bytes().decode("latin-1")
+    (header, _, table) = text.partition(TABLE_HEADER)
+    metadata = {match[1].strip(): match[2].strip()
+                for match in HEADER_FIELD.finditer(header) if match[2].strip()}
+    table = table.partition("\n")[2]
+    data = pd.read_csv(io.StringIO(table), sep=";", header=None,
+                       names=["date", "time", "value"], dtype={"time": str},
+                       skipinitialspace=True)
+    times = pd.to_datetime(data["date"], format="%Y-%m-%d").to_numpy("datetime64[ns]")
+    time_of_day = data["time"].str.strip().where(lambda time: time != "--:--", "00:00")
+    times = times + pd.to_timedelta(time_of_day + ":00").to_numpy("timedelta64[ns]")
+    values = data["value"].to_numpy(dtype=float, copy=True)
+    values[values == c.GRDC_MISSING_VALUE] = np.nan
+    order = np.argsort(times, kind="stable")
+    return GrdcSeries(times[order], values[order], metadata)
+
+
+def _cache_root() -> Path:
+    """Gets the directory parsed station files are cached in."""
+    return Path(os.environ.get(c.GRDC_CACHE_DIR_ENV,
+                               Path.home() / c.GRDC_CACHE_DEFAULT_DIR)).absolute()
+
+
+def load_grdc_file(path: Path | str, cache_dir: Path | str | None = None) -> GrdcSeries:
+    """Loads a GRDC station file, from the cache when it did not change since.
+
+    Args:
+        path (Path | str): The path of the `.Cmd.txt` file.
+        cache_dir (Path | str | None, optional): The cache directory. Defaults to the
+            directory in the c.GRDC_CACHE_DIR_ENV environment variable, or
+            c.GRDC_CACHE_DEFAULT_DIR in the home directory.
+
+    Returns:
+        GrdcSeries: The observations of the station.
+    """
+    path = Path(path).absolute()
+    stat = path.stat()
+    digest = hashlib.sha256(f"{path}/{stat.st_size}/{stat.st_mtime_ns}".encode())
+    cache_dir = _cache_root() if cache_dir is None else Path(cache_dir)
+    cached = cache_dir / f"{path.name.split('.')[0]}_{digest.hexdigest()[:16]}.npz"
+    try:
+        with np.load(cached) as arrays:
+            return GrdcSeries(arrays["times"].view("datetime64[ns]"), arrays["values"],
+                              json.loads(str(arrays["metadata"])))
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    series = parse_grdc_file(path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = cache_dir / f".{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(staging, "wb") as file:
+            np.savez(file, times=series.times.view(np.int64), values=series.values,
+                     metadata=np.array(json.dumps(series.metadata)))
+        os.replace(staging, cached)
+    finally:
+        staging.unlink(missing_ok=True)
+    return series
+
+
+def find_grdc_file(station_id: str, directory: Path | str | None = None) -> Path:
+    """Finds the daily discharge file of a GRDC station.
+
+    Args:
+        station_id (str): The GRDC number of the station, e.g. "6335020".
+        directory (Path | str | None, optional): The directory of the station files.
+            Defaults to the directory in the c.GRDC_DIR_ENV environment variable,
+            or c.GRDC_DEFAULT_DIR.
+
+    Returns:
+        Path: The path of the station file.
+
+    Raises:
+        GrdcStationNotFoundException: If the directory has no file for the station.
+    """
+    if directory is None:
+        directory = os.environ.get(c.GRDC_DIR_ENV, c.GRDC_DEFAULT_DIR)
+    path = Path(directory) / f"{station_id}_Q_Day.Cmd.txt"
+    if not path.exists():
+        raise GrdcStationNotFoundException(station_id, Path(directory))
+    return path
+
+
+def get_grdc_data(station_id: str, start_time, end_time, column: str = "GRDC",
+                  directory: Path | str | None = None) -> tuple[pd.DataFrame, dict]:
+    """Gets the observations of a GRDC station from its local file.
+
+    This is an offline replacement of `ewatercycle.observation.grdc.get_grdc_data`
+    with the same return values.
+
+    Args:
+        station_id (str): The GRDC number of the station, e.g. "6335020".
+        start_time: The first time to include, e.g. "1991-01-01T00:00:00Z".
+        end_time: The last time to include.
+        column (str, optional): The name of the column. Defaults to "GRDC".
+        directory (Path | str | None, optional): The directory of the station files,
+            see `find_grdc_file`.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: The observations with a "time" index, and the
+            header fields of the station file.
+    """
+    series = load_grdc_file(find_grdc_file(station_id, directory))
+    return series.to_dataframe(start_time, end_time, column), dict(series.metadata)
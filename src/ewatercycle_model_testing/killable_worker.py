@@ -0,0 +1,162 @@
+"""
+Module for running a call in a worker process that can be stopped at a deadline.
+
+A thread cannot be stopped from the outside, so a model that hangs in `update()` or a
+grpc4bmi container that never answers would block a thread of the test suite forever.
+A `KillableWorker` runs a call in a process of its own, which can send messages back
+to the caller while it runs, e.g. whenever a test finishes. When the call has not sent
+a message or returned within its timeout, the worker is asked to stop with SIGTERM,
+which raises `WorkerStoppedException` in it, so the usual cleanup finalizes its models
+and removes its cfg directories. A worker that has not stopped after a grace period is
+killed.
+
+Workers are started with START_METHOD, "spawn" by default. A forked worker would copy
+the locks held by the other threads of the suite, e.g. those of the executor or of
+dask, which then stay locked in the worker forever. A spawned worker imports the
+module of its call instead, so the call and its args must be picklable, and the tests
+it runs must be registered when their module is imported, as the test banks of the
+package are. "fork" is only safe when the caller runs no other threads.
+"""
+import multiprocessing
+import signal
+import time
+from typing import Any, Callable
+
+from ewatercycle_model_testing import constants as c
+
+# The start method of the worker processes, see the module docstring.
+START_METHOD: str = "spawn"
+
+
+class WorkerStoppedException(BaseException):
+    """Raised in a worker when it is stopped because its deadline passed.
+
+    Like KeyboardInterrupt, it is not an Exception, so handlers that catch the
+    exceptions of a test let it through and the worker stops.
+    """
+    def __init__(self) -> None:
+        super().__init__("The worker was stopped because its deadline passed.")
+
+
+class WorkerExitedException(Exception):
+    """Raised when a worker exits without returning from its call."""
+    def __init__(self, exitcode: int | None) -> None:
+        super().__init__(f"The worker exited with code [{exitcode}] before it returned.")
+
+
+_stopped = False
+
+
+def _stop(*_) -> None:
+    """Handles SIGTERM in a worker."""
+    global _stopped  # pylint:disable=global-statement
+    _stopped = True
+    raise WorkerStoppedException()
+
+
+def _send(sender, message) -> None:
+    """Sends a message of the call, or stops a call that swallowed its stop, so it
+    cannot go on with work the caller has already given to another worker."""
+    if _stopped:
+        raise WorkerStoppedException()
+    sender.send(("message", message))
+
+
+def _work(sender, target: Callable, args: tuple) -> None:
+    """Runs the call of a KillableWorker in the worker and sends back its outcome."""
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        value = target(*args, send=lambda message: _send(sender, message))
+    except WorkerStoppedException:
+        # The caller has stopped listening.
+        pass
+    except Exception as e:  # pylint:disable=broad-exception-caught
+        sender.send(("error", e))
+    else:
+        sender.send(("done", value))
+    finally:
+        sender.close()
+
+
+class KillableWorker:
+    """A call that runs in a worker process and is stopped at a deadline.
+
+    Args:
+        target (Callable): The call, which gets the args and a `send` keyword argument
+            that sends a picklable message to the caller.
+        *args: Positional arguments for the call.
+        grace (float, optional): Seconds a worker gets to clean up after SIGTERM,
+            before it is killed. Defaults to c.TIMEOUT_GRACE_SECONDS.
+        start_method (str | None, optional): The multiprocessing start method of the
+            worker. Defaults to START_METHOD.
+    """
+
+    def __init__(self, target: Callable, *args, grace: float = c.TIMEOUT_GRACE_SECONDS,
+                 start_method: str | None = None):
+        """Initializes the KillableWorker instance."""
+        self._context = multiprocessing.get_context(start_method or START_METHOD)
+        self.target = target
+        self.args = args
+        self.grace = grace
+        self.process = None
+
+    @property
+    def pid(self) -> int | None:
+        """The process id of the worker, None before it is started."""
+        return None if self.process is None else self.process.pid
+
+    def run(self, timeout: float, on_message: Callable[[Any], None]) -> tuple[bool, Any]:
+        """Runs the call in a worker and waits for it until the deadline.
+
+        Args:
+            timeout (float): Seconds the call may take until it sends its next
+                message or returns.
+            on_message (Callable[[Any], None]): Called in the caller with every
+                message the call sends, as soon as it arrives.
+
+        Returns:
+            tuple[bool, Any]: Whether the call returned in time, and what it returned,
+                None if it did not.
+
+        Raises:
+            Exception: The exception the call raised.
+            WorkerExitedException: If the worker exited without returning.
+        """
+        (receiver, sender) = self._context.Pipe(duplex=False)
+        self.process = self._context.Process(target=_work, args=(sender, self.target, self.args),
+                                             daemon=True)
+        deadline = time.monotonic() + timeout
+        self.process.start()
+        sender.close()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not receiver.poll(remaining):
+                    return False, None
+                try:
+                    (kind, payload) = receiver.recv()
+                except EOFError:
+                    self.process.join()
+                    raise WorkerExitedException(self.process.exitcode) from None
+                if kind == "message":
+                    on_message(payload)
+                    deadline = time.monotonic() + timeout
+                elif kind == "error":
+                    raise payload
+                else:
+                    return True, payload
+        finally:
+            receiver.close()
+            self.stop()
+
+    def stop(self) -> None:
+        """Stops the worker, first with SIGTERM and then, after the grace period, by
+        killing it."""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(self.grace)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
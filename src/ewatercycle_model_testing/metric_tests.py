@@ -1,314 +1,188 @@
 """
 A module with a test bank with metric tests
+
+A Nash Sutcliffe and a Kling Gupta efficiency test is generated for every station of
+the station catalog, named after the station, e.g. nash_sutcliffe_efficiency_rees.
+The tests are added the first time the tests of MetricTests are read, see
+`station_tests`. A test of a station the model does not cover is skipped instead of
+scored.
+Besides the score over the whole period, the result of a test holds the scores of
+every year and season in its metrics, see `period_metrics`.
+
+When the c.METRIC_LOWER_BOUND_ENV environment variable is set to "1", a test judges the
+lower bound of the bootstrap confidence interval of its score instead of the score
+itself, so a model whose score is close to a threshold does not pass or fail by chance.
 """
 
 import os
 
-import ewatercycle.analysis
-import ewatercycle.observation.grdc
-import matplotlib.pyplot as plt
 import numpy as np
-
-from ewatercycle_model_testing.test import Test, TestType
+import pandas as pd
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import metrics
+from ewatercycle_model_testing.observation_store import get_observation_store
+from ewatercycle_model_testing.render_queue import PlotSpec, get_render_queue
+from ewatercycle_model_testing.station_catalog import Station, get_station_catalog
+from ewatercycle_model_testing.station_extraction import (
+    StationNotSampledException,
+    get_station_extraction,
+    get_station_output,
+)
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 
 
-def get_observation_data_rees(model):
-    grdc_station_id = "6335020"
-    observations = 0
-    # Commented out because of gitlab eqatercycle problems.
-    # NEEDS TO BE CODE AGAIN WHEN PIPELINE IS FIXED.
-    observations, _ = ewatercycle.observation.grdc.get_grdc_data(
-        station_id=grdc_station_id,
-        start_time=model.forcing.start_time,
-        end_time=model.forcing.end_time,
-        column="GRDC",
-    )
-    return observations
-
-def get_observation_data_lobith(model):
-    grdc_station_id = "6435060"
-    observations = 0
-    # Commented out because of gitlab eqatercycle problems.
-    # NEEDS TO BE CODE AGAIN WHEN PIPELINE IS FIXED.
-    observations, _ = ewatercycle.observation.grdc.get_grdc_data(
-        station_id=grdc_station_id,
-        start_time=model.forcing.start_time,
-        end_time=model.forcing.end_time,
-        column="GRDC",
-    )
-    return observations
-
-def get_observation_data_schermbeck(model):
-    grdc_station_id = "6335080"
-    observations = 0
-    # Commented out because of gitlab eqatercycle problems.
-    # NEEDS TO BE CODE AGAIN WHEN PIPELINE IS FIXED.
-    observations, _ = ewatercycle.observation.grdc.get_grdc_data(
-        station_id=grdc_station_id,
-        start_time=model.forcing.start_time,
-        end_time=model.forcing.end_time,
-        column="GRDC",
-    )
-    return observations
-
-def get_output_rees(model, dischargename):
-    output = []
-    grdc_latitude = 51.756918
-    grdc_longitude = 6.395395
-    while model.time < model.end_time:
-        model.update()
-        discharge = model.get_value_at_coords(
-            dischargename, lon=[grdc_longitude], lat=[grdc_latitude]
-        )[0]
-        output.append(discharge)
-    return output
-
-def get_output_lobith(model, dischargename):
-    output = []
-    grdc_latitude = 51.84
-    grdc_longitude = 6.11
-    while model.time < model.end_time:
-        model.update()
-        discharge = model.get_value_at_coords(
-            dischargename, lon=[grdc_longitude], lat=[grdc_latitude]
-        )[0]
-        output.append(discharge)
-    return output
-
-def get_output_schermbeck(model, dischargename):
-    output = []
-    grdc_latitude = 51.6739
-    grdc_longitude = 6.8511
-    while model.time < model.end_time:
-        model.update()
-        discharge = model.get_value_at_coords(
-            dischargename, lon=[grdc_longitude], lat=[grdc_latitude]
-        )[0]
-        output.append(discharge)
-    return output
+def get_observation_data(model, dischargename, station: Station):
+    """
+    gets the observations of a station at every timestep of the model run, matched
+    by date, NaN where there is none. The observations of models that do not report
+    their time are matched by position over the period of the forcing.
+    """
+    times = get_station_extraction(model, dischargename).times
+    if times is None or np.isnat(times).any():
+        return get_observation_store().to_dataframe(
+            station.id,
+            start_time=model.forcing.start_time,
+            end_time=model.forcing.end_time,
+            column="GRDC",
+        )
+    return pd.DataFrame({"GRDC": get_observation_store().aligned(station.id, times)},
+                        index=pd.DatetimeIndex(times, name="time"))
+
+def get_output(model, dischargename, station: Station):
+    return get_station_output(model, dischargename, station.name)
 
 def calculate_nse(output, observations):
-    denom = 0
-    omean = (sum(observations["GRDC"]) / len(observations["GRDC"]))
-    for value in observations["GRDC"]:
-        denom = denom + (pow((value - omean), 2))
-
-    sub = observations["GRDC"].sub(output)
-    num = 0
-    for subval in sub:
-        num += pow(subval, 2)
-
-    if num == 0:
+    if metrics.rmse(output, observations["GRDC"]) == 0:
         return 1
+    nse = metrics.nse(output, observations["GRDC"])
     # Observation data is never all the same, so this should nearly never happen
-    if denom == 0:
+    if not np.isfinite(nse):
         return -999
-    return 1 - (num / denom)
+    return nse
 
 def calculate_kge(output, observations):
-    out_mean = sum(output) / len(output)
-    obs_mean = sum(observations["GRDC"]) / len(observations["GRDC"])
-
-    f1 = []
-    f21 = []
-    f22 = []
-
-    for (out, obs) in zip(output, observations["GRDC"]):
-        f1.append((out - out_mean) * (obs - obs_mean))
-        f21.append((out - out_mean) ** 2)
-        f22.append((obs - obs_mean) ** 2)
-
-    r_num = sum(f1)
-    r_den = (sum(f21) * sum(f22)) ** 0.5
-    r = r_num / r_den
-
-    alpha = np.std(output) / np.std(observations["GRDC"])
-    beta = (sum(output) / sum(observations["GRDC"]))
-    kge = 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
-    return kge
-
-@TestBank(description=None)
-class MetricTests:
-
-
-    @staticmethod
-    @Test(description="Checks and returns the Nash Sutcliffe Efficiency for location Rees germany", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def nash_sutcliffe_efficiency_rees(model, dischargename):
-        """
-        Test that checks and returns the Nash Sutcliffe Efficiency for location Rees germany for 1991.
-        """
-        try:
-
-            output = get_output_rees(model, dischargename)
-
-            observations = get_observation_data_rees(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "nash_sutcliffe_efficiency_rees.png"))
-            nse = calculate_nse(output, observations)
-
-            if nse < 0.36:
-                return TestResult(False, f"Nash-Sutcliffe efficiency is unsatisfactory. Nash Sutcliffe was {nse} , which is lower than 0.36")
-            if nse < 0.75:
-                return TestResult(True, f"Nash-Sutcliffe efficiency is satisfactory. Nash Sutcliffe was {nse} , which is higher than 0.36")
-            return TestResult(True,
-                              f"Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was {nse} , which is higher than 0.75")
-
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
-
-    @staticmethod
-    @Test(description="Checks and returns the Kling Glupta Efficiency for location Rees germany", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def kling_gupta_efficiency_rees(model, dischargename):
-        try:
-
-            output = get_output_rees(model, dischargename)
-
-            observations = get_observation_data_rees(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "kling_gupta_efficiency_rees.png"))
-            kge = calculate_kge(output, observations)
-
-            if kge < -0.41:
-                return TestResult(False,
-                                  f"Kling-Gupta efficiency is unsatisfactory. Kling Gupta was {kge} , which is lower than -0.41")
-            if kge < 0.75:
-                return TestResult(True,
-                                  f"Kling-Gupta efficiency is satisfactory. Kling Gupta was {kge} , which is higher than -0.41")
+    return metrics.kge(output, observations["GRDC"])
+
+def use_lower_bound():
+    return os.environ.get(c.METRIC_LOWER_BOUND_ENV, "0") == "1"
+
+def judged_score(score, output, observations, metric):
+    """
+    gets the score to compare with the thresholds and a note on how it was found.
+    """
+    if not use_lower_bound():
+        return score, ""
+    (lower, upper) = metrics.bootstrap(output, observations["GRDC"], metric)
+    if np.isnan(lower):
+        return score, ""
+    return lower, (f", the lower bound of its {c.BOOTSTRAP_CONFIDENCE:.0%} confidence interval "
+                   f"[{lower}, {upper}] was {lower}")
+
+def period_metrics(output, observations):
+    """
+    gets the metrics of every year and season, None if the observations have no times.
+    """
+    if not isinstance(observations.index, pd.DatetimeIndex):
+        return None
+    return np.concatenate([
+        metrics.per_period(output, observations["GRDC"], observations.index, period)
+        for period in metrics.PERIODS])
+
+def compare_with_observations(model, dischargename, station: Station, test_name):
+    """
+    gets the output and observations of a station and queues their hydrograph.
+    Timesteps without an observation are left out of the returned series.
+    """
+    output = get_output(model, dischargename, station)
+
+    observations = get_observation_data(model, dischargename, station)
+    combined_discharge = observations.copy()
+    combined_discharge["Model name"] = output
+
+    # The hydrograph is rendered after the suite, see the render_queue module.
+    get_render_queue().submit(PlotSpec.from_dataframe(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", f"{test_name}.png"),
+        combined_discharge, reference="GRDC"))
+    observed = np.isfinite(observations["GRDC"].to_numpy(dtype=float))
+    if not observed.all():
+        (output, observations) = (np.asarray(output)[observed], observations[observed])
+    return output, observations
+
+def nash_sutcliffe_efficiency(model, dischargename, station: Station, test_name):
+    """
+    Checks and returns the Nash Sutcliffe Efficiency at a station.
+    """
+    try:
+        output, observations = compare_with_observations(model, dischargename, station, test_name)
+        nse = calculate_nse(output, observations)
+        scores = period_metrics(output, observations)
+        (judged, note) = judged_score(nse, output, observations, "nse")
+
+        if judged < 0.36:
+            return TestResult(False, f"Nash-Sutcliffe efficiency is unsatisfactory. Nash Sutcliffe was {nse}{note} , which is lower than 0.36", scores)
+        if judged < 0.75:
+            return TestResult(True, f"Nash-Sutcliffe efficiency is satisfactory. Nash Sutcliffe was {nse}{note} , which is higher than 0.36", scores)
+        return TestResult(True,
+                          f"Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was {nse}{note} , which is higher than 0.75", scores)
+    except StationNotSampledException as e:
+        return TestResult(False, f"{e} The station was not scored.", skipped=True)
+    except Exception:  # pylint:disable=broad-exception-caught
+        return TestResult(False, "Error occurred, the model did not run correctly")
+
+def kling_gupta_efficiency(model, dischargename, station: Station, test_name):
+    """
+    Checks and returns the Kling Gupta Efficiency at a station.
+    """
+    try:
+        output, observations = compare_with_observations(model, dischargename, station, test_name)
+        kge = calculate_kge(output, observations)
+        scores = period_metrics(output, observations)
+        (judged, note) = judged_score(kge, output, observations, "kge")
+
+        if judged < -0.41:
+            return TestResult(False,
+                              f"Kling-Gupta efficiency is unsatisfactory. Kling Gupta was {kge}{note} , which is lower than -0.41", scores)
+        if judged < 0.75:
             return TestResult(True,
-                              f"Kling-Gupta efficiency is very good. Kling Gupta was {kge} , which is higher than 0.75")
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
-
-    @staticmethod
-    @Test(description="Checks and returns the Nash Sutcliffe Efficiency for location Lobith netherlands", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def nash_sutcliffe_efficiency_lobith(model, dischargename):
-        try:
-
-            output = get_output_lobith(model, dischargename)
-
-            observations = get_observation_data_lobith(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "nash_sutcliffe_efficiency_lobith.png"))
-            nse = calculate_nse(output, observations)
-
-            if nse < 0.36:
-                return TestResult(False, f"Nash-Sutcliffe efficiency is unsatisfactory. Nash Sutcliffe was {nse} , which is lower than 0.36")
-            if nse < 0.75:
-                return TestResult(True, f"Nash-Sutcliffe efficiency is satisfactory. Nash Sutcliffe was {nse} , which is higher than 0.36")
-            return TestResult(True,
-                              f"Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was {nse} , which is higher than 0.75")
-
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
-
-    @staticmethod
-    @Test(description="Checks and returns the Kling Glupta Efficiency for location Lobith netherlands", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def kling_gupta_efficiency_lobith(model, dischargename):
-        try:
-            output = get_output_lobith(model, dischargename)
-
-            observations = get_observation_data_lobith(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "kling_gupta_efficiency_lobith.png"))
-            kge = calculate_kge(output, observations)
-            if kge < -0.41:
-                return TestResult(False,
-                                  f"Kling-Gupta efficiency is unsatisfactory. Kling Gupta was {kge} , which is lower than -0.41")
-            if kge < 0.75:
-                return TestResult(True,
-                                  f"Kling-Gupta efficiency is satisfactory. Kling Gupta was {kge} , which is higher than -0.41")
-
-            return TestResult(True,
-                              f"Kling-Gupta efficiency is very good. Kling Gupta was {kge} , which is higher than 0.75")
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
-
-
-    @staticmethod
-    @Test(description="Checks and returns the Nash Sutcliffe Efficiency for location Schermbeck netherlands", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def nash_sutcliffe_efficiency_schermbeck(model, dischargename):
-        try:
-
-            output = get_output_schermbeck(model, dischargename)
-
-            observations = get_observation_data_schermbeck(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "nash_sutcliffe_efficiency_schermbeck.png"))
-            nse = calculate_nse(output, observations)
-
-            if nse < 0.36:
-                return TestResult(False, f"Nash-Sutcliffe efficiency is unsatisfactory. Nash Sutcliffe was {nse} , which is lower than 0.36")
-            if nse < 0.75:
-                return TestResult(True, f"Nash-Sutcliffe efficiency is satisfactory. Nash Sutcliffe was {nse} , which is higher than 0.36")
-            return TestResult(True,
-                              f"Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was {nse} , which is higher than 0.75")
-
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
-
-
-    @staticmethod
-    @Test(description="Checks and returns the Kling Glupta Efficiency for location Schmermbeck germany", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
-    def kling_gupta_efficiency_schermbeck(model, dischargename):
-        try:
-            output = get_output_schermbeck(model, dischargename)
-
-            observations = get_observation_data_schermbeck(model)
-            combined_discharge = observations
-            combined_discharge["Model name"] = output
-
-            # Use this to plot the graph. Maybe usefull for adding to human readable format could have.
-            fig, _ = ewatercycle.analysis.hydrograph(
-                 discharge=combined_discharge,
-                 reference="GRDC",
-            )
-            fig.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "kling_gupta_efficiency_schermbeck.png"))
-            kge = calculate_kge(output, observations)
-            if kge < -0.41:
-                return TestResult(False,
-                                  f"Kling-Gupta efficiency is unsatisfactory. Kling Gupta was {kge} , which is lower than -0.41")
-            if kge < 0.75:
-                return TestResult(True,
-                                  f"Kling-Gupta efficiency is satisfactory. Kling Gupta was {kge} , which is higher than -0.41")
-
-            return TestResult(True,
-                              f"Kling-Gupta efficiency is very good. Kling Gupta was {kge} , which is higher than 0.75")
-        except:
-            return TestResult(False, "Error occurred, the model did not run correctly")
+                              f"Kling-Gupta efficiency is satisfactory. Kling Gupta was {kge}{note} , which is higher than -0.41", scores)
+        return TestResult(True,
+                          f"Kling-Gupta efficiency is very good. Kling Gupta was {kge}{note} , which is higher than 0.75", scores)
+    except StationNotSampledException as e:
+        return TestResult(False, f"{e} The station was not scored.", skipped=True)
+    except Exception:  # pylint:disable=broad-exception-caught
+        return TestResult(False, "Error occurred, the model did not run correctly")
+
+def make_station_test(check, test_name, description, station: Station) -> Test:
+    """
+    creates a metric test that runs a check at a single station.
+    """
+    def run(model, dischargename):
+        return check(model, dischargename, station, test_name)
+    run.__name__ = test_name
+    return Test(description=description, critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+                access=ModelAccess.SHARED_TRAJECTORY, spin_up=True)(run)
+
+
+def station_tests() -> list[Test]:
+    """
+    creates the metric tests of every station of the station catalog. MetricTests
+    calls this the first time its tests are read, so the catalog is not read when
+    the module is imported.
+    """
+    tests = []
+    for station in get_station_catalog():
+        tests.append(make_station_test(nash_sutcliffe_efficiency, f"nash_sutcliffe_efficiency_{station.name}",
+                                       f"Checks and returns the Nash Sutcliffe Efficiency for station {station.title}", station))
+        tests.append(make_station_test(kling_gupta_efficiency, f"kling_gupta_efficiency_{station.name}",
+                                       f"Checks and returns the Kling Gupta Efficiency for station {station.title}", station))
+    return tests
+
+
+@TestBank(description=None, loader=station_tests)
+class MetricTests:
+    """
+    Metric tests of every station of the station catalog, see station_tests.
+    """
@@ -0,0 +1,420 @@
+"""
+Module containing vectorized, NaN-aware hydrological performance metrics.
+
+Every metric compares simulated with observed discharge. Both are arrays with time as
+the first axis: a single series of shape `(time,)`, or a batch of shape
+`(time, column)` where a column is for example a station or an ensemble member. A
+batch is evaluated in one call and gives an array with a value per column, a single
+series gives a float.
+
+Timesteps where either the simulation or the observation is NaN are left out of the
+metric of that column only. A column without any valid timestep gives NaN.
+
+Metrics of many windows of a series, see `rolling`, `per_period` and `bootstrap`, are
+computed from running sums in a single pass instead of window by window.
+"""
+import warnings
+
+import numpy as np
+
+from ewatercycle_model_testing import constants as c
+
+
+def _valid_columns(simulated, observed):
+    """Converts two series to 2-D float arrays with their NaN pairs set to zero.
+
+    Returns:
+        tuple: The simulated values, the observed values, the mask of valid pairs
+            and the number of valid pairs of every column.
+    """
+    (simulated, observed) = np.broadcast_arrays(np.asarray(simulated, dtype=float),
+                                                np.asarray(observed, dtype=float))
+    shape = simulated.shape[:1] + (-1,)
+    (simulated, observed) = (simulated.reshape(shape), observed.reshape(shape))
+    valid = ~(np.isnan(simulated) | np.isnan(observed))
+    return (np.where(valid, simulated, 0.0), np.where(valid, observed, 0.0), valid,
+            valid.sum(axis=0))
+
+
+def _result(values: np.ndarray, simulated, observed):
+    """Returns a float for a single series and an array with a value per column else."""
+    if max(np.ndim(simulated), np.ndim(observed)) < 2:
+        return float(values[0])
+    return values
+
+
+def _mean(values: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """Gets the mean of every column of values whose invalid pairs are zero."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return values.sum(axis=0) / count
+
+
+def _moments(simulated, observed):
+    """Gets the mean and the sums of squared deviations and products of every column."""
+    (simulated, observed, valid, count) = _valid_columns(simulated, observed)
+    (simulated_mean, observed_mean) = (_mean(simulated, count), _mean(observed, count))
+    simulated_anomaly = np.where(valid, simulated - simulated_mean, 0.0)
+    observed_anomaly = np.where(valid, observed - observed_mean, 0.0)
+    return (simulated_mean, observed_mean, count,
+            (simulated_anomaly ** 2).sum(axis=0), (observed_anomaly ** 2).sum(axis=0),
+            (simulated_anomaly * observed_anomaly).sum(axis=0))
+
+
+def nse(simulated, observed):
+    """Gets the Nash-Sutcliffe efficiency.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        The efficiency, 1 for a perfect simulation. A column whose observations are
+        all the same gives -inf, or NaN for a perfect simulation.
+    """
+    (simulated_values, observed_values, valid, count) = _valid_columns(simulated,
+                                                                       observed)
+    observed_mean = _mean(observed_values, count)
+    error = ((simulated_values - observed_values) ** 2).sum(axis=0)
+    spread = (np.where(valid, observed_values - observed_mean, 0.0) ** 2).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _result(1 - error / spread, simulated, observed)
+
+
+def log_nse(simulated, observed, epsilon: float | None = None):
+    """Gets the Nash-Sutcliffe efficiency of the logarithm of the discharge.
+
+    The log-NSE weighs low flows more than the NSE does.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+        epsilon (float | None, optional): The value added to the discharge before
+            taking the logarithm, so zero discharge is allowed. Defaults to a
+            hundredth of the mean observed discharge of every column.
+
+    Returns:
+        The efficiency of the logarithm, 1 for a perfect simulation.
+    """
+    (simulated, observed) = (np.asarray(simulated, dtype=float),
+                             np.asarray(observed, dtype=float))
+    if epsilon is None:
+        valid = ~(np.isnan(simulated) | np.isnan(observed))
+        epsilon = np.nanmean(np.where(valid, observed, np.nan), axis=0) / 100
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return nse(np.log(simulated + epsilon), np.log(observed + epsilon))
+
+
+def kge_components(simulated, observed):
+    """Gets the components of the Kling-Gupta efficiency.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        tuple: The linear correlation r, the variability ratio alpha of the standard
+            deviations and the bias ratio beta of the means.
+    """
+    (simulated_mean, observed_mean, count, simulated_squares, observed_squares,
+     products) = _moments(simulated, observed)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = products / np.sqrt(simulated_squares * observed_squares)
+        alpha = np.sqrt(simulated_squares / observed_squares)
+        beta = simulated_mean / observed_mean
+    return (_result(r, simulated, observed), _result(alpha, simulated, observed),
+            _result(beta, simulated, observed))
+
+
+def kge(simulated, observed):
+    """Gets the Kling-Gupta efficiency.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        The efficiency, 1 for a perfect simulation.
+    """
+    (r, alpha, beta) = (np.asarray(component)
+                        for component in kge_components(simulated, observed))
+    values = 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+    return _result(np.atleast_1d(values), simulated, observed)
+
+
+def rmse(simulated, observed):
+    """Gets the root mean square error.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        The error, in the unit of the discharge.
+    """
+    (simulated_values, observed_values, _, count) = _valid_columns(simulated, observed)
+    error = _mean((simulated_values - observed_values) ** 2, count)
+    return _result(np.sqrt(error), simulated, observed)
+
+
+def pbias(simulated, observed):
+    """Gets the percent bias.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        The total simulated discharge relative to the observed discharge, in percent.
+        Positive values mean that the simulation overestimates the discharge.
+    """
+    (simulated_values, observed_values, _, _) = _valid_columns(simulated, observed)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = (100 * (simulated_values - observed_values).sum(axis=0)
+                  / observed_values.sum(axis=0))
+    return _result(values, simulated, observed)
+
+
+def peak_error(simulated, observed):
+    """Gets the relative error of the highest discharge.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+
+    Returns:
+        The difference between the simulated and observed peak, relative to the
+        observed peak. Only timesteps with both values are compared.
+    """
+    (simulated_values, observed_values, valid, count) = _valid_columns(simulated,
+                                                                       observed)
+    simulated_peak = np.where(valid, simulated_values, -np.inf).max(axis=0)
+    observed_peak = np.where(valid, observed_values, -np.inf).max(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(count > 0, (simulated_peak - observed_peak) / observed_peak,
+                          np.nan)
+    return _result(values, simulated, observed)
+
+
+# The metrics that `rolling` and `per_period` compute from running sums.
+SUM_METRICS: tuple[str, ...] = ("nse", "kge", "rmse", "pbias")
+
+# The periods that `period_starts` splits a series into.
+PERIODS: tuple[str, ...] = ("year", "season")
+
+_SEASONS = np.array(["DJF", "MAM", "JJA", "SON"])
+
+
+def _cumulative_sums(simulated, observed):
+    """Gets the running sums that the metrics of any window are computed from.
+
+    The series are shifted by the mean observation of their column first, which does
+    not change the metrics but keeps the sums of squares small.
+
+    Returns:
+        tuple: The running count, sum of the simulation and the observation, of their
+            squares and of their product, of shape `(6, time + 1, column)`, and the
+            shift of every column.
+    """
+    (simulated, observed, valid, count) = _valid_columns(simulated, observed)
+    shift = np.nan_to_num(_mean(observed, count))
+    simulated = np.where(valid, simulated - shift, 0.0)
+    observed = np.where(valid, observed - shift, 0.0)
+    terms = (valid, simulated, observed, simulated * simulated, observed * observed,
+             simulated * observed)
+    sums = np.zeros((len(terms),) + (simulated.shape[0] + 1,) + simulated.shape[1:])
+    for (index, term) in enumerate(terms):
+        np.cumsum(term, axis=0, out=sums[index, 1:])
+    return sums, shift
+
+
+def _metrics_of_sums(totals: np.ndarray, shift: np.ndarray,
+                     names) -> dict[str, np.ndarray]:
+    """Gets metrics from the sums of windows, see `_cumulative_sums`."""
+    (count, simulated, observed, simulated_squares, observed_squares,
+     products) = totals
+    values = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        (simulated_mean, observed_mean) = (simulated / count, observed / count)
+        simulated_spread = np.maximum(simulated_squares - simulated * simulated_mean,
+                                      0.0)
+        observed_spread = np.maximum(observed_squares - observed * observed_mean, 0.0)
+        error = np.maximum(simulated_squares - 2 * products + observed_squares, 0.0)
+        if "nse" in names:
+            values["nse"] = 1 - error / observed_spread
+        if "kge" in names:
+            r = ((products - simulated * observed_mean)
+                 / np.sqrt(simulated_spread * observed_spread))
+            alpha = np.sqrt(simulated_spread / observed_spread)
+            beta = (simulated_mean + shift) / (observed_mean + shift)
+            values["kge"] = 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2
+                                        + (beta - 1) ** 2)
+        if "rmse" in names:
+            values["rmse"] = np.sqrt(error / count)
+        if "pbias" in names:
+            values["pbias"] = 100 * (simulated - observed) / (observed + count * shift)
+    return {name: np.where(count > 0, values[name], np.nan) for name in names}
+
+
+def _table(totals: np.ndarray, shift: np.ndarray, starts: np.ndarray, metrics,
+           single: bool, labels: np.ndarray | None = None) -> np.ndarray:
+    """Gets the metrics of windows as a structured array with a record per window."""
+    unknown = set(metrics) - set(SUM_METRICS)
+    if unknown:
+        raise ValueError(f"Metrics {sorted(unknown)} are not one of {SUM_METRICS}.")
+    shape = () if single else totals.shape[2:]
+    fields = ([] if labels is None else [("period", "U8")]) + [
+        ("start", np.int32), ("count", np.int32, shape)] + [
+        (name, np.float32, shape) for name in metrics]
+    table = np.zeros(len(starts), dtype=fields)
+    if labels is not None:
+        table["period"] = labels
+    table["start"] = starts
+    table["count"] = totals[0].reshape((len(starts),) + shape)
+    for (name, values) in _metrics_of_sums(totals, shift, metrics).items():
+        table[name] = values.reshape((len(starts),) + shape)
+    return table
+
+
+def rolling(simulated, observed, window: int, metrics=("nse", "kge")) -> np.ndarray:
+    """Gets metrics over every window of a number of consecutive timesteps.
+
+    All windows are computed from running sums in a single pass over the series, so
+    the cost does not depend on the size of the window.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+        window (int): The number of timesteps of a window.
+        metrics (optional): The metrics to compute, names of SUM_METRICS. Defaults to
+            ("nse", "kge").
+
+    Returns:
+        np.ndarray: A structured array with a record per window, with the index of
+            its first timestep as "start", the number of valid pairs as "count" and
+            a float32 field per metric. For a batch, the fields hold a value per
+            column.
+
+    Raises:
+        ValueError: If the window is not positive or a metric is unknown.
+    """
+    if window < 1:
+        raise ValueError(f"The window must be at least one timestep, not {window}.")
+    (sums, shift) = _cumulative_sums(simulated, observed)
+    totals = sums[:, window:] - sums[:, :-window]
+    return _table(totals, shift, np.arange(totals.shape[1]), metrics,
+                  max(np.ndim(simulated), np.ndim(observed)) < 2)
+
+
+def period_starts(times, period: str = "year") -> tuple[np.ndarray, np.ndarray]:
+    """Splits sorted timestamps into consecutive calendar periods.
+
+    Seasons are meteorological, December counts towards the winter of the next year.
+
+    Args:
+        times: The sorted timestamps of the series.
+        period (str, optional): One of PERIODS. Defaults to "year".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The index of the first timestep of every
+            period and its label, e.g. "1991" or "1991-DJF".
+
+    Raises:
+        ValueError: If the period is unknown.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Period [{period}] is not one of {PERIODS}.")
+    times = np.asarray(times, dtype="datetime64[ns]")
+    years = times.astype("datetime64[Y]").astype(np.int64) + 1970
+    keys = years
+    if period == "season":
+        months = times.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        keys = (years + (months == 12)) * 4 + (months % 12) // 3
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1) != 0)
+    if period == "year":
+        return starts, keys[starts].astype(str)
+    labels = np.char.add(np.char.add((keys[starts] // 4).astype(str), "-"),
+                         _SEASONS[keys[starts] % 4])
+    return starts, labels
+
+
+def per_period(simulated, observed, times, period: str = "year",
+               metrics=("nse", "kge")) -> np.ndarray:
+    """Gets metrics for every calendar period of a series.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+        times: The sorted timestamps of the series.
+        period (str, optional): One of PERIODS, see `period_starts`. Defaults to
+            "year".
+        metrics (optional): The metrics to compute, names of SUM_METRICS. Defaults to
+            ("nse", "kge").
+
+    Returns:
+        np.ndarray: A structured array with a record per period, see `rolling`, with
+            the label of the period as "period".
+    """
+    (starts, labels) = period_starts(times, period)
+    (sums, shift) = _cumulative_sums(simulated, observed)
+    bounds = np.append(starts, sums.shape[1] - 1)
+    totals = sums[:, bounds[1:]] - sums[:, bounds[:-1]]
+    return _table(totals, shift, starts, metrics,
+                  max(np.ndim(simulated), np.ndim(observed)) < 2, labels)
+
+
+def bootstrap(simulated, observed, metric: str = "nse",
+              resamples: int = c.BOOTSTRAP_RESAMPLES,
+              block: int = c.BOOTSTRAP_BLOCK_TIMESTEPS,
+              confidence: float = c.BOOTSTRAP_CONFIDENCE,
+              seed: int | None = c.BOOTSTRAP_SEED):
+    """Gets a moving block bootstrap confidence interval of a metric.
+
+    Every resample is a series of the same length made of randomly chosen blocks of
+    consecutive timesteps, which keeps the autocorrelation of discharge within a block.
+    The blocks of all resamples are drawn as one matrix of start indices and the sums
+    of every possible block come from the running sums of `rolling`, so all resamples
+    are scored in one batch without copying the series.
+
+    Args:
+        simulated: The simulated discharge, time as the first axis.
+        observed: The observed discharge, time as the first axis.
+        metric (str, optional): One of SUM_METRICS. Defaults to "nse".
+        resamples (int, optional): The number of resamples.
+            Defaults to c.BOOTSTRAP_RESAMPLES.
+        block (int, optional): The number of timesteps of a block, at most the length
+            of the series. Defaults to c.BOOTSTRAP_BLOCK_TIMESTEPS.
+        confidence (float, optional): The confidence level of the interval.
+            Defaults to c.BOOTSTRAP_CONFIDENCE.
+        seed (int | None, optional): The seed of the resamples, None for a random
+            seed. Defaults to c.BOOTSTRAP_SEED, so a run is reproducible.
+
+    Returns:
+        tuple: The lower and upper bound of the interval. Resamples whose metric is
+            undefined are left out, bounds without any defined resample are NaN.
+
+    Raises:
+        ValueError: If the metric is unknown or the series is empty.
+    """
+    if metric not in SUM_METRICS:
+        raise ValueError(f"Metric [{metric}] is not one of {SUM_METRICS}.")
+    (sums, shift) = _cumulative_sums(simulated, observed)
+    length = sums.shape[1] - 1
+    if length == 0:
+        raise ValueError("Cannot bootstrap an empty series.")
+    block = min(max(block, 1), length)
+    (blocks, remainder) = divmod(length, block)
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, length - block + 1, (resamples, blocks))
+    rest = rng.integers(0, length - remainder + 1, resamples)
+    totals = np.empty((len(sums), resamples) + sums.shape[2:])
+    for (index, running) in enumerate(sums):
+        totals[index] = (running[block:] - running[:-block])[starts].sum(axis=1)
+        totals[index] += running[rest + remainder] - running[rest]
+    values = _metrics_of_sums(totals, shift, (metric,))[metric]
+    values[np.isinf(values)] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        (lower, upper) = np.nanquantile(values, [(1 - confidence) / 2,
+                                                 (1 + confidence) / 2], axis=0)
+    return (_result(np.atleast_1d(lower), simulated, observed),
+            _result(np.atleast_1d(upper), simulated, observed))
@@ -12,6 +12,8 @@ import ewatercycle.models
 import numpy as np
 import xarray
 
+from ewatercycle_model_testing import scenarios_util
+
 
 class VarDoesntExistException(Exception):
     """
@@ -634,12 +636,8 @@ class ScenarioDistributedMock(BasicModelMock):
 
     def setup(self,forcing):
         self.counter = 0
-        self.output = []
-        path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-        data = xarray.open_dataset(path)
-        for a in enumerate(data['pr'].values):
-            for grid in data['pr'].values[a[0]]:
-               self.output.append(grid)
+        values = scenarios_util.load_scenario_array(forcing, 'pr')
+        self.output = values.reshape(-1, values.shape[-1])
 
     def update(self):
         self.counter = self.counter + 1
@@ -0,0 +1,169 @@
+"""
+Module for capturing the state of an initialized model and restoring it into another.
+
+Isolated tests must each start from a freshly initialized model, and initializing a
+model can take as long as starting a container. A `ModelSnapshot` holds the time and
+the value of every input and output variable of an initialized model, read through
+BMI `get_value`. Restoring it with BMI `set_value` brings a model that a test changed
+back to that state, so the next test can reuse the model instead of initializing a
+new one.
+
+BMI cannot set the time of a model and a model may keep state that is not exposed as
+a variable, so a restore only counts when the time and every variable read back equal
+the snapshot, see `ModelSnapshot.restores_into`. Otherwise the model has to be
+initialized again.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+
+class SnapshotException(Exception):
+    """Raised when the state of a model cannot be captured."""
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Cannot take a snapshot of the model: {reason}")
+
+
+def variable_names(bmi) -> list[str]:
+    """Gets the names of the input and output variables of a model, without duplicates.
+
+    Args:
+        bmi: The BMI of the model.
+
+    Returns:
+        list[str]: The input variables followed by the output variables.
+    """
+    return list(dict.fromkeys([*bmi.get_input_var_names(),
+                               *bmi.get_output_var_names()]))
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    The state of a model as far as it is exposed through BMI.
+
+    Attributes:
+        time (float): The current time of the model, in the time unit of its BMI.
+        values (dict[str, np.ndarray]): A copy of the value of every variable, by name.
+    """
+    time: float
+    values: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def take(cls, model) -> "ModelSnapshot":
+        """Captures the state of a model.
+
+        Args:
+            model: An initialized model.
+
+        Returns:
+            ModelSnapshot: The snapshot.
+
+        Raises:
+            SnapshotException: If the model does not expose its time or variables.
+        """
+        try:
+            bmi = model.bmi
+            return cls(float(bmi.get_current_time()),
+                       {name: np.array(bmi.get_value(name), copy=True)
+                        for name in variable_names(bmi)})
+        except Exception as e:
+            raise SnapshotException(str(e)) from e
+
+    @classmethod
+    def try_take(cls, model) -> "ModelSnapshot | None":
+        """Captures the state of a model if it can be restored into the model again.
+
+        Args:
+            model: An initialized model.
+
+        Returns:
+            ModelSnapshot | None: The snapshot, None if the state of the model cannot
+                be captured or does not survive a round trip through `restore`.
+        """
+        try:
+            snapshot = cls.take(model)
+        except SnapshotException:
+            return None
+        return snapshot if snapshot.restores_into(model) else None
+
+    def save(self, path: Path | str) -> None:
+        """Writes the snapshot to a file, atomically.
+
+        Args:
+            path (Path | str): The path of the `.npz` file.
+        """
+        path = Path(path)
+        staging = path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        names = list(self.values)
+        with open(staging, "wb") as file:
+            np.savez(file, time=np.array(self.time), names=np.array(names, dtype=str),
+                     **{f"value_{index}": self.values[name]
+                        for (index, name) in enumerate(names)})
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ModelSnapshot":
+        """Reads a snapshot that was written by `save`.
+
+        Args:
+            path (Path | str): The path of the `.npz` file.
+
+        Returns:
+            ModelSnapshot: The snapshot.
+        """
+        with np.load(path) as arrays:
+            return cls(float(arrays["time"]),
+                       {str(name): arrays[f"value_{index}"]
+                        for (index, name) in enumerate(arrays["names"])})
+
+    def restore(self, model) -> None:
+        """Sets every variable of a model to its value in the snapshot.
+
+        Args:
+            model: The model, of the same kind and grid as the captured model.
+        """
+        for (name, value) in self.values.items():
+            model.bmi.set_value(name, value.copy())
+
+    def matches(self, model, check_time: bool = True) -> bool:
+        """Checks if a model is in the state of the snapshot.
+
+        Args:
+            model: The model.
+            check_time (bool, optional): Whether the time must be equal as well.
+                Defaults to True.
+
+        Returns:
+            bool: Whether the time and the value of every variable are equal.
+        """
+        try:
+            current = self.take(model)
+        except SnapshotException:
+            return False
+        return ((current.time == self.time or not check_time)
+                and current.values.keys() == self.values.keys()
+                and all(np.array_equal(current.values[name], value,
+                                       equal_nan=value.dtype.kind in "fc")
+                        for (name, value) in self.values.items()))
+
+    def restores_into(self, model, check_time: bool = True) -> bool:
+        """Restores the snapshot into a model and checks that it round-trips.
+
+        Args:
+            model: The model.
+            check_time (bool, optional): Whether the model must be at the time of the
+                snapshot, which BMI cannot set. Defaults to True.
+
+        Returns:
+            bool: Whether the model is in the state of the snapshot afterwards. If
+                not, the model is in an unknown state and must not be reused.
+        """
+        try:
+            self.restore(model)
+        except Exception:  # pylint:disable=broad-exception-caught
+            return False
+        return self.matches(model, check_time)
@@ -0,0 +1,159 @@
+"""
+Module for keeping observed discharge in memory and slicing it by time.
+
+The metric tests of a suite run compare the model with the observations of the same
+few stations for the same period. This module provides an `ObservationStore` class
+that loads the series of every station once, as sorted `datetime64` and `float64`
+arrays, and answers window queries with a binary search. Windows are read-only views
+of the stored arrays, so the store can be shared by all threads of a suite run, see
+`get_observation_store`.
+
+`align` matches the timestamps of a model run to the observation dates with a binary
+search as well, instead of reindexing a DataFrame for every test.
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ewatercycle_model_testing import grdc_reader
+
+
+def align(times, observation_times: np.ndarray, observation_values: np.ndarray,
+          resolution: str = "D") -> np.ndarray:
+    """Gets the observation of every timestamp of a model run.
+
+    Timestamps and observation times are compared at a resolution, so a model that
+    reports its daily output at noon matches the observation of that day.
+
+    Args:
+        times: The timestamps of the model output.
+        observation_times (np.ndarray): The sorted times of the observations.
+        observation_values (np.ndarray): The observed values.
+        resolution (str, optional): The datetime64 unit the times are compared at.
+            Defaults to "D".
+
+    Returns:
+        np.ndarray: The observed value of every timestamp, NaN where there is none.
+    """
+    unit = f"datetime64[{resolution}]"
+    times = np.asarray(times, dtype="datetime64[ns]").astype(unit)
+    observation_times = np.asarray(observation_times).astype(unit)
+    indices = np.searchsorted(observation_times, times)
+    found = indices < len(observation_times)
+    found[found] = observation_times[indices[found]] == times[found]
+    aligned = np.full(times.shape, np.nan)
+    aligned[found] = observation_values[indices[found]]
+    return aligned
+
+
+class ObservationStore:
+    """The observations of GRDC stations, loaded once and shared between threads.
+
+    Args:
+        directory (Path | str | None, optional): The directory of the station files,
+            see `grdc_reader.find_grdc_file`.
+        cache_dir (Path | str | None, optional): The cache directory of parsed
+            station files, see `grdc_reader.load_grdc_file`.
+    """
+
+    def __init__(self, directory: Path | str | None = None,
+                 cache_dir: Path | str | None = None):
+        """Initializes the ObservationStore instance."""
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self._series: dict[str, grdc_reader.GrdcSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, station_id: str) -> grdc_reader.GrdcSeries:
+        """Gets all observations of a station, loading them on first use.
+
+        Args:
+            station_id (str): The GRDC number of the station, e.g. "6335020".
+
+        Returns:
+            grdc_reader.GrdcSeries: The observations, as read-only arrays.
+        """
+        with self._lock:
+            if station_id not in self._series:
+                series = grdc_reader.load_grdc_file(
+                    grdc_reader.find_grdc_file(station_id, self.directory),
+                    self.cache_dir)
+                series.times.flags.writeable = False
+                series.values.flags.writeable = False
+                self._series[station_id] = series
+            return self._series[station_id]
+
+    def window(self, station_id: str, start_time=None,
+               end_time=None) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the observations of a station between two times.
+
+        Args:
+            station_id (str): The GRDC number of the station.
+            start_time (optional): The first time to include, e.g.
+                "1991-01-01T00:00:00Z". Defaults to the first observation.
+            end_time (optional): The last time to include. Defaults to the last
+                observation.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Views of the times and the values.
+        """
+        series = self.series(station_id)
+        start = 0 if start_time is None else np.searchsorted(
+            series.times, grdc_reader.to_datetime64(start_time), side="left")
+        stop = len(series.times) if end_time is None else np.searchsorted(
+            series.times, grdc_reader.to_datetime64(end_time), side="right")
+        return series.times[start:stop], series.values[start:stop]
+
+    def to_dataframe(self, station_id: str, start_time=None, end_time=None,
+                     column: str = "GRDC") -> pd.DataFrame:
+        """Gets the observations of a station between two times as a DataFrame.
+
+        Args:
+            station_id (str): The GRDC number of the station.
+            start_time (optional): The first time to include.
+            end_time (optional): The last time to include.
+            column (str, optional): The name of the column. Defaults to "GRDC".
+
+        Returns:
+            pd.DataFrame: The observations in a column, with a "time" index.
+        """
+        (times, values) = self.window(station_id, start_time, end_time)
+        return pd.DataFrame({column: values}, index=pd.DatetimeIndex(times, name="time"))
+
+    def aligned(self, station_id: str, times, resolution: str = "D") -> np.ndarray:
+        """Gets the observation of a station at every timestamp of a model run.
+
+        Args:
+            station_id (str): The GRDC number of the station.
+            times: The timestamps of the model output.
+            resolution (str, optional): The unit the times are compared at, see
+                `align`. Defaults to "D".
+
+        Returns:
+            np.ndarray: The observed value of every timestamp, NaN where there is none.
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        if times.size == 0:
+            return np.empty(0)
+        (window_times, values) = self.window(station_id, times.min().astype(
+            f"datetime64[{resolution}]"), times.max())
+        return align(times, window_times, values, resolution)
+
+
+_default_store: ObservationStore | None = None
+_default_store_lock = threading.Lock()
+
+
+def get_observation_store() -> ObservationStore:
+    """Gets the observation store shared by the whole package.
+
+    Returns:
+        ObservationStore: The shared store, configured through environment variables.
+    """
+    global _default_store  # pylint:disable=global-statement
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ObservationStore()
+        return _default_store
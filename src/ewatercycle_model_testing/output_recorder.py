@@ -0,0 +1,159 @@
+"""
+Module for recording an output variable of a model on every timestep of a run.
+
+An `OutputRecorder` preallocates a `(time, ...)` buffer from the grid of the variable
+and the number of timesteps left in the run. On every timestep the model writes the
+variable straight into its slot of the buffer through BMI `get_value`, so no DataArray
+is made per timestep and nothing is concatenated at the end. When a memory limit is
+set, the buffer holds a chunk of timesteps that is written to netCDF or zarr whenever
+it is full, and the result is read back lazily.
+"""
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing.station_extraction import expected_steps, model_time
+
+# The formats an OutputRecorder can write chunks in.
+SPILL_FORMATS: tuple[str, ...] = ("netcdf", "zarr")
+
+
+class OutputRecorder:
+    """The values of an output variable of a model on every timestep of a run.
+
+    Args:
+        model: The model to record, its grid is read from `get_value_as_xarray`.
+        outputname (str): The name of the output variable.
+        steps (int | None, optional): The number of timesteps to preallocate.
+            Defaults to the number of timesteps left in the run of the model.
+        max_bytes (int | None, optional): The size of the buffer above which chunks
+            are written to disk, None to keep everything in memory. Defaults to the
+            c.OUTPUT_RECORDER_MAX_BYTES_ENV environment variable, or no limit.
+        spill_dir (Path | str | None, optional): The directory chunks are written
+            to. Defaults to a new temporary directory.
+        spill_format (str, optional): One of SPILL_FORMATS. Defaults to "netcdf".
+
+    Raises:
+        ValueError: If the spill format is unknown.
+    """
+
+    def __init__(self, model, outputname: str, steps: int | None = None,
+                 max_bytes: int | None = None, spill_dir: Path | str | None = None,
+                 spill_format: str = "netcdf"):
+        """Initializes the OutputRecorder instance."""
+        if spill_format not in SPILL_FORMATS:
+            raise ValueError(f"Format [{spill_format}] is not one of {SPILL_FORMATS}.")
+        if max_bytes is None and os.environ.get(c.OUTPUT_RECORDER_MAX_BYTES_ENV):
+            max_bytes = int(os.environ[c.OUTPUT_RECORDER_MAX_BYTES_ENV])
+        self.model = model
+        self.outputname = outputname
+        self.template = model.get_value_as_xarray(outputname).drop_vars(
+            "time", errors="ignore")
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_format = spill_format
+        self.chunks: list[Path] = []
+        steps = expected_steps(model) if steps is None else steps
+        if max_bytes is not None:
+            step_bytes = max(self.template.size * self.template.dtype.itemsize, 1)
+            steps = min(steps or math.inf, max(max_bytes // step_bytes, 1))
+        self._buffer = np.empty((max(steps, 1),) + self.template.shape,
+                                dtype=self.template.dtype)
+        self._times = np.empty(len(self._buffer), dtype="datetime64[ns]")
+        self._filled = 0
+        self._read = self._reader()
+
+    def _reader(self):
+        """Gets a function that reads the variable into a slot of the buffer."""
+        bmi = getattr(self.model, "bmi", None)
+        if not callable(getattr(bmi, "get_value", None)):
+            def read(slot: np.ndarray) -> None:
+                slot[...] = np.reshape(self.model.get_value(self.outputname), slot.shape)
+            return read
+
+        def read_bmi(slot: np.ndarray) -> None:
+            flat = slot.reshape(-1)
+            values = bmi.get_value(self.outputname, flat)
+            # Not every BMI implementation fills the destination it is given.
+            if values is not None and not np.shares_memory(values, flat):
+                flat[:] = np.ravel(values)
+        return read_bmi
+
+    @property
+    def spilling(self) -> bool:
+        """Whether full chunks are written to disk instead of growing the buffer."""
+        return self.max_bytes is not None
+
+    def record(self) -> None:
+        """Records the variable at the current timestep of the model."""
+        if self._filled == len(self._buffer):
+            if self.spilling:
+                self._flush()
+            else:
+                self._buffer = np.resize(self._buffer, (2 * self._filled,)
+                                         + self.template.shape)
+                self._times = np.resize(self._times, len(self._buffer))
+        self._read(self._buffer[self._filled])
+        self._times[self._filled] = model_time(self.model)
+        self._filled += 1
+
+    def run(self) -> xr.DataArray:
+        """Steps the model to its end and records the variable after every update.
+
+        Returns:
+            xr.DataArray: The recorded values, see `result`.
+        """
+        while self.model.time < self.model.end_time:
+            self.model.update()
+            self.record()
+        return self.result()
+
+    def _data_array(self) -> xr.DataArray:
+        """Gets the timesteps in the buffer as a DataArray."""
+        return xr.DataArray(self._buffer[:self._filled],
+                            dims=("time",) + self.template.dims,
+                            coords={**self.template.coords,
+                                    "time": self._times[:self._filled]},
+                            name=self.template.name or self.outputname,
+                            attrs=self.template.attrs)
+
+    def _flush(self) -> None:
+        """Writes the timesteps in the buffer to disk and empties it."""
+        if self._filled == 0:
+            return
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="ewatercycle-output-")
+        dataset = self._data_array().to_dataset()
+        if self.spill_format == "zarr":
+            store = Path(self.spill_dir) / f"{self.outputname}.zarr"
+            if self.chunks:
+                dataset.to_zarr(store, append_dim="time")
+            else:
+                dataset.to_zarr(store, mode="w")
+                self.chunks.append(store)
+        else:
+            path = Path(self.spill_dir) / f"{self.outputname}_{len(self.chunks):05d}.nc"
+            dataset.to_netcdf(path)
+            self.chunks.append(path)
+        self._filled = 0
+
+    def result(self) -> xr.DataArray:
+        """Gets the recorded values.
+
+        Returns:
+            xr.DataArray: The values with a "time" dimension before the dimensions of
+                the variable. A view of the buffer, or read lazily from the chunks on
+                disk if any were written.
+        """
+        if not self.chunks:
+            return self._data_array()
+        self._flush()
+        name = self.template.name or self.outputname
+        if self.spill_format == "zarr":
+            return xr.open_zarr(self.chunks[0])[name]
+        return xr.open_mfdataset(self.chunks, combine="nested", concat_dim="time")[name]
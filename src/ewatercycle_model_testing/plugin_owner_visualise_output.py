@@ -9,7 +9,6 @@ from tkinter import messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from run_model_util import RunModelUtil
-import xarray as xr
 import matplotlib.pyplot as plt
 import mocks
 
@@ -41,8 +40,7 @@ class VisualiseOutput:
                 return
 
             if model_type == "Lumped":
-                outputs = RunModelUtil.run_x_array_model(model, variable_name)
-                result = xr.concat(outputs, dim="time")
+                result = RunModelUtil.run_x_array_model(model, variable_name)
                 result.plot()
                 plt.savefig(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output",
                                          (model_name + " LineGraph (" + str(start_date) + " - " + str(end_date) + ")")))
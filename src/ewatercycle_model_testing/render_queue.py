@@ -0,0 +1,158 @@
+"""
+Module for rendering the hydrographs of tests outside of the tests themselves.
+
+Plotting with matplotlib is slow and its pyplot state is shared by all threads, so
+tests that run in parallel must not plot. Instead, a test submits a `PlotSpec`, which
+only holds the series to plot, to the `RenderQueue` of its process. The queue renders
+all specs in a batch in a separate process that uses the Agg backend, see
+`RenderQueue.flush`, which `TestSuite.run_all` calls once all tests are done.
+"""
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ewatercycle_model_testing.executors import make_executor
+
+
+@dataclass(frozen=True)
+class PlotSpec:
+    """
+    The data of a hydrograph to render.
+
+    Attributes:
+        path (str): The path of the image file to write.
+        series (dict[str, np.ndarray]): The discharge to plot, by label.
+        reference (str): The label of the series the others are compared with.
+            Defaults to "GRDC".
+        times (np.ndarray | None): The time of every value, None to number them.
+    """
+    path: str
+    series: dict[str, np.ndarray] = field(default_factory=dict)
+    reference: str = "GRDC"
+    times: np.ndarray | None = None
+
+    @classmethod
+    def from_dataframe(cls, path: str, discharge: pd.DataFrame,
+                       reference: str = "GRDC") -> "PlotSpec":
+        """Creates a spec from a DataFrame as accepted by the eWaterCycle hydrograph.
+
+        Args:
+            path (str): The path of the image file to write.
+            discharge (pd.DataFrame): The discharge to plot, a column per series.
+            reference (str, optional): The column of the reference series.
+                Defaults to "GRDC".
+
+        Returns:
+            PlotSpec: The spec, holding copies of the columns and the index.
+        """
+        return cls(path, {str(name): discharge[name].to_numpy(dtype=float, copy=True)
+                          for name in discharge.columns},
+                   reference, discharge.index.to_numpy(copy=True))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Converts the spec back into a DataFrame for the hydrograph.
+
+        Returns:
+            pd.DataFrame: The discharge, a column per series.
+        """
+        index = None if self.times is None else pd.Index(self.times, name="time")
+        return pd.DataFrame(self.series, index=index)
+
+
+def render(specs: list[PlotSpec]) -> dict[str, str | None]:
+    """Renders hydrographs with the Agg backend, meant to run in a separate process.
+
+    Args:
+        specs (list[PlotSpec]): The hydrographs to render.
+
+    Returns:
+        dict[str, str | None]: The error of every spec by path, None if it was
+            rendered.
+    """
+    # pylint:disable=import-outside-toplevel
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    import ewatercycle.analysis
+    import matplotlib.pyplot as plt
+
+    errors = {}
+    for spec in specs:
+        try:
+            (fig, _) = ewatercycle.analysis.hydrograph(discharge=spec.to_dataframe(),
+                                                       reference=spec.reference)
+            fig.savefig(spec.path)
+            plt.close(fig)
+            errors[spec.path] = None
+        except Exception as e:  # pylint:disable=broad-exception-caught
+            errors[spec.path] = str(e)
+    return errors
+
+
+class RenderQueue:
+    """The hydrographs that tests of this process submitted and are not yet rendered.
+
+    Args:
+        executor (str, optional): The executor policy the hydrographs are rendered
+            on, see the executors module. Defaults to "processes".
+    """
+
+    def __init__(self, executor: str = "processes"):
+        """Initializes the RenderQueue instance."""
+        self.executor = executor
+        self._specs: list[PlotSpec] = []
+        self._lock = threading.Lock()
+
+    def submit(self, spec: PlotSpec) -> None:
+        """Adds a hydrograph to the queue.
+
+        Args:
+            spec (PlotSpec): The hydrograph to render.
+        """
+        with self._lock:
+            self._specs.append(spec)
+
+    def extend(self, specs: list[PlotSpec]) -> None:
+        """Adds several hydrographs to the queue, e.g. those of a worker process.
+
+        Args:
+            specs (list[PlotSpec]): The hydrographs to render.
+        """
+        with self._lock:
+            self._specs.extend(specs)
+
+    def drain(self) -> list[PlotSpec]:
+        """Removes all hydrographs from the queue without rendering them.
+
+        Returns:
+            list[PlotSpec]: The hydrographs that were queued.
+        """
+        with self._lock:
+            (specs, self._specs) = (self._specs, [])
+        return specs
+
+    def flush(self) -> dict[str, str | None]:
+        """Renders all queued hydrographs in a batch, in a single worker.
+
+        Returns:
+            dict[str, str | None]: The error of every rendered spec by path, None if
+                it was rendered, see `render`.
+        """
+        specs = self.drain()
+        if not specs:
+            return {}
+        with make_executor(self.executor, 1) as pool:
+            return pool.submit(render, specs).result()
+
+
+_default_queue = RenderQueue()
+
+
+def get_render_queue() -> RenderQueue:
+    """Gets the render queue of this process.
+
+    Returns:
+        RenderQueue: The queue the tests of this process submit their hydrographs to.
+    """
+    return _default_queue
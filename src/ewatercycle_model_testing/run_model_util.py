@@ -18,6 +18,9 @@ from ewatercycle.util import CaseConfigParser
 from ewatercycle_leakybucket.model import LeakyBucket
 from ewatercycle_wflow.model import Wflow
 
+from ewatercycle_model_testing.forcing_cache import get_forcing_cache
+from ewatercycle_model_testing.output_recorder import OutputRecorder
+
 
 class RunModelUtil:
     """
@@ -71,14 +74,16 @@ class RunModelUtil:
 
         if not custom_forcing_name:
             if model_type == 'Lumped':
-                forcing = GenericLumpedForcing.generate(
+                forcing = get_forcing_cache().generate(
+                    GenericLumpedForcing,
                     dataset=cmip_dataset,
                     start_time=start_date,
                     end_time=end_date,
                     shape=shape.absolute(),
                 )
             else:
-                forcing = GenericDistributedForcing.generate(
+                forcing = get_forcing_cache().generate(
+                    GenericDistributedForcing,
                     dataset=cmip_dataset,
                     start_time=start_date,
                     end_time=end_date,
@@ -163,7 +168,8 @@ class RunModelUtil:
             "ensemble": "r6i1p1f1",
         }
         if parameter_set is None:
-            forcing = GenericLumpedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericLumpedForcing,
                 dataset=cmip_dataset,
                 start_time="2001-01-01T00:00:00Z",
                 end_time="2001-12-31T00:00:00Z",
@@ -176,7 +182,8 @@ class RunModelUtil:
             end_time_str = cfg.get("run", "endtime")
             start_time = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
             end_time = datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
-            forcing = GenericLumpedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericLumpedForcing,
                 dataset=cmip_dataset,
                 start_time=start_time,
                 end_time=end_time,
@@ -194,7 +201,8 @@ class RunModelUtil:
             "ensemble": "r6i1p1f1",
         }
         if parameter_set is None:
-            forcing = GenericDistributedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericDistributedForcing,
                 dataset=cmip_dataset,
                 start_time="2001-01-01T00:00:00Z",
                 end_time="2001-12-31T00:00:00Z",
@@ -208,7 +216,8 @@ class RunModelUtil:
             start_time = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
             end_time = datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
 
-            forcing = GenericDistributedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericDistributedForcing,
                 dataset=cmip_dataset,
                 start_time=start_time,
                 end_time=end_time,
@@ -238,7 +247,8 @@ class RunModelUtil:
             "ensemble": "r6i1p1f1",
         }
         if parameter_set is None:
-            forcing = GenericLumpedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericLumpedForcing,
                 dataset=cmip_dataset,
                 start_time="1991-01-01T00:00:00Z",
                 end_time="1991-12-31T00:00:00Z",
@@ -252,7 +262,8 @@ class RunModelUtil:
             end_time_str = cfg.get("run", "endtime")
             start_time = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
             end_time = datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
-            forcing = GenericLumpedForcing.generate(
+            forcing = get_forcing_cache().generate(
+                GenericLumpedForcing,
                 dataset=cmip_dataset,
                 start_time=start_time,
                 end_time=end_time,
@@ -283,7 +294,8 @@ class RunModelUtil:
             "exp": "historical",
             "ensemble": "r6i1p1f1",
         }
-        forcing = GenericDistributedForcing.generate(
+        forcing = get_forcing_cache().generate(
+            GenericDistributedForcing,
             dataset=cmip_dataset,
             start_time=start_time,
             end_time=end_time,
@@ -370,7 +382,8 @@ class RunModelUtil:
             "exp": "historical",
             "ensemble": "r6i1p1f1",
         }
-        forcing = GenericLumpedForcing.generate(
+        forcing = get_forcing_cache().generate(
+            GenericLumpedForcing,
             dataset=cmip_dataset,
             start_time=start_date,
             end_time=end_date,
@@ -384,15 +397,13 @@ class RunModelUtil:
 
     @staticmethod
     def run_x_array_model(model, outputname):
+        """
+        method to run a model to its end and get an output variable of every step
+        as a single DataArray with a time dimension, see OutputRecorder.
+        """
         # cfg_file, _ = model.setup(leakiness=1)
         # model.initialize(cfg_file)
-        discharges = []
-        while model.time < model.end_time:
-            model.update()
-            discharges.append(model.get_value_as_xarray(outputname))
-
-
-        return discharges
+        return OutputRecorder(model, outputname).run()
 
     @staticmethod
     def run_x_array_model_coords(model, outputname, long, lat):
@@ -0,0 +1,188 @@
+"""
+Module for declaring scenarios as data instead of code.
+
+This module provides a `ScenarioSpec` class that describes a scenario by the forcing
+variable it alters, a chain of transforms with their parameters and the seed of its
+random generator. Specs are written as dicts or YAML, for example:
+
+    name: mid_spike
+    variable: pr
+    seed: 0
+    transforms:
+      - transform: noise
+        low: 1
+        high: 100
+        scale: 0.00000001
+      - transform: spike
+        position: 0.5
+        height: 0.001
+
+Every transform names a function of the scenario_transforms module and passes the
+other keys as its arguments. The `period` transform applies the transforms listed
+under `inner` to a part of the forcing. A spec compiles into a single transform and
+has a stable digest, so the forcing generated from it can be cached and reused.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import scenario_transforms as st
+
+TRANSFORMS: dict = {
+    "zeroes": st.zeroes,
+    "noise": st.noise,
+    "fill_missing": st.fill_missing,
+    "ramp": st.ramp,
+    "spike": st.spike,
+    "period": st.period,
+}
+
+
+class ScenarioSpecException(Exception):
+    """Raised when a scenario spec is invalid."""
+
+
+class UnknownTransformException(ScenarioSpecException):
+    """Raised when a scenario spec uses a transform that does not exist."""
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Transform [{name}] does not exist, choose one of: "
+                         + ", ".join(TRANSFORMS))
+
+
+def _freeze(value):
+    """Converts dicts and lists into sorted, hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(inner)) for (key, inner) in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(inner) for inner in value)
+    return value
+
+
+def _compile_steps(steps):
+    """Compiles frozen transform steps into a single transform."""
+    transforms = []
+    for step in steps:
+        arguments = dict(step)
+        name = arguments.pop("transform", None)
+        if name not in TRANSFORMS:
+            raise UnknownTransformException(name)
+        if "inner" in arguments:
+            arguments["inner"] = _compile_steps(arguments["inner"])
+        try:
+            transforms.append(TRANSFORMS[name](**arguments))
+        except TypeError as e:
+            raise ScenarioSpecException(f"Invalid arguments for transform [{name}]: "
+                                        f"{e}") from e
+    return st.chain(*transforms)
+
+
+def _thaw_steps(steps) -> list[dict]:
+    """Converts frozen transform steps back into a list of dicts."""
+    thawed = []
+    for step in steps:
+        arguments = dict(step)
+        if "inner" in arguments:
+            arguments["inner"] = _thaw_steps(arguments["inner"])
+        thawed.append(arguments)
+    return thawed
+
+
+@dataclass(frozen=True)
+class ScenarioSpec:
+    """
+    A declarative description of a scenario.
+
+    Attributes:
+        name (str): The name of the scenario, also the prefix of its file name.
+        transforms (tuple): The transform steps, frozen into hashable tuples.
+        variable (str): The forcing variable the scenario alters.
+            Defaults to "pr".
+        seed (int): The seed of the random generator. Defaults to c.SCENARIO_SEED.
+    """
+    name: str
+    transforms: tuple
+    variable: str = "pr"
+    seed: int = c.SCENARIO_SEED
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "ScenarioSpec":
+        """Creates a spec from a dict.
+
+        Args:
+            spec (dict): A dict with a name, a list of transforms and optionally a
+                variable and a seed.
+
+        Returns:
+            ScenarioSpec: The spec.
+
+        Raises:
+            ScenarioSpecException: If the spec is invalid.
+        """
+        unknown = set(spec) - {"name", "transforms", "variable", "seed"}
+        if unknown or "name" not in spec:
+            raise ScenarioSpecException(f"Invalid scenario spec: {spec}")
+        result = cls(name=spec["name"],
+                     transforms=_freeze(spec.get("transforms", [])),
+                     variable=spec.get("variable", "pr"),
+                     seed=spec.get("seed", c.SCENARIO_SEED))
+        result.compile()
+        return result
+
+    @classmethod
+    def from_yaml(cls, text: str) -> "ScenarioSpec":
+        """Creates a spec from a YAML document.
+
+        Args:
+            text (str): The YAML document.
+
+        Returns:
+            ScenarioSpec: The spec.
+        """
+        return cls.from_dict(yaml.safe_load(text))
+
+    def to_dict(self) -> dict:
+        """Converts the spec into a dict that from_dict accepts.
+
+        Returns:
+            dict: The spec as a dict.
+        """
+        return {"name": self.name, "variable": self.variable, "seed": self.seed,
+                "transforms": _thaw_steps(self.transforms)}
+
+    def compile(self):
+        """Compiles the spec into a transform of the scenario_transforms module.
+
+        Returns:
+            A transform that applies all steps of the spec in order.
+
+        Raises:
+            ScenarioSpecException: If a step of the spec is invalid.
+        """
+        return _compile_steps(self.transforms)
+
+    def digest(self) -> str:
+        """Gets a digest that only changes when the scenario changes.
+
+        Returns:
+            str: A sha256 hex digest of the spec.
+        """
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()
+                              ).hexdigest()
+
+
+def load_scenario_specs(path: Path | str) -> dict[str, ScenarioSpec]:
+    """Loads scenario specs from a YAML file with a list of specs.
+
+    Args:
+        path (Path | str): The path of the YAML file.
+
+    Returns:
+        dict[str, ScenarioSpec]: The specs, by name.
+    """
+    specs = [ScenarioSpec.from_dict(spec)
+             for spec in yaml.safe_load(Path(path).read_text()) or []]
+    return {spec.name: spec for spec in specs}
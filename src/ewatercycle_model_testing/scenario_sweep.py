@@ -0,0 +1,250 @@
+"""
+Module for sweeping scenarios over a grid of parameters.
+
+A sweep expands one scenario spec, the template, into a variant per combination of
+parameter values, for example every spike position between 10% and 90% of the
+forcing. The forcings of all variants are generated in a process pool, after which
+every variant is run on the model in parallel. Each run records the discharge of the
+model and optionally runs a check of the ScenarioTests bank on the same model run.
+
+The result is a response surface: an `xr.Dataset` with a dimension per swept
+parameter, holding a response such as the lag of the discharge peak behind the
+precipitation spike, instead of a single pass or fail.
+"""
+import itertools
+import math
+
+import numpy as np
+import xarray as xr
+
+from ewatercycle_model_testing import scenarios_util
+from ewatercycle_model_testing.executors import make_executor
+from ewatercycle_model_testing.scenario_spec import ScenarioSpec, ScenarioSpecException
+from ewatercycle_model_testing.test_suite import TestSuite
+
+
+def _set_parameter(steps: list[dict], transform: str, parameter: str, value) -> int:
+    """Sets a parameter of every step of a transform, returns the number of steps."""
+    found = 0
+    for step in steps:
+        if step.get("transform") == transform:
+            step[parameter] = value
+            found += 1
+        if "inner" in step:
+            found += _set_parameter(step["inner"], transform, parameter, value)
+    return found
+
+
+def _get_parameter(steps, transform: str, parameter: str):
+    """Gets a parameter of the first step of a transform, or None."""
+    for step in steps:
+        arguments = dict(step)
+        if arguments.get("transform") == transform and parameter in arguments:
+            return arguments[parameter]
+        if "inner" in arguments:
+            value = _get_parameter(arguments["inner"], transform, parameter)
+            if value is not None:
+                return value
+    return None
+
+
+def expand(template: ScenarioSpec,
+           grid: dict[str, list]) -> list[tuple[dict, ScenarioSpec]]:
+    """Expands a scenario spec over every combination of a grid of parameters.
+
+    Args:
+        template (ScenarioSpec): The spec the variants are derived from.
+        grid (dict[str, list]): The values of every swept parameter, by a key of the
+            form "transform.parameter", e.g. {"spike.position": [0.1, 0.5, 0.9]}.
+            The parameter is set on every step of that transform in the template.
+
+    Returns:
+        list[tuple[dict, ScenarioSpec]]: The parameters and spec of every variant.
+
+    Raises:
+        ScenarioSpecException: If a key does not match a step of the template.
+    """
+    keys = list(grid)
+    variants = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        spec = template.to_dict()
+        for (key, value) in zip(keys, values):
+            (transform, _, parameter) = key.partition(".")
+            if not parameter or not _set_parameter(spec["transforms"], transform,
+                                                   parameter, value):
+                raise ScenarioSpecException(
+                    f"Sweep key [{key}] does not match a step of [{template.name}].")
+        variants.append((dict(zip(keys, values)), ScenarioSpec.from_dict(spec)))
+    return variants
+
+
+def peak_lag(discharge: np.ndarray, spec: ScenarioSpec) -> float:
+    """Gets the number of timesteps the discharge peak lags behind the spike.
+
+    The position of the spike is taken from the spike step of the spec and scaled to
+    the length of the discharge series, so the model and forcing timesteps may differ.
+
+    Args:
+        discharge (np.ndarray): The discharge of every timestep of the model run.
+        spec (ScenarioSpec): The spec of the scenario, with a spike step.
+
+    Returns:
+        float: The lag of the peak in model timesteps.
+    """
+    position = _get_parameter(spec.transforms, "spike", "position")
+    return float(np.nanargmax(discharge) - math.floor(position * len(discharge)))
+
+
+def peak_discharge(discharge: np.ndarray, spec: ScenarioSpec) -> float:
+    """Gets the highest discharge of the model run.
+
+    Args:
+        discharge (np.ndarray): The discharge of every timestep of the model run.
+        spec (ScenarioSpec): The spec of the scenario.
+
+    Returns:
+        float: The peak discharge.
+    """
+    return float(np.nanmax(discharge))
+
+
+class _Recorder:
+    """A subscriber of a shared trajectory that records the discharge of every step.
+
+    The discharge of a timestep is the highest value of the output variable, which
+    is the outlet for a distributed model and the only value for a lumped model.
+    """
+
+    name = "_discharge_recorder"
+
+    def __init__(self):
+        """Initializes the _Recorder instance."""
+        self.discharge: list[float] = []
+        self.error: Exception | None = None
+
+    def start(self, model, output_variable_name) -> dict:
+        """Steps through the model run and records its discharge."""
+        try:
+            while model.time < model.end_time:
+                model.update()
+                discharge = np.nanmax(model.get_value(output_variable_name))
+                self.discharge.append(float(discharge))
+        except Exception as e:  # pylint:disable=broad-exception-caught
+            self.error = e
+            return {"passed": False, "reason": str(e)}
+        return {"passed": True, "reason": None}
+
+
+class _Check:
+    """A subscriber of a shared trajectory that runs the check of a test.
+
+    The bound function of the test is called directly, so running variants does not
+    change the stored result of the test in the suite.
+    """
+
+    def __init__(self, test):
+        """Initializes the _Check instance."""
+        self.name = test.name
+        self._run = test.run
+
+    def start(self, model, output_variable_name) -> dict:
+        """Runs the check on the model run."""
+        test_result = self._run(model, output_variable_name)
+        return {"passed": test_result.passed, "reason": test_result.reason,
+                "skipped": test_result.skipped}
+
+
+def run_variant(model_name, forcing, parameter_set, output_variable_name, test_name,
+                setup_variables) -> tuple[np.ndarray, dict | None]:
+    """Runs a single variant of a sweep on a fresh model instance.
+
+    Args:
+        model_name: Name of the model.
+        forcing: The forcing of the variant.
+        parameter_set: Optional parameter set of the model.
+        output_variable_name: The name of the output variable for discharge.
+        test_name: The name of the test to run on the same model run, or None.
+        setup_variables: Extra setup variables of the model.
+
+    Returns:
+        tuple[np.ndarray, dict | None]: The discharge of every timestep, and the
+            result of the test if one was given.
+    """
+    suite = TestSuite()
+    recorder = _Recorder()
+    subscribers = [recorder]
+    if test_name is not None:
+        subscribers.append(_Check(suite.get_test(test_name)))
+    result = {}
+    suite.run_shared_trajectory_thread(model_name, forcing, parameter_set,
+                                       output_variable_name, subscribers, result,
+                                       setup_variables)
+    if recorder.error is not None:
+        raise recorder.error
+    return np.asarray(recorder.discharge), result.get(test_name)
+
+
+def run_sweep(model_name, model_type, output_variable_name, template: ScenarioSpec,
+              grid: dict[str, list], response=peak_lag, test_name=None,
+              parameter_set=None, setup_variables=None, executor="threads",
+              forcing_executor="processes", max_workers=None) -> xr.Dataset:
+    """Runs a model on every variant of a scenario sweep.
+
+    Args:
+        model_name: Name of the model.
+        model_type: 'Lumped' or 'Distributed'.
+        output_variable_name: The name of the output variable for discharge.
+        template (ScenarioSpec): The spec the variants are derived from.
+        grid (dict[str, list]): The values of every swept parameter, see `expand`.
+        response (optional): A function of the discharge series and the spec of a
+            variant that gives its response. Defaults to `peak_lag`.
+        test_name (optional): The name of a test, usually of the ScenarioTests bank,
+            that is run on every variant. Defaults to None.
+        parameter_set (optional): The parameter set of the model. Defaults to None.
+        setup_variables (dict, optional): Extra setup variables of the model.
+        executor (str, optional): The executor policy the variants run on.
+            Defaults to "threads".
+        forcing_executor (str, optional): The executor policy the forcings are
+            generated on. Defaults to "processes".
+        max_workers (int, optional): The number of workers of both pools.
+
+    Returns:
+        xr.Dataset: The response surface, with a dimension per swept parameter. The
+            "response" variable is NaN for variants that raised an exception. When a
+            test is given, the "passed" variable holds whether it passed, and the
+            "skipped" variable whether it did not apply to the variant instead.
+    """
+    setup_variables = setup_variables or {}
+    variants = expand(template, grid)
+    with make_executor(forcing_executor, max_workers) as pool:
+        forcings = [pool.submit(scenarios_util.get_scenario_forcing, spec, model_type)
+                    for (_, spec) in variants]
+    forcings = [future.result() for future in forcings]
+
+    with make_executor(executor, max_workers) as pool:
+        runs = [pool.submit(run_variant, model_name, forcing, parameter_set,
+                            output_variable_name, test_name, setup_variables)
+                for forcing in forcings]
+
+    responses = np.full(len(variants), np.nan)
+    passed = np.zeros(len(variants), dtype=bool)
+    skipped = np.zeros(len(variants), dtype=bool)
+    for (index, (run, (_, spec))) in enumerate(zip(runs, variants)):
+        if run.exception() is not None:
+            continue
+        (discharge, test_result) = run.result()
+        responses[index] = response(discharge, spec)
+        if test_result is not None:
+            skipped[index] = test_result["skipped"]
+            passed[index] = test_result["passed"] and not skipped[index]
+
+    shape = [len(values) for values in grid.values()]
+    coords = {key: list(values) for (key, values) in grid.items()}
+    surface = xr.Dataset({"response": (list(grid), responses.reshape(shape))},
+                         coords=coords)
+    if test_name is not None:
+        surface["passed"] = (list(grid), passed.reshape(shape))
+        surface["skipped"] = (list(grid), skipped.reshape(shape))
+    surface.attrs["scenario"] = template.name
+    surface.attrs["response"] = response.__name__
+    return surface
@@ -2,7 +2,8 @@
 
 import math
 
-from ewatercycle_model_testing.test import Test, TestType
+from ewatercycle_model_testing.scenarios_util import SCENARIOS
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 
@@ -18,7 +19,8 @@ class ScenarioTests:
 
     @staticmethod
     @Test(description="Tests if the model outputs any discharge"
-                 " on an input with 0 precipitation", critical=False, enabled=True, test_type=TestType.LUMPED)
+                 " on an input with 0 precipitation", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["zeroes"])
     def zero_precipitation_lumped_test(model, outputvar):
         """Test if a lumped model outputs any discharge
          on an input with 0 precipitation.
@@ -38,7 +40,8 @@ class ScenarioTests:
 
     @staticmethod
     @Test(description="Tests if the model outputs any discharge on"
-                      " an input with 0 precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+                      " an input with 0 precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["zeroes"])
     def zero_precipitation_distributed_test(model, outputvar):
         """Test if a distributed model outputs any discharge
         on an input with 0 precipitation.
@@ -59,7 +62,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model outputs"
         " constant discharge on an input"
-         " with constant precipitation", critical=False, enabled=True, test_type=TestType.LUMPED)
+         " with constant precipitation", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["non_zeroes"])
     def permanent_precipitation_lumped_test(model, outputvar):
         """Test if a lumped model outputs constant discharge
          on an input with constant precipitation.
@@ -80,7 +84,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model "
     " constant discharge on an input"
-      " with constant precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+      " with constant precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["non_zeroes"])
     def permanent_precipitation_distributed_test(model, outputvar):
         """Test if a distributed model outputs constant discharge
          on an input with constant precipitation.
@@ -101,7 +106,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
             " outputs increasing discharge on an input"
-            " with increasing precipitation", critical=False, enabled=True, test_type=TestType.BOTH)
+            " with increasing precipitation", critical=False, enabled=True, test_type=TestType.BOTH,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["increasing"])
     def strict_increase_test(model, outputvar):
         """Test if a lumped model outputs increasing discharge
          on an input with increasing precipitation.
@@ -126,7 +132,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
         " outputs decreasing discharge on an input"
-       " with decreasing precipitation", critical=False, enabled=True, test_type=TestType.BOTH)
+       " with decreasing precipitation", critical=False, enabled=True, test_type=TestType.BOTH,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["decreasing"])
     def strict_decrease_test(model, outputvar):
         """Test if a lumped model outputs decreasing discharge
         on an input with decreasing precipitation.
@@ -151,7 +158,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
          " outputs correct discharge when there's periodical,"
-        " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED)
+        " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["mid_spike"])
     def proper_mid_spike_handling_lumped_test(model, outputvar):
         """Test if a lumped model outputs correct discharge
          when there's periodical, high precipitation.
@@ -177,7 +185,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
          " outputs correct discharge when there's periodical,"
-       " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+       " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["mid_spike"])
     def proper_mid_spike_handling_distributed_test(model, outputvar):
         """Test if a distributed odel outputs correct discharge
          when there's periodical, high precipitation.
@@ -202,7 +211,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
          " outputs correct discharge when there's periodical,"
-         " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED)
+         " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["start_spike"])
     def proper_start_spike_handling_lumped_test(model, outputvar):
         """Test if a lumped model outputs correct discharge
          when there's periodical, high precipitation.
@@ -228,7 +238,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
         " outputs correct discharge when there's periodical,"
-      " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+      " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["start_spike"])
     def proper_start_spike_handling_distributed_test(model, outputvar):
         """Test if a distributed model outputs correct discharge
          when there's periodical, high precipitation.
@@ -254,7 +265,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
             " outputs correct discharge when there's periodical,"
-      " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED)
+      " high precipitation", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["end_spike"])
     def proper_end_spike_handling_lumped_test(model, outputvar):
         """Test if a lumped model outputs correct discharge
          when there's periodical, high precipitation.
@@ -279,7 +291,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
             " outputs correct discharge when there's periodical,"
-        " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+        " high precipitation", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["end_spike"])
     def proper_end_spike_handling_distributed_test(model, outputvar):
         """Test if a distributed model outputs correct discharge
          when there's periodical, high precipitation.
@@ -304,7 +317,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
  " outputs correct discharge when precipitation only"
-" occurs in the first half of the input period", critical=False, enabled=True, test_type=TestType.LUMPED)
+" occurs in the first half of the input period", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["first_half_precip"])
     def first_half_precip_lumped_test(model, outputvar):
         """Test if a lumped model outputs correct discharge
              when precipitation only occurs in the first half of the input period.
@@ -332,7 +346,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model outputs"
         " correct discharge when precipitation only occurs"
-   " in the first half of the input period", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+   " in the first half of the input period", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["first_half_precip"])
     def first_half_precip_distributed_test(model, outputvar):
         """Test if a distributed model outputs correct discharge
              when precipitation only occurs in the first half of the input period.
@@ -364,7 +379,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
      " outputs correct discharge when precipitation only occurs"
-     " in the second half of the input period", critical=False, enabled=True, test_type=TestType.LUMPED)
+     " in the second half of the input period", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["second_half_precip"])
     def second_half_precip_lumped_test(model, outputvar):
         """Test if a lumped model outputs correct discharge
              when precipitation only occurs in the second half of the input period.
@@ -392,7 +408,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
   " outputs correct discharge when precipitation only occurs "
-     "in the second half of the input period", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+     "in the second half of the input period", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["second_half_precip"])
     def second_half_precip_distributed_test(model, outputvar):
         """Test if a distributed model outputs correct discharge
              when precipitation only occurs in the second half of the input period.
@@ -424,7 +441,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
      " outputs any discharge prior"
-    " to the start of the calculations", critical=False, enabled=True, test_type=TestType.LUMPED)
+    " to the start of the calculations", critical=False, enabled=True, test_type=TestType.LUMPED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["zeroes"])
     def pre_existing_discharge_lumped_test(model, outputvar):
         """Test if a lumped model outputs any discharge
          prior to the start of the calculations.
@@ -442,7 +460,8 @@ class ScenarioTests:
     @staticmethod
     @Test(description="Tests if the model"
             " outputs any discharge prior"
-     " to the start of the calculations", critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+     " to the start of the calculations", critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.SHARED_TRAJECTORY, scenario=SCENARIOS["zeroes"])
     def pre_existing_discharge_distributed_test(model, outputvar):
         """Test if a distributed model outputs any discharge
          prior to the start of the calculations.
@@ -0,0 +1,169 @@
+"""
+Module containing the vectorized transforms that turn forcing data into scenarios.
+
+A transform is a callable `transform(values, time, n_time, rng)` that alters `values`,
+an array of timesteps of a forcing variable with time as its first axis, in place.
+`time` holds the index of every timestep of `values` within the whole forcing and
+`n_time` is the number of timesteps of the whole forcing, so a transform can also be
+applied to a block of timesteps. Random values are drawn from `rng`, a seeded
+`numpy.random.Generator`, so a scenario is reproducible.
+
+All transforms are NumPy array operations over the whole `(time, ...)` array and work
+for lumped `(time,)` and distributed `(time, lat, lon)` data alike. The dtype and shape
+of `values` never change. `apply_blockwise` applies a transform lazily to a dask array
+one block of timesteps at a time, so a scenario never has to be in memory as a whole.
+"""
+#pylint:disable=unused-argument
+import math
+
+import numpy as np
+
+
+def _along_time(time: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Reshapes a time axis so it broadcasts against the values."""
+    return time.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def block_generator(seed: int | None, start: int) -> np.random.Generator:
+    """Creates the random generator for a block of timesteps.
+
+    Args:
+        seed (int | None): The seed of the scenario, None for an unseeded generator.
+        start (int): The index of the first timestep of the block.
+
+    Returns:
+        np.random.Generator: A generator that only depends on the seed and the block.
+    """
+    return np.random.default_rng(None if seed is None else [seed, start])
+
+
+def apply(transform, values: np.ndarray, seed: int | None = None) -> np.ndarray:
+    """Applies a transform to all timesteps of an array.
+
+    Args:
+        transform: The transform to apply.
+        values (np.ndarray): The values to alter in place, time as the first axis.
+        seed (int | None, optional): The seed of the random generator.
+
+    Returns:
+        np.ndarray: The altered values.
+    """
+    transform(values, np.arange(len(values)), len(values), block_generator(seed, 0))
+    return values
+
+
+def apply_blockwise(transform, array, seed: int | None = None):
+    """Applies a transform lazily to every block of timesteps of a dask array.
+
+    Every block gets its own random generator, see `block_generator`, so the result
+    does not depend on the order in which dask computes the blocks.
+
+    Args:
+        transform: The transform to apply.
+        array (dask.array.Array): The values, time as the first axis. Only the time
+            axis may be split in several chunks.
+        seed (int | None, optional): The seed of the random generator.
+
+    Returns:
+        dask.array.Array: The transformed values.
+    """
+    n_time = array.shape[0]
+
+    def transform_block(block, block_info=None):
+        start = block_info[0]["array-location"][0][0]
+        block = block.copy()
+        transform(block, np.arange(start, start + len(block)), n_time,
+                  block_generator(seed, start))
+        return block
+    return array.map_blocks(transform_block, dtype=array.dtype)
+
+
+def zeroes():
+    """Creates a transform that sets every value to zero."""
+    def transform(values, time, n_time, rng):
+        values[...] = 0
+    return transform
+
+
+def noise(low: int, high: int, scale: float):
+    """Creates a transform that replaces every value with random noise.
+
+    Args:
+        low (int): The lowest random integer, inclusive.
+        high (int): The highest random integer, exclusive.
+        scale (float): The factor the random integers are multiplied with.
+    """
+    def transform(values, time, n_time, rng):
+        values[...] = rng.integers(low, high, size=values.shape) * scale
+    return transform
+
+
+def fill_missing(low: int, high: int, scale: float):
+    """Creates a transform that replaces zero and missing values with random noise.
+
+    Args:
+        low (int): The lowest random integer, inclusive.
+        high (int): The highest random integer, exclusive.
+        scale (float): The factor the random integers are multiplied with.
+    """
+    def transform(values, time, n_time, rng):
+        missing = (values == 0) | np.isnan(values)
+        count = np.count_nonzero(missing)
+        values[missing] = rng.integers(low, high, size=count) * scale
+    return transform
+
+
+def ramp(start: float, step: float):
+    """Creates a transform that replaces the values with a linear ramp over time.
+
+    Args:
+        start (float): The value at the first timestep.
+        step (float): The change of the value per timestep.
+    """
+    def transform(values, time, n_time, rng):
+        values[...] = start + step * _along_time(time, values)
+    return transform
+
+
+def spike(position: float, height: float):
+    """Creates a transform that sets a single timestep to a spike.
+
+    Args:
+        position (float): The position of the spike as a fraction of the forcing,
+            the spike is at timestep floor(position * n_time).
+        height (float): The value of the spike.
+    """
+    def transform(values, time, n_time, rng):
+        values[time == math.floor(position * n_time)] = height
+    return transform
+
+
+def period(start: float, stop: float, inner):
+    """Creates a transform that applies another transform to a period only.
+
+    Only timesteps that lie entirely within the period are transformed, so for an odd
+    number of timesteps the middle one belongs to neither half of the forcing.
+
+    Args:
+        start (float): The start of the period as a fraction of the forcing.
+        stop (float): The end of the period as a fraction of the forcing.
+        inner: The transform to apply to the timesteps of the period.
+    """
+    def transform(values, time, n_time, rng):
+        selected = (time >= start * n_time) & (time + 1 <= stop * n_time)
+        part = values[selected]
+        inner(part, time[selected], n_time, rng)
+        values[selected] = part
+    return transform
+
+
+def chain(*transforms):
+    """Creates a transform that applies several transforms one after the other.
+
+    Args:
+        *transforms: The transforms to apply, in order.
+    """
+    def transform(values, time, n_time, rng):
+        for inner in transforms:
+            inner(values, time, n_time, rng)
+    return transform
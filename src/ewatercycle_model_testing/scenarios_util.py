@@ -3,16 +3,27 @@
 
 This module contains all the methods that are used
 to generate scenarios by altering generic forcing data.
+All scenarios are derived from a single base forcing per forcing class,
+which is generated once by a `ScenarioBuilder`. Every scenario only transforms
+the precipitation of the base forcing and writes it to a file of its own.
 """
 
-import math
-import random
+import contextlib
+import hashlib
+import os
+import threading
 from pathlib import Path
 
 import ewatercycle
+import numpy as np
 import xarray as xr
 from ewatercycle.base.forcing import GenericDistributedForcing, GenericLumpedForcing
 
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import scenario_transforms as st
+from ewatercycle_model_testing.forcing_cache import get_forcing_cache
+from ewatercycle_model_testing.scenario_spec import ScenarioSpec
+
 shape = Path(ewatercycle.__file__).parent / "testing/data/Rhine/Rhine.shp"
 cmip_dataset = {
         "dataset": "EC-Earth3",
@@ -21,6 +32,250 @@ cmip_dataset = {
         "exp": "historical",
         "ensemble": "r6i1p1f1",
     }
+SCENARIO_START_TIME: str = "2000-01-01T00:00:00Z"
+SCENARIO_END_TIME: str = "2000-12-31T00:00:00Z"
+SCENARIO_VARIABLE: str = "pr"
+
+
+class ScenarioBuilder:
+    """Derives scenario forcings from one base forcing.
+
+    The base forcing is generated (or loaded from the forcing cache) the first
+    time a scenario is built, after which every scenario only costs a transform
+    of the precipitation array and a write of that single variable.
+    Scenarios are streamed from the base file to the scenario file in chunks of
+    timesteps, so memory use does not grow with the size of the grid.
+
+    Args:
+        forcing_class: The forcing class of the scenarios, e.g. GenericLumpedForcing.
+        start_time (str, optional): The start time of the base forcing.
+            Defaults to SCENARIO_START_TIME.
+        end_time (str, optional): The end time of the base forcing.
+            Defaults to SCENARIO_END_TIME.
+        chunk_timesteps (int, optional): The number of timesteps transformed at once.
+            Defaults to c.SCENARIO_CHUNK_TIMESTEPS.
+        compression_level (int | None, optional): The zlib compression level of the
+            scenario files, None to write them uncompressed.
+            Defaults to c.SCENARIO_COMPRESSION_LEVEL.
+    """
+
+    def __init__(self, forcing_class, start_time: str = SCENARIO_START_TIME,
+                 end_time: str = SCENARIO_END_TIME,
+                 chunk_timesteps: int = c.SCENARIO_CHUNK_TIMESTEPS,
+                 compression_level: int | None = c.SCENARIO_COMPRESSION_LEVEL):
+        """Initializes the ScenarioBuilder instance."""
+        self.forcing_class = forcing_class
+        self.start_time = start_time
+        self.end_time = end_time
+        self.chunk_timesteps = chunk_timesteps
+        self.compression_level = compression_level
+        self._base = None
+        self._lock = threading.Lock()
+
+    def base(self):
+        """Gets the base forcing, generating it on first use.
+
+        Returns:
+            The base forcing all scenarios are derived from.
+        """
+        with self._lock:
+            if self._base is None:
+                self._base = get_forcing_cache().generate(
+                    self.forcing_class,
+                    dataset=cmip_dataset,
+                    start_time=self.start_time,
+                    end_time=self.end_time,
+                    shape=shape.absolute(),
+                )
+            return self._base
+
+    def build_spec(self, spec: ScenarioSpec):
+        """Builds the scenario that a spec describes.
+
+        The scenario file is named after the digest of the spec, so a scenario that
+        was built before, by this run or an earlier one, is reused as it is. It is
+        written to a temporary file first, which is renamed once it is complete, so
+        scenarios can be built concurrently and readers never see a partial file.
+
+        Args:
+            spec (ScenarioSpec): The spec of the scenario.
+
+        Returns:
+            A forcing that is equal to the base forcing, except that the
+            variable of the spec is read from the scenario file.
+        """
+        filename = self.spec_stem(spec) + ".nc"
+        if not (Path(self.base().directory) / filename).exists():
+            self._write(spec.name, spec.variable,
+                        lambda source: st.apply_blockwise(spec.compile(), source.data, spec.seed),
+                        lambda: filename)
+        return self._load(spec.variable, filename)
+
+    def spec_stem(self, spec: ScenarioSpec) -> str:
+        """Gets the name of the files of a spec, without extension.
+
+        Args:
+            spec (ScenarioSpec): The spec of the scenario.
+
+        Returns:
+            str: The name, e.g. "zeroes_0123456789abcdef".
+        """
+        digest = hashlib.sha256(f"{spec.digest()}/{self.chunk_timesteps}".encode())
+        return f"{spec.name}_{digest.hexdigest()[:16]}"
+
+    @contextlib.contextmanager
+    def _source(self, variable: str):
+        """Opens a variable of the base forcing, chunked along time only."""
+        base = self.base()
+        path = Path(base.directory) / base.filenames[variable]
+        with xr.open_dataset(path, chunks={}) as data:
+            source = data[variable]
+            chunks = {dim: -1 for dim in source.dims}
+            chunks[source.dims[0]] = self.chunk_timesteps
+            yield source.chunk(chunks)
+
+    @staticmethod
+    def _staging(directory: Path, name: str) -> Path:
+        """Gets a temporary path that no other thread or process writes to."""
+        return directory / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _write(self, name: str, variable: str, scenario_data, filename_of) -> str:
+        """Streams a scenario variable to a netCDF file next to the base forcing.
+
+        Args:
+            name (str): The name of the scenario.
+            variable (str): The variable of the scenario.
+            scenario_data: A function that gets the dask array of the scenario
+                values from the chunked base variable.
+            filename_of: A function that gets the filename once the file is written.
+
+        Returns:
+            str: The filename of the scenario file.
+        """
+        directory = Path(self.base().directory)
+        staging = self._staging(directory, name)
+        with self._source(variable) as source:
+            scenario = source.copy(data=scenario_data(source))
+            try:
+                scenario.to_dataset().to_netcdf(
+                    staging, encoding={variable: self.encoding(source)})
+                filename = filename_of()
+                os.replace(staging, directory / filename)
+            finally:
+                staging.unlink(missing_ok=True)
+        return filename
+
+    def _load(self, variable: str, filename: str):
+        """Loads a fresh copy of the base forcing that reads a variable from a file."""
+        forcing = self.forcing_class.load(Path(self.base().directory))
+        forcing.filenames[variable] = filename
+        return forcing
+
+    def encoding(self, source: xr.DataArray) -> dict:
+        """Gets the netCDF encoding of a scenario variable.
+
+        The data type and packing of the base variable are kept. Distributed data is
+        stored in chunks of a single timestep, the way models read their forcing.
+
+        Args:
+            source (xr.DataArray): The variable of the base forcing.
+
+        Returns:
+            dict: The encoding of the scenario variable.
+        """
+        encoding = {key: value for (key, value) in source.encoding.items()
+                    if key in ("dtype", "_FillValue", "scale_factor", "add_offset")}
+        if source.ndim > 1:
+            encoding["chunksizes"] = (1,) + source.shape[1:]
+        if self.compression_level:
+            encoding.update(zlib=True, complevel=self.compression_level)
+        return encoding
+
+
+_builders: dict = {}
+_builders_lock = threading.Lock()
+
+
+def get_scenario_builder(forcing_class) -> ScenarioBuilder:
+    """Gets the scenario builder that is shared by all scenarios of a forcing class.
+
+    Args:
+        forcing_class: The forcing class, e.g. GenericLumpedForcing.
+
+    Returns:
+        ScenarioBuilder: The shared builder.
+    """
+    with _builders_lock:
+        if forcing_class not in _builders:
+            _builders[forcing_class] = ScenarioBuilder(forcing_class)
+        return _builders[forcing_class]
+
+
+def _noise(scale: float) -> dict:
+    """Gets the transform step of the random noise used by the scenarios."""
+    return {"transform": "noise", "low": 1, "high": 100, "scale": scale}
+
+
+_SCENARIO_DICTS: list[dict] = [
+    {"name": "zeroes", "transforms": [{"transform": "zeroes"}]},
+    {"name": "non_zeroes", "transforms": [
+        {"transform": "fill_missing", "low": 1, "high": 100, "scale": 0.0000001}]},
+    {"name": "increasing", "transforms": [
+        {"transform": "ramp", "start": 0.0000001, "step": 0.0000001}]},
+    {"name": "decreasing", "transforms": [
+        {"transform": "ramp", "start": 0.001, "step": -0.0000001}]},
+    {"name": "mid_spike", "transforms": [
+        _noise(0.00000001),
+        {"transform": "spike", "position": 0.5, "height": 0.001}]},
+    {"name": "start_spike", "transforms": [
+        _noise(0.00000001),
+        {"transform": "spike", "position": 0.1, "height": 0.001}]},
+    {"name": "end_spike", "transforms": [
+        _noise(0.00000001),
+        {"transform": "spike", "position": 0.8, "height": 0.001}]},
+    {"name": "first_half_precip", "transforms": [
+        {"transform": "period", "start": 0, "stop": 0.5,
+         "inner": [_noise(0.0000001)]},
+        {"transform": "period", "start": 0.5, "stop": 1,
+         "inner": [{"transform": "zeroes"}]}]},
+    {"name": "second_half_precip", "transforms": [
+        {"transform": "period", "start": 0, "stop": 0.5,
+         "inner": [{"transform": "zeroes"}]},
+        {"transform": "period", "start": 0.5, "stop": 1,
+         "inner": [_noise(0.0000001)]}]},
+]
+SCENARIOS: dict[str, ScenarioSpec] = {spec["name"]: ScenarioSpec.from_dict(spec)
+                                      for spec in _SCENARIO_DICTS}
+
+
+def get_scenario_forcing(spec: ScenarioSpec, model_type: str):
+    """Gets the forcing of a scenario for a model type.
+
+    Args:
+        spec (ScenarioSpec): The spec of the scenario.
+        model_type (str): 'Lumped' or 'Distributed'.
+
+    Returns:
+        The scenario forcing, derived from the base forcing of the model type.
+    """
+    if model_type == 'Lumped':
+        return get_scenario_builder(GenericLumpedForcing).build_spec(spec)
+    return get_scenario_builder(GenericDistributedForcing).build_spec(spec)
+
+
+def load_scenario_array(forcing, variable: str = SCENARIO_VARIABLE) -> np.ndarray:
+    """Gets the values of a variable of a scenario forcing.
+
+    Args:
+        forcing: The scenario forcing.
+        variable (str, optional): The variable to read. Defaults to SCENARIO_VARIABLE.
+
+    Returns:
+        np.ndarray: The values of the variable, time as the first axis.
+    """
+    path = Path(forcing.directory) / forcing.filenames[variable]
+    with xr.open_dataset(path) as data:
+        return data[variable].values
 
 def get_correct_forcing_lumped(name):
     """
@@ -85,19 +340,7 @@ def get_zeroes_lumped_scenario():
         GenericLumpedForcing: a scenario
         in which there is no precipitation throughout the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    for a in enumerate(data['pr'].values):
-        data['pr'].values[a[0]] = 0
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['zeroes'], 'Lumped')
 
 def get_zeroes_distributed_scenario():
     """Get a scenario in which there is no precipitation
@@ -107,21 +350,7 @@ def get_zeroes_distributed_scenario():
         GenericDistributedForcing: a scenario
         in which there is no precipitation throughout the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    for a in enumerate(data['pr'].values):
-        for grid in data['pr'].values[a[0]]:
-            for i in range(0,len(grid)):
-                grid[i] = 0
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['zeroes'], 'Distributed')
 
 def get_non_zeroes_lumped_scenario():
     """Get a scenario in which there is constant precipitation
@@ -131,20 +360,7 @@ def get_non_zeroes_lumped_scenario():
         GenericLumpedForcing: a scenario
          in which there is constant precipitation throughout the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    for a in enumerate(data['pr'].values):
-        if data['pr'].values[a[0]] == 0:
-            data['pr'].values[a[0]] = random.randrange(1, 100, 1) * 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['non_zeroes'], 'Lumped')
 
 def get_non_zeroes_distributed_scenario():
     """Get a scenario in which there is constant precipitation
@@ -154,22 +370,7 @@ def get_non_zeroes_distributed_scenario():
         GenericDistributedForcing: a scenario
          in which there is constant precipitation throughout the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    for a in enumerate(data['pr'].values):
-        for grid in data['pr'].values[a[0]]:
-            for i in range(0, len(grid)):
-                if grid[i] == 0 or math.isnan(grid[i]):
-                    grid[i] = random.randrange(1, 100, 1) * 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['non_zeroes'], 'Distributed')
 
 def get_increasing_scenario():
     """Get a scenario in which precipitation increases
@@ -179,21 +380,7 @@ def get_increasing_scenario():
         GenericLumpedForcing: a scenario
          in which precipitation increases throughout the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.0000001
-    for a in enumerate(data['pr'].values):
-        data['pr'].values[a[0]] = number
-        number = number + 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['increasing'], 'Lumped')
 
 def get_decreasing_scenario():
     """Get a scenario in which precipitation decreases
@@ -203,21 +390,7 @@ def get_decreasing_scenario():
         GenericLumpedForcing: a scenario
          in which precipitation decreases throughout the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    for a in enumerate(data['pr'].values):
-        data['pr'].values[a[0]] = number
-        number = number - 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['decreasing'], 'Lumped')
 
 def get_mid_spike_lumped_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -227,26 +400,7 @@ def get_mid_spike_lumped_scenario():
         GenericLumpedForcing: a scenario in which
          there's a big precipitation spike in the middle of the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = len(data['pr'].values) / 2
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        if counter == spike:
-            data['pr'].values[a[0]] = number
-        else:
-            data['pr'].values[a[0]] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['mid_spike'], 'Lumped')
 
 def get_mid_spike_distributed_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -256,28 +410,7 @@ def get_mid_spike_distributed_scenario():
         GenericDistributedForcing: a scenario in which
          there's a big precipitation spike in the middle of the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = len(data['pr'].values) / 2
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        for grid in data['pr'].values[a[0]]:
-            for i in range(0, len(grid)):
-                if counter == spike:
-                    grid[i] = number
-                else:
-                    grid[i] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['mid_spike'], 'Distributed')
 
 def get_start_spike_lumped_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -287,26 +420,7 @@ def get_start_spike_lumped_scenario():
         GenericLumpedForcing: a scenario in which
          there's a big precipitation spike at the start of the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = math.floor(len(data['pr'].values) / 10)
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        if counter == spike:
-            data['pr'].values[a[0]] = number
-        else:
-            data['pr'].values[a[0]] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['start_spike'], 'Lumped')
 
 def get_start_spike_distributed_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -316,28 +430,7 @@ def get_start_spike_distributed_scenario():
         GenericDistributedForcing: a scenario in which
          there's a big precipitation spike at the start of the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = math.floor(len(data['pr'].values) / 10)
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        for grid in data['pr'].values[a[0]]:
-            for i in range(0, len(grid)):
-                if counter == spike:
-                    grid[i] = number
-                else:
-                    grid[i] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['start_spike'], 'Distributed')
 
 def get_end_spike_lumped_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -347,26 +440,7 @@ def get_end_spike_lumped_scenario():
         GenericLumpedForcing: a scenario in which
          there's a big precipitation spike at the end of the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = math.floor(len(data['pr'].values) * 0.8)
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        if counter == spike:
-            data['pr'].values[a[0]] = number
-        else:
-            data['pr'].values[a[0]] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['end_spike'], 'Lumped')
 
 def get_end_spike_distributed_scenario():
     """Get a scenario in which there's a big precipitation spike
@@ -376,28 +450,7 @@ def get_end_spike_distributed_scenario():
         GenericDistributedForcing: a scenario in which
         there's a big precipitation spike at the end of the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    number = 0.001
-    spike = math.floor(len(data['pr'].values) * 0.8)
-    counter = 0
-    for a in enumerate(data['pr'].values):
-        for grid in data['pr'].values[a[0]]:
-            for i in range(0, len(grid)):
-                if counter == spike:
-                    grid[i] = number
-                else:
-                    grid[i] = random.randrange(1, 100, 1) * 0.00000001
-        counter = counter + 1
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['end_spike'], 'Distributed')
 
 def get_second_half_precip_lumped_scenario():
     """Get a scenario in which precipitation only occurs
@@ -407,22 +460,7 @@ def get_second_half_precip_lumped_scenario():
         GenericLumpedForcing: a scenario in which
          precipitation only occurs in the second half of the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    length = len(data['pr'].values)
-    for a in range(math.floor(length/2)):
-        data['pr'].values[a] = 0
-    for a in range(math.ceil(length/2),length):
-        data['pr'].values[a] = random.randrange(1, 100, 1) * 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['second_half_precip'], 'Lumped')
 
 def get_second_half_precip_distributed_scenario():
     """Get a scenario in which precipitation only occurs
@@ -432,26 +470,7 @@ def get_second_half_precip_distributed_scenario():
         GenericDistributedForcing: a scenario in which
          precipitation only occurs in the second half of the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    length = len(data['pr'].values)
-    for a in range(math.floor(length/2)):
-        for grid in data['pr'].values[a]:
-            for i in range(0, len(grid)):
-                grid[i] = 0
-    for a in range(math.ceil(length/2),length):
-        for grid in data['pr'].values[a]:
-            for i in range(0, len(grid)):
-                grid[i] = random.randrange(1, 100, 1) * 0.0000001
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['second_half_precip'], 'Distributed')
 
 def get_first_half_precip_lumped_scenario():
     """Get a scenario in which precipitation only occurs
@@ -461,22 +480,7 @@ def get_first_half_precip_lumped_scenario():
         GenericLumpedForcing: a scenario in which
         precipitation only occurs in the first half of the data.
     """
-    forcing = GenericLumpedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    length = len(data['pr'].values)
-    for a in range(math.floor(length/2)):
-        data['pr'].values[a] = random.randrange(1, 100, 1) * 0.0000001
-    for a in range(math.ceil(length/2),length):
-        data['pr'].values[a] = 0
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['first_half_precip'], 'Lumped')
 
 def get_first_half_precip_distributed_scenario():
     """Get a scenario in which precipitation only occurs
@@ -486,23 +490,4 @@ def get_first_half_precip_distributed_scenario():
         GenericDistributedForcing: a scenario in which
          precipitation only occurs in the first half of the data.
     """
-    forcing = GenericDistributedForcing.generate(
-        dataset=cmip_dataset,
-        start_time="2000-01-01T00:00:00Z",
-        end_time="2000-12-31T00:00:00Z",
-        shape=shape.absolute(),
-    )
-    path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
-    data = xr.open_dataset(path)
-    length = len(data['pr'].values)
-    for a in range(math.floor(length/2)):
-        for grid in data['pr'].values[a]:
-            for i in range(0, len(grid)):
-                grid[i] = random.randrange(1, 100, 1) * 0.0000001
-    for a in range(math.ceil(length/2),length):
-        for grid in data['pr'].values[a]:
-            for i in range(0, len(grid)):
-                grid[i] = 0
-    data.to_netcdf(str(forcing.directory) + "/" + 'data.nc')
-    forcing.filenames['pr'] = 'data.nc'
-    return forcing
+    return get_scenario_forcing(SCENARIOS['first_half_precip'], 'Distributed')
@@ -0,0 +1,154 @@
+"""
+Module for running several observe-only tests on a single model run.
+
+This module provides a `SharedTrajectory` class that steps one model from its start to
+its end time while a group of tests observes it. Every subscribed test gets its own
+`TrajectoryView` of the model and runs in its own thread. A call to `update()` on a view
+blocks until every other subscriber has asked for the next timestep as well, after
+which the underlying model is updated exactly once. Tests therefore see the same
+sequence of timesteps they would see on a model of their own, while the model is only
+simulated once for the whole group.
+"""
+import threading
+
+
+class TrajectoryView:
+    """A read-only view of a model that is stepped together with other subscribers.
+
+    All attribute access is forwarded to the underlying model, except `update()`,
+    which waits for the other subscribers before the model is advanced.
+
+    Args:
+        trajectory (SharedTrajectory): The trajectory this view subscribes to.
+    """
+
+    def __init__(self, trajectory):
+        """Initializes the view and registers it as an active subscriber."""
+        self._trajectory = trajectory
+        self._attached = True
+        trajectory.attach()
+
+    @property
+    def trajectory(self):
+        """Gets the trajectory this view subscribes to.
+
+        Returns:
+            SharedTrajectory: The shared trajectory.
+        """
+        return self._trajectory
+
+    def update(self):
+        """Advances the view by one timestep of the shared model run."""
+        self._trajectory.advance()
+
+    def detach(self):
+        """Unsubscribes the view, so the other subscribers no longer wait for it.
+
+        Detaching a view that is already detached does nothing.
+        """
+        if self._attached:
+            self._attached = False
+            self._trajectory.detach()
+
+    def __getattr__(self, name):
+        """Forwards attribute access to the underlying model.
+
+        Calls of forwarded methods are serialized, so subscribers running in
+        different threads never call into the model at the same time.
+        """
+        lock = self._trajectory.read_lock
+        with lock:
+            attribute = getattr(self._trajectory.model, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            with lock:
+                return attribute(*args, **kwargs)
+        return call
+
+
+class SharedTrajectory:
+    """A single model run that is observed by several tests in lockstep.
+
+    Args:
+        model: An initialized model that the subscribed tests observe.
+    """
+
+    def __init__(self, model):
+        """Initializes the SharedTrajectory instance."""
+        self.model = model
+        self.read_lock = threading.RLock()
+        self._condition = threading.Condition()
+        self._step = 0
+        self._active = 0
+        self._waiting = 0
+        self._error: Exception | None = None
+
+    def attach(self) -> None:
+        """Registers a new active subscriber."""
+        with self._condition:
+            self._active += 1
+
+    def detach(self) -> None:
+        """Unregisters a subscriber, advancing the model if all others are waiting."""
+        with self._condition:
+            self._active -= 1
+            if 0 < self._active == self._waiting:
+                self._step_model()
+
+    def advance(self) -> None:
+        """Blocks until every active subscriber requested the next timestep.
+
+        The last subscriber to arrive updates the model and wakes up the others.
+        If updating the model raised an exception, every subscriber re-raises it,
+        just like it would have been raised by a model of its own.
+        """
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            step = self._step
+            self._waiting += 1
+            if self._waiting == self._active:
+                self._step_model()
+            else:
+                self._condition.wait_for(lambda: self._step > step)
+            if self._error is not None:
+                raise self._error
+
+    def _step_model(self) -> None:
+        """Updates the underlying model once and releases all waiting subscribers.
+
+        Must be called while holding the condition lock.
+        """
+        try:
+            with self.read_lock:
+                self.model.update()
+        except Exception as e:  # pylint:disable=broad-exception-caught
+            self._error = e
+        self._step += 1
+        self._waiting = 0
+        self._condition.notify_all()
+
+    def run(self, tests, output_variable_name, result) -> None:
+        """Runs all tests on this trajectory, each on its own view and thread.
+
+        Args:
+            tests (list[Test]): The tests that observe the model run.
+            output_variable_name (str): The name of the output variable for discharge.
+            result (dict): The dict the test results are stored in, by test name.
+        """
+        views = [TrajectoryView(self) for _ in tests]
+
+        def observe(test, view):
+            try:
+                result[test.name] = test.start(view, output_variable_name)
+            finally:
+                view.detach()
+
+        threads = [threading.Thread(target=observe, args=(test, view), daemon=True)
+                   for (test, view) in zip(tests, views)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
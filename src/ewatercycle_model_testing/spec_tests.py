@@ -8,7 +8,7 @@ import re
 import numpy as np
 import xarray  # pylint:disable=E0401
 
-from ewatercycle_model_testing.test import Test, TestType
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 
@@ -23,7 +23,7 @@ class SpecTests:
     @staticmethod
     @Test(description="tests if the model can be initialized without a"
                       " proper config file path"
-        , critical=True, enabled=False)
+        , critical=True, enabled=False, fresh_instance=True)
     def initialize_wrong_config(model, _):
         """
         tests if the model can be initialized without a proper config file path
@@ -56,7 +56,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the start time of the model is correct",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def correct_start_time(model, _):
         """
         Test that checks if the start/end time of the model is correctly implemented
@@ -73,7 +74,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if ._check_parameter_set is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_check_parameter_set(model, _):
         """
         checks if _check_parameter_set is implemented
@@ -103,7 +105,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if .parameters is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_parameters(model, _):
         """
         checks if .parameters is implemented
@@ -118,7 +121,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if .__repr_args__ is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_repr_args(model, _):
         """
         checks if .__repr_args__ is implemented
@@ -133,7 +137,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if _make_cfg_dir is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_make_cfg_dir(model, _):
         """
         checks if ._make_cfg_dir is implemented
@@ -148,7 +153,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if _make_cfg_file is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_make_cfg_file(model, _):
         """
         checks if ._make_cfg_file is implemented
@@ -163,7 +169,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if .bmi is implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_bmi(model, _):
         """
         checks if .bmi is implemented
@@ -179,7 +186,8 @@ class SpecTests:
     @Test(description="Checks if .output_var_names, "
                       ".get_value is implemented and all variables are reachable"
                       " and of type ndarray",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_vars_out_and_gets(model, _):
         """
         checks if .output_var_names, .get_value is implemented
@@ -206,7 +214,8 @@ class SpecTests:
     @staticmethod
     @Test(description="Checks if .start_time_as_isostr is implemented "
                       "and has correct format",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_start_time_as_isostr(model, _):
         """
         checks if .start_time_as_isostr is implemented and has correct format
@@ -226,7 +235,8 @@ class SpecTests:
     @staticmethod
     @Test(description="Checks if .end_time_as_isostr is implemented"
                       " and has correct format",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_end_time_as_isostr(model, _):
         """
         checks if .end_time_as_isostr is implemented and has correct format
@@ -245,7 +255,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if .time_as_isostr is implemented and has correct format",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_time_as_isostr(model, _):
         """
         checks if .time_as_isostr is implemented and has correct format
@@ -265,7 +276,8 @@ class SpecTests:
     @staticmethod
     @Test(description="Checks if "
                       ".start_time_as_datetime is implemented and has correct typing",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_start_time_as_datetime(model, _):
         """
         checks if .start_time_as_datetime is implemented and has correct typing
@@ -285,7 +297,8 @@ class SpecTests:
     @staticmethod
     @Test(description="Checks if "
                       ".end_time_as_datetime is implemented and has correct typing",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_end_time_as_datetime(model, _):
         """
         checks if .end_time_as_datetime is implemented and has correct typing
@@ -303,7 +316,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if .time_as_datetime is implemented and has correct typing",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_time_as_datetime(model, _):
         """
         checks if .time_as_datetime is implemented and has correct typing
@@ -321,7 +335,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the time step of the model is greater than 0",
-          critical=False, enabled=True)
+          critical=False, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def positive_time_step(model, _):
         """
         Checks if timestep is positive, gives a warning if it is not
@@ -338,7 +353,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the .version method of the model is correctly implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def some_version_condition(model, _):
         """
         Test if the model.version method is implemented
@@ -353,7 +369,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the .time_unit method of the model is correctly implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_time_unit_condition(model, _):
         """
         Checks if .time_units is implemented correctly
@@ -367,7 +384,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the .get_latlon_grid method of the model is correctly implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_get_lat_lon_grid(model, _):
         """
         checks if .get_latlon_grid is implemented correctly
@@ -392,7 +410,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the .get_value_as_xarray method of the model is correctly implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def has_get_value_as_x_array(model, _):
         """
         checks if .get_value_as_xarray is implemented correctly
@@ -416,7 +435,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="tests if the get_value_at_coords method is implemented properly",
-          critical=False, enabled=True, test_type=TestType.DISTRIBUTED)
+          critical=False, enabled=True, test_type=TestType.DISTRIBUTED,
+          access=ModelAccess.READ_ONLY)
     def has_get_value_at_coords(model, _):
         """
         check if .get_value_at_coords is implemented properly, does not work for lumped models
@@ -451,7 +471,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="tests if any of the model's grids have an invalid type",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def invalid_grid_type(model, _):
         """
         tests if any of the model's grids have an invalid type
@@ -472,7 +493,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="tests if any of the model's grids have are of invalid rank",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def invalid_grid_rank(model, _):
         """
         tests if any of the model's grids have are of invalid rank
@@ -489,7 +511,8 @@ class SpecTests:
 
     @staticmethod
     @Test(description="tests if the rank of the model's grids matches their type",
-          critical=True, enabled=True)
+          critical=True, enabled=True,
+          access=ModelAccess.READ_ONLY)
     def grid_type_mismatch(model, _):
         """
         tests if the rank of the model's grids matches their type
@@ -515,7 +538,7 @@ class SpecTests:
 
     @staticmethod
     @Test(description="Checks if the .finalize method of the model is correctly implemented",
-          critical=True, enabled=True)
+          critical=True, enabled=True, fresh_instance=True)
     def cannot_update_after_finalized_condition(model, _):
         """
         Test that checks if model can still do stuff after it is finalized
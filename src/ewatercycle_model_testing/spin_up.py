@@ -0,0 +1,217 @@
+"""
+Module for spinning up models once and caching their equilibrated state on disk.
+
+A hydrological model starts with empty stores, so its discharge is only meaningful
+after a spin-up period. Instead of every metric test paying for the spin-up, a model
+is stepped through a warm-up window of the forcing once and its state is captured in
+a `ModelSnapshot`. The `SpinUpCache` stores the snapshot in a file named
+after a hash of everything that determines it: the model, the parameter set, the
+forcing, the setup variables and the length of the warm-up window, so later suite runs
+skip the spin-up entirely.
+
+BMI cannot set the time of a model, so the state is restored into a model at the start
+of its forcing, as in a cyclic spin-up over the first part of the forcing.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing.forcing_cache import FileLock
+from ewatercycle_model_testing.model_snapshot import ModelSnapshot
+
+# The content digests of forcing files by their path, size and modification time, so
+# a forcing that is loaded again is not read again.
+_file_digests: dict[tuple[str, int, int], str] = {}
+_file_digests_lock = threading.Lock()
+
+
+class SpinUpException(Exception):
+    """Raised when a model that could not be spun up before is asked for again."""
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"The model could not be spun up: {reason}")
+
+
+def spin_up(model, steps: int) -> ModelSnapshot:
+    """Steps a model through a warm-up window and captures its state.
+
+    Args:
+        model: An initialized model at the start of its run.
+        steps (int): The number of timesteps of the warm-up window. The spin-up stops
+            early at the end time of the model.
+
+    Returns:
+        ModelSnapshot: The state of the model after the warm-up window.
+
+    Raises:
+        SnapshotException: If the state of the model cannot be captured.
+    """
+    for _ in range(steps):
+        if model.time >= model.end_time:
+            break
+        model.update()
+    return ModelSnapshot.take(model)
+
+
+def spin_up_steps_from_env() -> int:
+    """Gets the length of the warm-up window configured for the whole package.
+
+    Returns:
+        int: The number of timesteps in the c.SPIN_UP_STEPS_ENV environment variable,
+            0, which disables the spin-up, if it is not set.
+    """
+    return int(os.environ.get(c.SPIN_UP_STEPS_ENV) or 0)
+
+
+class SpinUpCache:
+    """A content-addressed on-disk cache of spun up model states.
+
+    Args:
+        root (Path | str | None, optional): Directory of the cache. Defaults to the
+            directory in the c.SPIN_UP_CACHE_DIR_ENV environment variable, or
+            c.SPIN_UP_CACHE_DEFAULT_DIR in the home directory.
+    """
+
+    def __init__(self, root: Path | str | None = None):
+        """Initializes the SpinUpCache instance."""
+        if root is None:
+            root = os.environ.get(c.SPIN_UP_CACHE_DIR_ENV,
+                                  Path.home() / c.SPIN_UP_CACHE_DEFAULT_DIR)
+        self.root = Path(root).absolute()
+        self.failed: dict[str, str] = {}
+
+    @staticmethod
+    def forcing_hash(forcing) -> str:
+        """Computes a hash of a forcing.
+
+        The hash covers the fields of the forcing and the name and contents of every
+        file in its directory, so a regenerated forcing with other data gets a new hash,
+        while loading a forcing, which touches its cache entry, does not.
+
+        Args:
+            forcing: The forcing.
+
+        Returns:
+            str: The hex digest.
+        """
+        digest = hashlib.sha256(type(forcing).__qualname__.encode())
+        fields = (forcing.model_dump() if hasattr(forcing, "model_dump")
+                  else getattr(forcing, "__dict__", {}))
+        digest.update(json.dumps(fields, sort_keys=True, default=str).encode())
+        directory = getattr(forcing, "directory", None)
+        if directory is not None and Path(directory).is_dir():
+            for path in sorted(Path(directory).rglob("*")):
+                if path.is_file():
+                    digest.update(f"{path.relative_to(directory)}:{file_digest(path)}".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def key(cls, model_name: str, parameter_set, forcing, setup_variables: dict,
+            steps: int) -> str:
+        """Computes the cache key of a spun up state.
+
+        Args:
+            model_name (str): The name of the model.
+            parameter_set: The parameter set of the model, or None.
+            forcing: The forcing the model is spun up on.
+            setup_variables (dict): The extra setup variables of the model.
+            steps (int): The number of timesteps of the warm-up window.
+
+        Returns:
+            str: The hex digest that names the cache entry.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "model": model_name,
+            "parameter_set": getattr(parameter_set, "name", parameter_set),
+            "forcing": cls.forcing_hash(forcing),
+            "setup_variables": setup_variables or {},
+            "steps": steps,
+        }, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        """Gets the path of the file of an entry.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Path: The path, which exists only if the entry is complete.
+        """
+        return self.root / f"{key}.npz"
+
+    def get(self, key: str, run_spin_up: Callable[[], ModelSnapshot]) -> ModelSnapshot:
+        """Gets a spun up state, spinning the model up if it is not cached yet.
+
+        The entry is locked while the model spins up, so threads and processes that
+        need the same state wait for it instead of spinning up as well. A spin-up that
+        raised is not retried by this cache, so the tests after it do not pay for it.
+
+        Args:
+            key (str): The key of the state, see `key`.
+            run_spin_up (Callable[[], ModelSnapshot]): Spins up a model and returns
+                its state, see `spin_up`.
+
+        Returns:
+            ModelSnapshot: The spun up state.
+
+        Raises:
+            SpinUpException: If spinning up the model raised before.
+        """
+        if key in self.failed:
+            raise SpinUpException(self.failed[key])
+        self.root.mkdir(parents=True, exist_ok=True)
+        with FileLock(self.root / (key + ".lock")):
+            if key in self.failed:
+                raise SpinUpException(self.failed[key])
+            if not self.path(key).exists():
+                try:
+                    state = run_spin_up()
+                except Exception as e:
+                    self.failed[key] = str(e)
+                    raise
+                state.save(self.path(key))
+            return ModelSnapshot.load(self.path(key))
+
+
+def file_digest(path: Path) -> str:
+    """Computes a hash of the contents of a file, once per version of the file.
+
+    Args:
+        path (Path): The path of the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    stat = path.stat()
+    version = (str(path.absolute()), stat.st_size, stat.st_mtime_ns)
+    with _file_digests_lock:
+        if version in _file_digests:
+            return _file_digests[version]
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    hexdigest = digest.hexdigest()
+    with _file_digests_lock:
+        _file_digests[version] = hexdigest
+    return hexdigest
+
+
+_default_cache: SpinUpCache | None = None
+
+
+def get_spin_up_cache() -> SpinUpCache:
+    """Gets the spin-up cache shared by the whole package.
+
+    Returns:
+        SpinUpCache: The shared cache, configured through environment variables.
+    """
+    global _default_cache  # pylint:disable=global-statement
+    if _default_cache is None:
+        _default_cache = SpinUpCache()
+    return _default_cache
@@ -0,0 +1,231 @@
+"""
+Module for the catalog of gauging stations that models are scored against.
+
+The stations are listed in a YAML data file, by default the `stations.yaml` file next
+to this module, or are read from the headers of a directory of GRDC station files.
+A `StationCatalog` buckets its stations in a grid of cells of a few degrees, so the
+stations inside the domain of a model are found without checking every station of
+the catalog. The metric tests are generated per station of the catalog, see the
+metric_tests module.
+"""
+import math
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import grdc_reader
+
+# The catalog that is used when c.STATION_CATALOG_ENV is not set.
+DEFAULT_CATALOG: Path = Path(__file__).parent / "stations.yaml"
+
+
+@dataclass(frozen=True)
+class Station:
+    """
+    A gauging station.
+
+    Attributes:
+        id (str): The GRDC number of the station.
+        name (str): The short name of the station, used in the names of tests.
+        lat (float): The latitude of the station in decimal degrees.
+        lon (float): The longitude of the station in decimal degrees.
+        area (float | None): The upstream catchment area in km2, if known.
+        station (str | None): The full name of the station, if known.
+        river (str | None): The river of the station, if known.
+    """
+    id: str
+    name: str
+    lat: float
+    lon: float
+    area: float | None = None
+    station: str | None = None
+    river: str | None = None
+
+    @property
+    def title(self) -> str:
+        """Gets a readable name of the station.
+
+        Returns:
+            str: The full name and GRDC number, e.g. "REES (6335020)".
+        """
+        return f"{self.station or self.name} ({self.id})"
+
+
+class StationCatalog:
+    """A set of stations with a grid-bucket spatial index.
+
+    Args:
+        stations (list[Station]): The stations, in the order tests are made for them.
+        cell_degrees (float, optional): The size of a bucket of the index in
+            degrees. Defaults to c.STATION_CATALOG_CELL_DEGREES.
+    """
+
+    def __init__(self, stations: list[Station],
+                 cell_degrees: float = c.STATION_CATALOG_CELL_DEGREES):
+        """Initializes the StationCatalog instance."""
+        self.stations = list(stations)
+        self.cell_degrees = cell_degrees
+        self._buckets: dict[tuple[int, int], list[Station]] = {}
+        for station in self.stations:
+            self._buckets.setdefault(self._cell(station.lat, station.lon),
+                                     []).append(station)
+
+    @classmethod
+    def from_yaml(cls, path: Path | str) -> "StationCatalog":
+        """Loads a catalog from a YAML file with a list of stations.
+
+        Args:
+            path (Path | str): The path of the YAML file.
+
+        Returns:
+            StationCatalog: The catalog.
+        """
+        entries = yaml.safe_load(Path(path).read_text()) or []
+        return cls([Station(**{**entry, "id": str(entry["id"])}) for entry in entries])
+
+    @classmethod
+    def from_grdc_directory(cls, directory: Path | str) -> "StationCatalog":
+        """Creates a catalog of every GRDC station file in a directory.
+
+        Files without coordinates in their header are skipped.
+
+        Args:
+            directory (Path | str): The directory with `<id>_Q_Day.Cmd.txt` files.
+
+        Returns:
+            StationCatalog: The catalog, stations are named after their GRDC number.
+        """
+        stations = []
+        for path in sorted(Path(directory).glob("*_Q_Day.Cmd.txt")):
+            with open(path, encoding="latin-1") as file:
+                header = "".join(line for line in file if line.startswith("#"))
+            fields = {match[1].strip(): match[2].strip()
+                      for match in grdc_reader.HEADER_FIELD.finditer(header)}
+            if "Latitude (DD)" not in fields or "Longitude (DD)" not in fields:
+                continue
+            area = next((value for (key, value) in fields.items()
+                         if key.startswith("Catchment area")), None)
+            station_id = fields.get("GRDC-No.", path.name.split("_")[0])
+            stations.append(Station(station_id, station_id,
+                                    float(fields["Latitude (DD)"]),
+                                    float(fields["Longitude (DD)"]),
+                                    None if area is None else float(area),
+                                    fields.get("Station"), fields.get("River")))
+        return cls(stations)
+
+    def __iter__(self):
+        return iter(self.stations)
+
+    def __len__(self):
+        return len(self.stations)
+
+    def get(self, name: str) -> Station | None:
+        """Gets a station by its name.
+
+        Args:
+            name (str): The name of the station.
+
+        Returns:
+            Station | None: The station, None if the catalog does not have it.
+        """
+        return next((station for station in self.stations if station.name == name),
+                    None)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        """Gets the bucket of a coordinate."""
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def within(self, lat_min: float, lat_max: float, lon_min: float,
+               lon_max: float) -> list[Station]:
+        """Gets the stations inside a bounding box.
+
+        Only the buckets that overlap the box are searched.
+
+        Args:
+            lat_min (float): The southern edge of the box.
+            lat_max (float): The northern edge of the box.
+            lon_min (float): The western edge of the box.
+            lon_max (float): The eastern edge of the box.
+
+        Returns:
+            list[Station]: The stations inside the box, in catalog order.
+        """
+        ((row_min, column_min), (row_max, column_max)) = (self._cell(lat_min, lon_min),
+                                                          self._cell(lat_max, lon_max))
+        found = set()
+        for row in range(row_min, row_max + 1):
+            for column in range(column_min, column_max + 1):
+                found.update(station for station in self._buckets.get((row, column), [])
+                             if lat_min <= station.lat <= lat_max
+                             and lon_min <= station.lon <= lon_max)
+        return [station for station in self.stations if station in found]
+
+    def in_domain(self, model, dischargename) -> list[Station]:
+        """Gets the stations inside the grid of an output variable of a model.
+
+        The domain is the bounding box of the cell centres of the grid, widened by
+        half a cell. Models that do not report their grid are assumed to contain
+        every station.
+
+        Args:
+            model: The model.
+            dischargename: The name of the output variable for discharge.
+
+        Returns:
+            list[Station]: The stations inside the domain, in catalog order.
+        """
+        try:
+            (grid_lat, grid_lon, _) = model.get_latlon_grid(dischargename)
+            (grid_lat, grid_lon) = (np.asarray(grid_lat, dtype=float).ravel(),
+                                    np.asarray(grid_lon, dtype=float).ravel())
+            if grid_lat.size == 0 or grid_lon.size == 0:
+                raise ValueError("The grid is empty.")
+        except Exception:  # pylint:disable=broad-exception-caught
+            return list(self.stations)
+        (lat_margin, lon_margin) = (_half_spacing(grid_lat), _half_spacing(grid_lon))
+        return self.within(np.nanmin(grid_lat) - lat_margin,
+                           np.nanmax(grid_lat) + lat_margin,
+                           np.nanmin(grid_lon) - lon_margin,
+                           np.nanmax(grid_lon) + lon_margin)
+
+    @staticmethod
+    def coordinates(stations) -> dict[str, tuple[float, float]]:
+        """Gets the coordinates of stations by name, as the station extraction takes.
+
+        Args:
+            stations: The stations.
+
+        Returns:
+            dict[str, tuple[float, float]]: The latitude and longitude by name.
+        """
+        return {station.name: (station.lat, station.lon) for station in stations}
+
+
+def _half_spacing(values: np.ndarray) -> float:
+    """Gets half of the typical distance between the coordinates of a grid."""
+    steps = np.diff(np.unique(values))
+    return float(np.median(steps)) / 2 if steps.size else 0.0
+
+
+_default_catalog: StationCatalog | None = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_station_catalog() -> StationCatalog:
+    """Gets the station catalog shared by the whole package.
+
+    Returns:
+        StationCatalog: The catalog of the file in the c.STATION_CATALOG_ENV
+            environment variable, or of DEFAULT_CATALOG.
+    """
+    global _default_catalog  # pylint:disable=global-statement
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = StationCatalog.from_yaml(
+                os.environ.get(c.STATION_CATALOG_ENV, DEFAULT_CATALOG))
+        return _default_catalog
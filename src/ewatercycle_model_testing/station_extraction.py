@@ -0,0 +1,317 @@
+"""
+Module for sampling the discharge of a model run at several gauging stations at once.
+
+The metric tests compare the discharge of a model at a station with its observations.
+Instead of stepping the model through the whole run for every station, this module
+provides a `StationExtraction` class that steps the model once and samples all
+stations on every timestep into a single `(time, station)` array. By default, the
+stations of the station catalog that lie inside the domain of the model are sampled.
+
+Tests that observe the same model, directly or through views of a shared trajectory,
+share a single extraction: the first test to ask for the discharge of a variable runs
+it, the others wait for its result, see `get_station_outputs`.
+
+The coordinates of the stations are resolved to flat indices of the grid of the
+discharge variable once per model and grid, see `get_station_indices`. Every timestep
+then only reads those cells through `get_value_at_indices`, instead of copying the
+whole grid and searching the nearest cell of every station again.
+"""
+import contextlib
+import math
+import threading
+import weakref
+
+import numpy as np
+
+from ewatercycle_model_testing import grdc_reader
+from ewatercycle_model_testing.shared_trajectory import TrajectoryView
+from ewatercycle_model_testing.station_catalog import StationCatalog, get_station_catalog
+
+
+class StationNotSampledException(Exception):
+    """Raised when the discharge of a station that was not sampled is requested."""
+    def __init__(self, station: str) -> None:
+        super().__init__(f"Station [{station}] is not inside the domain of the model.")
+
+
+def expected_steps(model) -> int:
+    """Gets the number of timesteps left until the end of a model run.
+
+    Args:
+        model: The model.
+
+    Returns:
+        int: The number of timesteps, 0 if the model does not report its time step.
+    """
+    try:
+        return max(math.ceil((model.end_time - model.time) / model.time_step), 0)
+    except (AttributeError, TypeError, ValueError, ZeroDivisionError):
+        return 0
+
+
+def model_time(model) -> np.datetime64:
+    """Gets the current time of a model.
+
+    Args:
+        model: The model.
+
+    Returns:
+        np.datetime64: The time, NaT if the model does not report it as a datetime.
+    """
+    try:
+        return grdc_reader.to_datetime64(model.time_as_datetime)
+    except Exception:  # pylint:disable=broad-exception-caught
+        return np.datetime64("NaT", "ns")
+
+
+def _model_of(model):
+    """Gets the model behind a trajectory view, or the model itself."""
+    return model.trajectory.model if isinstance(model, TrajectoryView) else model
+
+
+def resolve_station_indices(model, dischargename,
+                            stations: dict[str, tuple[float, float]]) -> np.ndarray:
+    """Resolves the coordinates of stations to the nearest cells of a grid.
+
+    Models that implement `_coords_to_indices`, like every eWaterCycle model, resolve
+    the coordinates themselves. For other models the nearest cell is looked up in the
+    grid of `get_latlon_grid`, which may be rectilinear or curvilinear.
+
+    Args:
+        model: The model.
+        dischargename: The name of the output variable for discharge.
+        stations (dict[str, tuple[float, float]]): The latitude and longitude of
+            every station, by name.
+
+    Returns:
+        np.ndarray: The flat grid index of every station, in the order of stations.
+    """
+    (lat, lon) = (np.array(values, dtype=float) for values in zip(*stations.values()))
+    coords_to_indices = getattr(model, "_coords_to_indices", None)
+    if coords_to_indices is not None:
+        indices = coords_to_indices(dischargename, lat=list(lat), lon=list(lon))
+        return np.asarray(indices, dtype=np.int64).reshape(len(stations))
+    (grid_lat, grid_lon, shape) = model.get_latlon_grid(dischargename)
+    (grid_lat, grid_lon) = (np.asarray(grid_lat, dtype=float),
+                            np.asarray(grid_lon, dtype=float))
+    if grid_lat.size == math.prod(shape):
+        distance = ((grid_lat.reshape(1, -1) - lat.reshape(-1, 1)) ** 2
+                    + (grid_lon.reshape(1, -1) - lon.reshape(-1, 1)) ** 2)
+        return np.argmin(distance, axis=1).astype(np.int64)
+    rows = np.argmin(np.abs(grid_lat.reshape(1, -1) - lat.reshape(-1, 1)), axis=1)
+    columns = np.argmin(np.abs(grid_lon.reshape(1, -1) - lon.reshape(-1, 1)), axis=1)
+    return np.ravel_multi_index((rows, columns), shape).astype(np.int64)
+
+
+_indices = weakref.WeakKeyDictionary()
+_indices_lock = threading.Lock()
+
+
+def get_station_indices(model, dischargename,
+                        stations: dict[str, tuple[float, float]]) -> np.ndarray:
+    """Gets the flat grid indices of stations, resolving them once per model and grid.
+
+    Args:
+        model: The model or trajectory view.
+        dischargename: The name of the output variable for discharge.
+        stations (dict[str, tuple[float, float]]): The latitude and longitude of
+            every station, by name.
+
+    Returns:
+        np.ndarray: The flat grid index of every station, in the order of stations.
+    """
+    target = _model_of(model)
+    key = (target.bmi.get_var_grid(dischargename), tuple(stations.items()))
+    with _indices_lock:
+        cached = _indices.setdefault(target, {})
+        if key not in cached:
+            cached[key] = resolve_station_indices(target, dischargename, stations)
+        return cached[key]
+
+
+def station_sampler(model, dischargename, stations: dict[str, tuple[float, float]]):
+    """Creates a function that reads the discharge at every station.
+
+    The sampler reads the cells of the stations through `bmi.get_value_at_indices`
+    into a reused buffer. Models without a BMI, or whose grid cannot be resolved,
+    are sampled through `get_value_at_coords` instead.
+
+    Args:
+        model: The model or trajectory view.
+        dischargename: The name of the output variable for discharge.
+        stations (dict[str, tuple[float, float]]): The latitude and longitude of
+            every station, by name.
+
+    Returns:
+        A function without arguments that returns the discharge at every station.
+    """
+    try:
+        bmi = _model_of(model).bmi
+        indices = get_station_indices(model, dischargename, stations)
+        buffer = np.empty(len(indices), dtype=np.float64)
+        read_indices = bmi.get_value_at_indices
+    except Exception:  # pylint:disable=broad-exception-caught
+        (lat, lon) = (list(values) for values in zip(*stations.values()))
+        return lambda: model.get_value_at_coords(dischargename, lon=lon, lat=lat)
+    lock = (model.trajectory.read_lock if isinstance(model, TrajectoryView)
+            else contextlib.nullcontext())
+
+    def sample():
+        with lock:
+            return read_indices(dischargename, buffer, indices)
+    return sample
+
+
+class StationExtraction:
+    """A single pass over a model run that samples the discharge at every station.
+
+    Args:
+        stations (dict[str, tuple[float, float]], optional): The latitude and
+            longitude of every station, by name. Defaults to the stations of the
+            station catalog inside the domain of the model.
+    """
+
+    def __init__(self, stations: dict[str, tuple[float, float]] | None = None):
+        """Initializes the StationExtraction instance."""
+        self.stations = None if stations is None else dict(stations)
+        self.output: np.ndarray | None = None
+        self.times: np.ndarray | None = None
+        self.error: Exception | None = None
+        self._done = threading.Event()
+
+    def run(self, model, dischargename) -> np.ndarray:
+        """Steps the model to its end and samples every station on every timestep.
+
+        The output array is preallocated for the expected number of timesteps and
+        only grows when the model takes more timesteps than it reported. The time of
+        every timestep is stored in `times`, NaT for models that do not report it.
+
+        Args:
+            model: The model to step.
+            dischargename: The name of the output variable for discharge.
+
+        Returns:
+            np.ndarray: The discharge, with a row per timestep and a column per
+                station in the order of `stations`.
+        """
+        try:
+            if self.stations is None:
+                self.stations = StationCatalog.coordinates(
+                    get_station_catalog().in_domain(model, dischargename))
+            sample = station_sampler(model, dischargename, self.stations)
+            output = np.empty((expected_steps(model), len(self.stations)))
+            times = np.empty(len(output), dtype="datetime64[ns]")
+            step = 0
+            while model.time < model.end_time:
+                model.update()
+                if step == len(output):
+                    output = np.resize(output, (max(2 * step, 1), len(self.stations)))
+                    times = np.resize(times, len(output))
+                output[step] = np.ravel(sample())
+                times[step] = model_time(model)
+                step += 1
+            (self.output, self.times) = (output[:step], times[:step])
+        except Exception as e:
+            self.error = e
+            raise
+        finally:
+            self._done.set()
+        return self.output
+
+    def wait(self) -> np.ndarray:
+        """Waits until the extraction is done.
+
+        Returns:
+            np.ndarray: The discharge at every station, see `run`.
+
+        Raises:
+            Exception: The exception that the extraction raised, if any.
+        """
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.output
+
+    def column(self, station: str) -> np.ndarray:
+        """Gets the discharge at a single station.
+
+        Args:
+            station (str): The name of the station.
+
+        Returns:
+            np.ndarray: The discharge at the station on every timestep.
+
+        Raises:
+            StationNotSampledException: If the station was not sampled.
+        """
+        output = self.wait()
+        if station not in self.stations:
+            raise StationNotSampledException(station)
+        return output[:, list(self.stations).index(station)]
+
+
+_extractions = weakref.WeakKeyDictionary()
+_extractions_lock = threading.Lock()
+
+
+def get_station_extraction(model, dischargename) -> StationExtraction:
+    """Gets the extraction of a model run, running it if no other test did.
+
+    Views of the same shared trajectory share a single extraction. A view that waits
+    for the extraction of another view is detached first, so the model is not held
+    back by a subscriber that no longer steps it.
+
+    Args:
+        model: The model or trajectory view to sample.
+        dischargename: The name of the output variable for discharge.
+
+    Returns:
+        StationExtraction: The finished extraction.
+
+    Raises:
+        Exception: The exception that the extraction raised, if any.
+    """
+    key = model.trajectory if isinstance(model, TrajectoryView) else model
+    with _extractions_lock:
+        try:
+            extractions = _extractions.setdefault(key, {})
+        except TypeError:
+            extractions = {}
+        extraction = extractions.get(dischargename)
+        owner = extraction is None
+        if owner:
+            extraction = extractions[dischargename] = StationExtraction()
+    if owner:
+        extraction.run(model, dischargename)
+    else:
+        if isinstance(model, TrajectoryView):
+            model.detach()
+        extraction.wait()
+    return extraction
+
+
+def get_station_outputs(model, dischargename) -> np.ndarray:
+    """Gets the discharge at every station inside the domain in a single pass.
+
+    Args:
+        model: The model or trajectory view to sample.
+        dischargename: The name of the output variable for discharge.
+
+    Returns:
+        np.ndarray: The discharge, with a row per timestep and a column per station.
+    """
+    return get_station_extraction(model, dischargename).wait()
+
+
+def get_station_output(model, dischargename, station: str) -> np.ndarray:
+    """Gets the discharge at a single station, from the shared extraction.
+
+    Args:
+        model: The model or trajectory view to sample.
+        dischargename: The name of the output variable for discharge.
+        station (str): The name of a station of the station catalog.
+
+    Returns:
+        np.ndarray: The discharge at the station on every timestep.
+    """
+    return get_station_extraction(model, dischargename).column(station)
@@ -14,6 +14,7 @@ from ewatercycle_model_testing import constants as c
 from ewatercycle.base.model import eWaterCycleModel
 from typing_extensions import Self
 
+from ewatercycle_model_testing.scenario_spec import ScenarioSpec
 from ewatercycle_model_testing.test_result import TestResult
 
 
@@ -62,6 +63,19 @@ class TestType(Enum):
     DISTRIBUTED = 2
     BOTH = 3
 
+class ModelAccess(Enum):
+    """How a test uses the model instance it is given.
+
+    ISOLATED tests get a freshly set up and initialized model of their own.
+    SHARED_TRAJECTORY tests only step the model and read its output, so all of them
+    that share a forcing can subscribe to a single model run.
+    READ_ONLY tests only read an initialized model and leave it as it was, so they can
+    run one after the other on a single warm model instance.
+    """
+    ISOLATED = 1
+    SHARED_TRAJECTORY = 2
+    READ_ONLY = 3
+
 class Test:
     """A class to represent a test.
 
@@ -76,6 +90,18 @@ class Test:
         critical (bool, optional): Indicates if the test is critical. Defaults to False.
         enabled (bool, optional): Indicates if the test is enabled. Defaults to True.
         run (Callable, optional): Function to run the test. Defaults to None.
+        access (ModelAccess, optional): How the test uses its model instance.
+            Defaults to ModelAccess.ISOLATED.
+        scenario (ScenarioSpec | None, optional): The spec of the scenario forcing the
+            test runs on, for scenario tests. Defaults to None.
+        spin_up (bool, optional): Indicates if the test starts from a spun up model
+            instead of from its initial state, see the spin_up module. Defaults to
+            False.
+        fresh_instance (bool, optional): Indicates if the test initializes or
+            finalizes its model, so it runs on a model instance that no other test
+            uses, see TestSuite.plan_work. Defaults to False.
+        timeout (float | None, optional): Seconds the test may take before its model
+            is stopped. Defaults to None, the timeout of its test bank or the suite.
     """
 
     boundInstances: dict[str, Self] = {}
@@ -88,8 +114,12 @@ class Test:
             enabled: bool = True,
             run: Callable[[eWaterCycleModel, str], TestResult] | None = None,
             location: str = "ReesGermany",
-            test_type: TestType = TestType.BOTH
-
+            test_type: TestType = TestType.BOTH,
+            access: ModelAccess = ModelAccess.ISOLATED,
+            scenario: ScenarioSpec | None = None,
+            spin_up: bool = False,
+            fresh_instance: bool = False,
+            timeout: float | None = None
         ):
         """Initializes the Test instance with optional parameters."""
         self._name: str | None = None
@@ -106,6 +136,11 @@ class Test:
         self.location = location
         self.test_result: TestResult | None = None
         self.type: TestType = test_type
+        self.access: ModelAccess = access
+        self.scenario: ScenarioSpec | None = scenario
+        self.spin_up: bool = spin_up
+        self.fresh_instance: bool = fresh_instance
+        self.timeout: float | None = timeout
 
     @property
     def name(self) -> str | None:
@@ -197,7 +232,7 @@ class Test:
 
         Returns:
             dict: The result of the test. With values for the keys: name, description,
-                critical, enabled, passed, and reason.
+                critical, enabled, passed, skipped, and reason.
 
         Raises:
             UnboundTestException: If the test is not bound to a function.
@@ -209,15 +244,47 @@ class Test:
         # Retrieve the test result using the bound function.
         self.test_result = self._run(model, discharge_name)
 
+        return self.result_dict(self.test_result.passed, self.test_result.reason,
+                                skipped=self.test_result.skipped)
+
+    def skip(self, reason: str) -> dict:
+        """Marks the test as not run, e.g. because the suite stopped early. A test
+        that does not apply to the model reports itself as skipped through the
+        skipped attribute of its TestResult instead.
+
+        Args:
+            reason (str): Why the test was skipped.
+
+        Returns:
+            dict: The result of the test, like `start`, with skipped set to True.
+        """
+        self.test_result = None
+        return self.result_dict(False, reason, skipped=True)
+
+    def result_dict(self, passed: bool, reason: str, skipped: bool = False) -> dict:
+        """Makes the dict that reports the result of the test.
+
+        Args:
+            passed (bool): Whether the test passed.
+            reason (str): The reason for the test result.
+            skipped (bool, optional): Whether the test was skipped instead of run.
+                Defaults to False.
+
+        Returns:
+            dict: The result of the test.
+        """
         return {
             "name": self.name,
             "description": self.description,
             "critical": self.critical,
             "enabled": self.enabled,
-            "passed": self.test_result.passed,
-            "reason": self.test_result.reason,
+            "passed": passed,
+            "skipped": skipped,
+            "reason": reason,
         }
 
     def __str__(self):
-        return f"Test(name={self.name}, critical={self.critical}, enabled={self.enabled}, test_type={self.type})"
+        return (f"Test(name={self.name}, critical={self.critical}, enabled={self.enabled}, "
+                f"test_type={self.type}, access={self.access}, spin_up={self.spin_up}, "
+                f"fresh_instance={self.fresh_instance})")
 
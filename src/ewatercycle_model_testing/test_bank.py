@@ -5,7 +5,8 @@ This module provides a `TestBank` class to group and manage tests, enabling or d
 It also defines a set of exceptions for handling various errors related to test banks.
 """
 
-from typing import Any
+import threading
+from typing import Any, Callable, Iterable
 
 from typing_extensions import Self  # pylint:disable=import-error
 
@@ -41,20 +42,54 @@ class TestBank:
     Args:
         name (str | None, optional): The name of the test bank. Defaults to None.
         description (str | None, optional): The description of the test bank. Defaults to None.
+        timeout (float | None, optional): Seconds every test in the test bank without
+            a timeout of its own may take. Defaults to None.
+        loader (Callable[[], Iterable[Test]] | None, optional): Creates tests that are
+            added to the test bank the first time its tests are read, e.g. tests that
+            depend on a file that should not be read on import. Defaults to None.
     """
 
     # Class attribute, contains all TestBank instances that have been assigned a name.
     boundInstances: dict[str, Self] = {}
 
-    def __init__(self, name: str | None=None, description: str | None=None):
+    def __init__(self, name: str | None=None, description: str | None=None,
+                 timeout: float | None=None, loader: Callable[[], Iterable[Test]] | None=None):
         """Initializes the TestBank instance with optional parameters."""
         self._name: str | None = None
-        self.tests: list[Test] = []
+        self._tests: list[Test] = []
+        self._loader = loader
+        self._loader_lock = threading.Lock()
 
         if name:
             self.name = name
 
         self.description: str | None = description
+        self.timeout: float | None = timeout
+
+    @property
+    def tests(self) -> list[Test]:
+        """Gets the tests of the test bank, adding the tests of its loader the first time.
+
+        Returns:
+            list[Test]: The tests of the test bank.
+        """
+        if self._loader is not None:
+            with self._loader_lock:
+                if self._loader is not None:
+                    for test in self._loader():
+                        self.add(test)
+                    self._loader = None
+        return self._tests
+
+    def add(self, test: Test) -> None:
+        """Adds a test to the test bank, giving it the timeout of the test bank if it has none.
+
+        Args:
+            test (Test): The test to add.
+        """
+        self._tests.append(test)
+        if test.timeout is None:
+            test.timeout = self.timeout
 
     @property
     def name(self):
@@ -118,7 +153,7 @@ class TestBank:
             if isinstance(possible_test, Test):
 
                 # If so, add it to the list of tests inside this TestBank.
-                self.tests.append(possible_test)
+                self.add(possible_test)
 
         # Return the TestBank instance.
         return self
@@ -51,9 +51,12 @@ class GenerateReport:
                 critical = results.get(i).get('critical')
                 enabled = results.get(i).get('enabled')
                 passed = results.get(i).get('passed')
+                skipped = results.get(i).get('skipped', False)
                 reason = results.get(i).get('reason').replace("_", "\\_")
 
-                if passed:
+                if skipped:
+                    color = "gray"
+                elif passed:
                     color = "green"
                 else:
                     if critical:
@@ -66,6 +69,8 @@ class GenerateReport:
                 md_content += f"**Critical:** {critical}\n\n"
                 md_content += f"**Enabled:** {enabled}\n\n"
                 md_content += f"**Passed:** {passed}\n\n"
+                if skipped:
+                    md_content += f"**Skipped:** {skipped}\n\n"
                 md_content += f"**Reason:** {reason}\n\n"
                 if os.path.isfile(os.path.join(directory, results.get(i).get('name')+".png")):
                     md_content += "<img src="+ name + ".png width=350 height=300>\n"
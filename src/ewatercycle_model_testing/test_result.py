@@ -4,7 +4,9 @@ Module for managing test results.
 This module provides a `TestResult` data class to represent the outcome of tests.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 import ewatercycle_model_testing.constants as c
 
@@ -18,11 +20,21 @@ class TestResult:
         passed (bool): Indicates whether the test passed.
         reason (str): The reason or message associated with the test result.
             Defaults to c.PASS_MESSAGE.
+        metrics (np.ndarray | None): Detailed scores of the test, e.g. per year, as a
+            structured array, see the metrics module. Defaults to None.
+        skipped (bool): Indicates whether the test did not apply to the model, e.g.
+            because the model does not cover its station. Defaults to False.
 
     Args:
         passed (bool): Whether the test passed.
         reason (str, optional): The reason for the test result.
             Defaults to c.PASS_MESSAGE.
+        metrics (np.ndarray | None, optional): Detailed scores of the test.
+            Defaults to None.
+        skipped (bool, optional): Whether the test did not apply to the model.
+            Defaults to False.
     """
     passed: bool
     reason: str = c.PASS_MESSAGE
+    metrics: np.ndarray | None = field(default=None, compare=False, repr=False)
+    skipped: bool = False
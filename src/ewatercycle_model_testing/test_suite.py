@@ -2,14 +2,19 @@
 This module defines the 'TestSuite' class,
 a singleton responsible for managing and running a suite of tests.
 It provides functionality to enable/disable tests,
-run tests on separate threads, and handle critical tests separately.
+run tests on separate threads, let observe-only tests share a single model run,
+let read-only tests share warm model instances, restore isolated tests from a
+snapshot of an initialized model, start metric tests from a cached
+spun up state, stop tests that run past their timeout, and handle critical tests
+first.
 """
 #pylint:disable=no-member
 
+import logging
 import os
 import shutil
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, as_completed
 from pathlib import Path
 
 import ewatercycle  # pylint:disable=import-error
@@ -24,9 +29,29 @@ from ewatercycle_model_testing import (
     scenarios_util,
     spec_tests,
 )
+from ewatercycle_model_testing.executors import default_worker_count, make_executor
+from ewatercycle_model_testing.killable_worker import KillableWorker
+from ewatercycle_model_testing.model_snapshot import ModelSnapshot
+from ewatercycle_model_testing.render_queue import get_render_queue
 from ewatercycle_model_testing.run_model_util import RunModelUtil
-from ewatercycle_model_testing.test import Test, TestType
+from ewatercycle_model_testing.shared_trajectory import SharedTrajectory
+from ewatercycle_model_testing.spin_up import (
+    SpinUpCache,
+    SpinUpException,
+    get_spin_up_cache,
+    spin_up,
+    spin_up_steps_from_env,
+)
+from ewatercycle_model_testing.test import ModelAccess, Test, TestType
 from ewatercycle_model_testing.test_bank import TestBank
+from ewatercycle_model_testing.test_result import TestResult
+
+logger = logging.getLogger(__name__)
+
+# The relative cost of a unit of work by the ModelAccess of its tests, cheap units
+# start first: read-only tests share an initialized model, isolated tests each run
+# on a restored model and observe-only tests share a run of the whole forcing.
+SCHEDULE_COST = {ModelAccess.READ_ONLY: 0, ModelAccess.ISOLATED: 1, ModelAccess.SHARED_TRAJECTORY: 2}
 
 
 class TestSuite:
@@ -51,10 +76,22 @@ class TestSuite:
         if cls.__instance is None:
             cls.__instance = super(TestSuite, cls).__new__(cls)
             cls.__instance.version = c.VERSION
-            cls.__instance.tests = Test.boundInstances
             cls.__instance.test_banks = TestBank.boundInstances
         return cls.__instance
 
+    @property
+    def tests(self) -> dict[str, Test]:
+        """
+        Gets all bound Test instances by name. The tests of every test bank are read
+        first, so the tests a test bank adds lazily, see TestBank, are bound as well.
+
+        Returns:
+            dict[str, Test]: All bound Test instances.
+        """
+        for test_bank in list(self.test_banks.values()):
+            _ = test_bank.tests
+        return Test.boundInstances
+
     def get_test(self, name: str) -> Test:
         """
         Retrieves a test by its name.
@@ -101,6 +138,95 @@ class TestSuite:
         for test in self.tests.values():
             test.enabled = False
 
+    @staticmethod
+    def make_model_instance(model_name, forcing, parameter_set):
+        """
+        Creates a new, not yet set up, instance of the model.
+
+        Args:
+            model_name: Name of the model
+            forcing: Forcing data to be used by the model
+            parameter_set: Optional parameter_set for a model
+
+        Returns:
+            A model instance, or the mock with that name when testing.
+        """
+        try:
+            if parameter_set is None:
+                return ewatercycle.models.sources[model_name](forcing=forcing)
+            return ewatercycle.models.sources[model_name](parameter_set=parameter_set, forcing=forcing)
+        except Exception:  # pylint:disable=broad-exception-caught
+            # Used for testing.
+            return {
+                "basicbmimock": mocks.BasicModelMockWithBmi(),
+                "basicmock": mocks.BasicModelMock(),
+                "worstmock": mocks.worstModelMock(),
+                "faultyinitmock": mocks.FaultyInitMock(),
+                "faultytimemock": mocks.FaultyTimeMock(),
+                "badvarmock": mocks.BadVariablesMock(),
+                "wrongunitsmock": mocks.WrongUnitsBmiMock(),
+            }[model_name]
+
+    def start_model(self, model_name, forcing, parameter_set, setup_variables, cfg_dir, spin_up_steps = 0):
+        """
+        creates, sets up and initializes a model instance in cfg_dir.
+
+        With spin_up_steps, the model starts from the state it has after that many
+        timesteps on its forcing instead of from its empty initial state, see
+        warm_start.
+
+        Returns:
+            The initialized model instance.
+        """
+        model_instance = self.make_model_instance(model_name, forcing, parameter_set)
+        cfg_file, _ = model_instance.setup(end_time=forcing.end_time, cfg_dir=(cfg_dir), **setup_variables)
+        model_instance.initialize(cfg_file)
+        if spin_up_steps and not self.warm_start(model_instance, model_name, forcing, parameter_set, setup_variables, spin_up_steps):
+            # The model is in an unknown state after a failed restore, so start cold.
+            finalize_quietly(model_instance)
+            shutil.rmtree(cfg_dir, ignore_errors=True)
+            return self.start_model(model_name, forcing, parameter_set, setup_variables, cfg_dir)
+        return model_instance
+
+    def warm_start(self, model_instance, model_name, forcing, parameter_set, setup_variables, spin_up_steps) -> bool:
+        """
+        restores the spun up state of the model into an initialized model instance.
+
+        The state comes from the spin-up cache. On a miss, a model of its own is spun
+        up for spin_up_steps timesteps and its state is stored in the cache, so the
+        next test and the next run of the suite skip the spin-up.
+
+        A model that cannot be spun up is left at its initial state. The error is
+        logged once, and the spin-up is not tried again for the next tests, see
+        SpinUpCache.get.
+
+        Returns:
+            bool: False if the state was restored but did not round-trip, which leaves
+                the model in an unknown state. True if it was restored, or if the model
+                cannot be spun up and was left at its initial state.
+        """
+        def run_spin_up():
+            thread_dir = os.path.join(os.getcwd(), thread_dir_name()) + "spin_up"
+            spin_up_instance = None
+            try:
+                spin_up_instance = self.start_model(model_name, forcing, parameter_set, setup_variables, thread_dir)
+                return spin_up(spin_up_instance, spin_up_steps)
+            finally:
+                if spin_up_instance is not None:
+                    finalize_quietly(spin_up_instance)
+                shutil.rmtree(thread_dir, ignore_errors=True)
+
+        try:
+            key = SpinUpCache.key(model_name, parameter_set, forcing, setup_variables, spin_up_steps)
+            state = get_spin_up_cache().get(key, run_spin_up)
+        except SpinUpException:
+            return True
+        except Exception:  # pylint:disable=broad-exception-caught
+            logger.warning("Could not spin up %s, its tests start cold.", model_name, exc_info=True)
+            return True
+        # BMI cannot set the time, so the model keeps the start time of its forcing.
+        return state.restores_into(model_instance, check_time=False)
+
     # """
     # Runs a test on a single thread, as tests are isolated and new directories
     # made are based on thread id they will not interfere with each other.
@@ -113,44 +239,403 @@ class TestSuite:
     # @param paths: The path of the new thread_(thread_id) directory made by refreshing a model
     # @param setup_variables: Optional extra necessary setup variables for a model
     # """
-    def run_test_thread(self, model_name, forcing, parameter_set, output_variable_name, test, result, setup_variables):
+    def run_test_thread(self, model_name, forcing, parameter_set, output_variable_name, test, result, setup_variables, spin_up_steps = 0):
         """
         runs a single test in a tread on a specific model instance
         """
+        thread_dir = os.path.join(os.getcwd(), thread_dir_name()) + test.name
+        model_instance = None
         try:
-            if parameter_set is None:
-                model_instance = ewatercycle.models.sources[model_name](forcing=forcing)
-            else:
-                model_instance = ewatercycle.models.sources[model_name](parameter_set=parameter_set, forcing=forcing)
-        except:
-            # Used for testing.
-            model_instance = {
-                "basicbmimock": mocks.BasicModelMockWithBmi(),
-                "basicmock": mocks.BasicModelMock(),
-                "worstmock": mocks.worstModelMock(),
-                "faultyinitmock": mocks.FaultyInitMock(),
-                "faultytimemock": mocks.FaultyTimeMock(),
-                "badvarmock": mocks.BadVariablesMock(),
-                "wrongunitsmock": mocks.WrongUnitsBmiMock(),
-            }[model_name]
+            model_instance = self.start_model(model_name, forcing, parameter_set, setup_variables, thread_dir, spin_up_steps)
+            result[test.name] = test.start(model_instance, output_variable_name)
+        finally:
+            # finalize the model, also when the test raised or was stopped.
+            if model_instance is not None:
+                finalize_quietly(model_instance)
+            # remove the created thread directory if it exists.
+            shutil.rmtree(thread_dir, ignore_errors=True)
+
+    def run_shared_trajectory_thread(self, model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables, spin_up_steps = 0):
+        """
+        runs a group of observe-only tests in a thread on a single model instance.
 
-        thread_dir = os.path.join(os.getcwd(), "thread_" + str(threading.get_ident())) + test.name
+        The model is stepped once from start to end, every test observes the same run
+        through its own view of the model, see `SharedTrajectory`.
+        """
+        thread_dir = os.path.join(os.getcwd(), thread_dir_name()) + "shared_trajectory"
+        model_instance = None
         try:
-            cfg_file, cfg_dir = model_instance.setup(end_time=forcing.end_time, cfg_dir=(thread_dir), **setup_variables)
-            model_instance.initialize(cfg_file)
-            result[test.name] = test.start(model_instance, output_variable_name)
-            # attempt to finalize model if it hasn't been already
-            try:
-                model_instance.finalize()
-            except:
-                pass
+            model_instance = self.start_model(model_name, forcing, parameter_set, setup_variables, thread_dir, spin_up_steps)
+            SharedTrajectory(model_instance).run(tests, output_variable_name, result)
+        finally:
+            # finalize the model, also when a test raised or was stopped.
+            if model_instance is not None:
+                finalize_quietly(model_instance)
+            # remove the created thread directory if it exists.
+            shutil.rmtree(thread_dir, ignore_errors=True)
+
+    def run_read_only_thread(self, model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables):
+        """
+        runs a group of read-only tests one after the other in a thread on a single
+        model instance, which is set up and initialized once instead of once per test.
+
+        A test that raises fails, see record_error, and leaves the model in an
+        unknown state, so the tests after it get a new instance.
+        """
+        thread_dir = os.path.join(os.getcwd(), thread_dir_name()) + "read_only"
+        model_instance = None
+        try:
+            for test in tests:
+                if model_instance is None:
+                    model_instance = self.start_model(model_name, forcing, parameter_set, setup_variables, thread_dir)
+                try:
+                    result[test.name] = test.start(model_instance, output_variable_name)
+                except Exception as e:  # pylint:disable=broad-exception-caught
+                    self.record_error(test, result, e)
+                    finalize_quietly(model_instance)
+                    model_instance = None
+                    shutil.rmtree(thread_dir, ignore_errors=True)
         finally:
+            # finalize the model, also when a test was stopped.
+            if model_instance is not None:
+                finalize_quietly(model_instance)
             # remove the created thread directory if it exists.
-            shutil.rmtree(thread_dir)
+            shutil.rmtree(thread_dir, ignore_errors=True)
+
+    def run_isolated_group_thread(self, model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables, spin_up_steps = 0):
+        """
+        runs a group of isolated tests one after the other in a thread, every test
+        starting from the state the model had right after initialization.
+
+        The state of the first initialized, and possibly spun up, model is captured
+        in a ModelSnapshot.
+        After a test, the snapshot is restored into the model, which is reused for the
+        next test only if its time and variables round-trip. Otherwise, or if the model
+        cannot be captured at all, the next test gets a freshly initialized model. A
+        model is never reused after a test with fresh_instance, which may have
+        initialized or finalized it, or after a test that raised, which fails, see
+        record_error.
+        """
+        thread_dir = os.path.join(os.getcwd(), thread_dir_name()) + "isolated"
+        model_instance = None
+        snapshot = None
+        previous = None
+        try:
+            for test in tests:
+                if model_instance is not None and (previous.fresh_instance or not (
+                        snapshot is not None and snapshot.restores_into(model_instance))):
+                    finalize_quietly(model_instance)
+                    model_instance = None
+                    shutil.rmtree(thread_dir, ignore_errors=True)
+                if model_instance is None:
+                    model_instance = self.start_model(model_name, forcing, parameter_set, setup_variables, thread_dir, spin_up_steps)
+                    if snapshot is None:
+                        snapshot = ModelSnapshot.try_take(model_instance)
+                previous = test
+                try:
+                    result[test.name] = test.start(model_instance, output_variable_name)
+                except Exception as e:  # pylint:disable=broad-exception-caught
+                    self.record_error(test, result, e)
+                    finalize_quietly(model_instance)
+                    model_instance = None
+                    shutil.rmtree(thread_dir, ignore_errors=True)
+        finally:
+            # finalize the model, also when a test was stopped.
+            if model_instance is not None:
+                finalize_quietly(model_instance)
+            # remove the created thread directory if it exists.
+            shutil.rmtree(thread_dir, ignore_errors=True)
+
+    @staticmethod
+    def record_error(test, result, error) -> None:
+        """
+        gives a test that could not finish, because it or its model raised, a failed
+        TestResult with c.UNIT_ERROR_MESSAGE.
+        """
+        reason = c.UNIT_ERROR_MESSAGE.format(error)
+        test.test_result = TestResult(False, reason)
+        result[test.name] = test.result_dict(False, reason)
+
+    def run_group(self, access, model_name, forcing, parameter_set, output_variable_name, test_names, setup_variables, spin_up_steps = 0, result = None):
+        """
+        runs one unit of work of run_all and returns its results instead of
+        writing them into a shared dict, so it can also be run in another process.
+
+        Args:
+            access: The ModelAccess of the tests. SHARED_TRAJECTORY tests share a
+                single model run, READ_ONLY tests share a single model instance and
+                several ISOLATED tests reuse a model restored from a snapshot.
+            test_names: The names of the tests to run.
+            spin_up_steps: The number of timesteps the model is spun up for before
+                the tests start, if all tests ask for a spun up model. 0 starts the
+                model from its initial state.
+            result: The dict the result dicts are written into as soon as a test
+                finishes. Defaults to a new dict.
+
+        Returns:
+            tuple[dict, dict]: The result dicts and the TestResults, both by test name.
+        """
+        result = {} if result is None else result
+        tests = [self.get_test(name) for name in test_names]
+        if not all(test.spin_up for test in tests):
+            spin_up_steps = 0
+        if access == ModelAccess.SHARED_TRAJECTORY:
+            self.run_shared_trajectory_thread(model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables, spin_up_steps)
+        elif access == ModelAccess.READ_ONLY:
+            self.run_read_only_thread(model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables)
+        elif len(tests) > 1:
+            self.run_isolated_group_thread(model_name, forcing, parameter_set, output_variable_name, tests, result, setup_variables, spin_up_steps)
+        else:
+            self.run_test_thread(model_name, forcing, parameter_set, output_variable_name, tests[0], result, setup_variables, spin_up_steps)
+        return result, {name: self.get_test(name).test_result for name in result}
+
+    @staticmethod
+    def prepare_scenarios(tests, model_type, executor = "threads", max_workers = None) -> dict:
+        """
+        builds the scenario forcings of the given scenario tests on a thread pool.
+
+        Tests that reference a ScenarioSpec get the forcing of that spec, and tests
+        that reference the same spec share a single forcing. Tests without a spec get
+        a forcing based on their name. Scenarios are written to files of their own,
+        so they can be built concurrently. The serial executor policy builds them one
+        after the other instead.
+
+        returns a dict with the forcing of every test, by test name.
+        """
+        if model_type == 'Lumped':
+            prepare = scenarios_util.get_correct_forcing_lumped
+        else:
+            prepare = scenarios_util.get_correct_forcing_distributed
+        policy = "serial" if executor == "serial" else "threads"
+        with make_executor(policy, max_workers) as pool:
+            unique = dict.fromkeys(test.scenario for test in tests if test.scenario is not None)
+            specs = {spec: pool.submit(scenarios_util.get_scenario_forcing, spec, model_type)
+                     for spec in unique}
+            futures = {test.name: specs[test.scenario] if test.scenario is not None
+                       else pool.submit(prepare, test.name) for test in tests}
+        return {name: future.result() for (name, future) in futures.items()}
+
+    @staticmethod
+    def is_applicable(test, model_type) -> bool:
+        """
+        checks if a test is enabled and applicable to the given model type.
+        """
+        enum = test.type
+        return ((enum == TestType.BOTH
+                 or (model_type == 'Lumped' and enum == TestType.LUMPED)
+                 or (model_type == 'Distributed' and enum == TestType.DISTRIBUTED))
+                and test.enabled)
+
+    def plan_work(self, scheduled, shared_trajectory = True, read_only_pool = 1, isolated_pool = 1, timeout = None) -> list:
+        """
+        groups tests into the units of work of run_all, in the order they should start.
+
+        Observe-only tests that share a forcing subscribe to a single model run, and
+        read-only and isolated tests that share a forcing are spread over a pool of
+        model instances. Tests are only grouped with tests that have the same
+        spin_up and critical flags, so critical tests are never held up by others,
+        and with tests that have the same timeout, see unit_timeout. Tests with
+        fresh_instance initialize or finalize their model, so each of them is an
+        isolated unit of its own.
+
+        Args:
+            scheduled: (test, forcing) pairs of the tests to run.
+            timeout: The timeout of tests without a timeout of their own.
+
+        Returns:
+            list[tuple]: (access, forcing, test names) per unit of work. Units with
+                critical tests come first, then the cheapest units, see SCHEDULE_COST.
+        """
+        trajectories = {}
+        read_only = {}
+        isolated = {}
+        fresh = []
+        for (test, test_forcing) in scheduled:
+            key = (id(test_forcing), test.spin_up, test.critical, self.time_limit(test, timeout))
+            if test.fresh_instance:
+                fresh.append((ModelAccess.ISOLATED, test_forcing, [test]))
+            elif shared_trajectory and test.access == ModelAccess.SHARED_TRAJECTORY:
+                trajectories.setdefault(key, (test_forcing, []))[1].append(test)
+            elif read_only_pool > 0 and test.access == ModelAccess.READ_ONLY:
+                read_only.setdefault(key, (test_forcing, []))[1].append(test)
+            else:
+                isolated.setdefault(key, (test_forcing, []))[1].append(test)
+
+        work = [(ModelAccess.SHARED_TRAJECTORY, test_forcing, tests)
+                for (test_forcing, tests) in trajectories.values()]
+        for (access, groups, pool_size) in ((ModelAccess.READ_ONLY, read_only, read_only_pool),
+                                            (ModelAccess.ISOLATED, isolated, isolated_pool)):
+            for (test_forcing, tests) in groups.values():
+                instances = min(pool_size, len(tests)) if pool_size > 0 else len(tests)
+                work.extend((access, test_forcing, tests[index::instances])
+                            for index in range(instances))
+        work.extend(fresh)
+        work.sort(key=lambda unit: (not any(test.critical for test in unit[2]),
+                                    SCHEDULE_COST[unit[0]],
+                                    any(test.spin_up for test in unit[2])))
+        return [(access, test_forcing, [test.name for test in tests])
+                for (access, test_forcing, tests) in work]
+
+    def execute(self, work, arguments, executor = "threads", max_workers = None, fail_fast = False, timeout = None) -> tuple[list, list]:
+        """
+        runs units of work of plan_work on the chosen executor, in order.
+
+        Units with a timeout run in a worker process that is stopped at the
+        deadline, see run_group_with_timeout.
+
+        Args:
+            arguments: The model name, parameter set, output variable name, setup
+                variables and spin-up steps, as passed to run_group.
+            fail_fast: Whether to cancel the units that have not started yet once a
+                critical test fails.
+            timeout: The timeout of tests without a timeout of their own.
+
+        Returns:
+            tuple[dict, list]: The names of the tests of every unit that was not
+                cancelled, by its future, and the names of the tests in the units
+                that were.
+        """
+        (model_name, parameter_set, output_variable_name, setup_variables, spin_up_steps) = arguments
+        runner = run_group_in_process if executor == "processes" else self.run_group
+        futures = {}
+        failed = False
+        with make_executor(executor, max_workers) as pool:
+            for (access, test_forcing, test_names) in work:
+                if failed:
+                    # The serial executor runs every unit as it is submitted, so the
+                    # units after a critical failure are never submitted at all.
+                    future = Future()
+                    future.cancel()
+                    futures[future] = test_names
+                    continue
+                unit_timeout = self.unit_timeout(access, test_names, timeout)
+                if unit_timeout is None:
+                    future = pool.submit(runner, access, model_name, test_forcing, parameter_set, output_variable_name, test_names, setup_variables, spin_up_steps)
+                else:
+                    future = pool.submit(self.run_group_with_timeout, unit_timeout, access, model_name, test_forcing, parameter_set, output_variable_name, test_names, setup_variables, spin_up_steps)
+                futures[future] = test_names
+                failed = fail_fast and self.failed_critically(future, test_names)
+            if fail_fast and not failed:
+                for future in as_completed(futures):
+                    if self.failed_critically(future, futures[future]):
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        skipped = [name for (future, test_names) in futures.items() if future.cancelled()
+                   for name in test_names]
+        return {future: test_names for (future, test_names) in futures.items() if not future.cancelled()}, skipped
+
+    @staticmethod
+    def time_limit(test, timeout = None) -> float | None:
+        """
+        gets the seconds a test may take, its own timeout or else the given default.
+        """
+        return test.timeout if test.timeout is not None else timeout
+
+    def unit_timeout(self, access, test_names, timeout = None) -> float | None:
+        """
+        gets the seconds every test of a unit of work of plan_work may take, None if
+        they have no timeout. plan_work only groups tests with the same timeout.
+        """
+        return self.time_limit(self.get_test(test_names[0]), timeout)
+
+    def run_group_with_timeout(self, timeout, access, model_name, forcing, parameter_set, output_variable_name, test_names, setup_variables, spin_up_steps = 0) -> tuple:
+        """
+        runs run_group in a KillableWorker that is stopped when a test takes longer
+        than timeout seconds.
+
+        The result of every test is sent back as soon as it finishes, which restarts
+        the deadline for the next test. Once the worker is stopped, the test that hung
+        gets a TestResult with c.TIMEOUT_MESSAGE, and the tests after it run in a new
+        worker. Observe-only tests share a single model run, so they all hang with
+        it. The worker finalizes its models when it is stopped, and the cfg
+        directories it leaves behind are removed. The worker is spawned, so it only
+        knows the tests that are registered on import, see the killable_worker module.
+
+        Returns:
+            tuple[dict, dict, list]: The result dicts and the TestResults, both by
+                test name, and the hydrographs the tests submitted.
+        """
+        result = {}
+        test_results = {}
+        plots = []
+
+        def receive(message):
+            (name, part, test_result) = message
+            result[name] = part
+            test_results[name] = test_result
+        remaining = list(test_names)
+        reason = c.TIMEOUT_MESSAGE.format(timeout)
+        while remaining:
+            worker = KillableWorker(stream_group, access, model_name, forcing, parameter_set, output_variable_name, remaining, setup_variables, spin_up_steps)
+            (finished, specs) = worker.run(timeout, receive)
+            if finished:
+                plots.extend(specs)
+                break
+            for path in Path(os.getcwd()).glob(f"thread_{worker.pid}_*"):
+                shutil.rmtree(path, ignore_errors=True)
+            unfinished = [name for name in remaining if name not in result]
+            # Other tests run one after the other, so only the first unfinished one hung.
+            stopped = unfinished if access == ModelAccess.SHARED_TRAJECTORY else unfinished[:1]
+            for name in stopped:
+                test_results[name] = TestResult(False, reason)
+                result[name] = self.get_test(name).result_dict(False, reason)
+            remaining = unfinished[len(stopped):]
+        return result, test_results, plots
+
+    def failed_critically(self, future, test_names) -> bool:
+        """
+        checks if a unit of work of run_all has finished with a failed critical test.
+        A unit that raised failed all of its tests, a skipped test did not fail.
+        """
+        if not future.done() or future.cancelled():
+            return False
+        if future.exception() is not None:
+            return any(self.get_test(name).critical for name in test_names)
+        return any(self.get_test(name).critical and test_result is not None
+                   and not (test_result.passed or test_result.skipped)
+                   for (name, test_result) in future.result()[1].items())
 
-    def run_all(self, model_name, model_type, output_variable_name, parameter_set = None, setup_variables = {}, custom_forcing_name = None, custom_forcing_variables = None) -> dict:
+    def run_all(self, model_name, model_type, output_variable_name, parameter_set = None, setup_variables = {}, custom_forcing_name = None, custom_forcing_variables = None, shared_trajectory = True, executor = "threads", max_workers = None, read_only_pool = 1, isolated_pool = None, spin_up_steps = None, fail_fast = False, timeout = None) -> dict:
         """
         runs all tests in the test suite on the model
+
+        When shared_trajectory is True, tests with ModelAccess.SHARED_TRAJECTORY that
+        use the same forcing subscribe to a single model run instead of each running
+        the model on its own.
+
+        Tests with ModelAccess.READ_ONLY that use the same forcing run one after the
+        other on read_only_pool warm model instances, instead of each setting up and
+        initializing a model of its own. A read_only_pool of 0 runs them isolated.
+
+        Isolated tests that use the same forcing are spread over isolated_pool model
+        instances, one per worker by default, and run one after the other on them.
+        Between tests, a model is restored from a snapshot of its initialized state
+        instead of being initialized again, see run_isolated_group_thread. An
+        isolated_pool of 0 gives every isolated test a model of its own.
+
+        Tests with spin_up, such as the metric tests, start from the state the model
+        has after spin_up_steps timesteps on their forcing. Scenario tests start from
+        the initial state, as a spin-up on their scenario would defeat it. The state
+        is spun up once and cached on disk, see the spin_up module. spin_up_steps
+        defaults to the c.SPIN_UP_STEPS_ENV environment variable, or 0, which starts
+        every test from the initial state of the model.
+
+        Critical and cheap tests are started first, see plan_work. When fail_fast is
+        True, the critical tests run before all others, and once a critical test
+        fails the tests that have not started yet are cancelled. They are reported as
+        skipped, see Test.skip.
+
+        A test may take Test.timeout seconds, or else the timeout of its TestBank.
+        Tests with neither get timeout seconds, which defaults to the
+        c.TEST_TIMEOUT_ENV environment variable, or no timeout. Tests with a timeout
+        run in a worker process that is stopped when a test takes longer, see
+        run_group_with_timeout, and the test gets a failed TestResult with
+        c.TIMEOUT_MESSAGE.
+
+        executor selects how tests are executed: "threads", "processes" or "serial",
+        see the executors module. max_workers defaults to the c.MAX_WORKERS_ENV
+        environment variable, or c.MAX_WORKERS_DEFAULT, see default_worker_count.
         """
 
         # Retrieve proper forcing.
@@ -171,45 +656,71 @@ class TestSuite:
         for (test_bank_name, values) in self.test_banks.items():
             temp[test_bank_name] = values
 
-        # Create and run threads.
+        # Pair every applicable test with the forcing it runs on. Scenario forcings
+        # are only built once the scenario tests are about to run.
+        scheduled = []
+        scenario_tests = []
+        for (testbank_name, values) in temp.items():
+            tests = [test for test in values.tests if self.is_applicable(test, model_type)]
+            if testbank_name == "ScenarioTests":
+                if custom_forcing_name is None:
+                    scenario_tests.extend(tests)
+            else:
+                scheduled.extend((test, forcing) for test in tests)
+
+        if spin_up_steps is None:
+            spin_up_steps = spin_up_steps_from_env()
+        if timeout is None and os.environ.get(c.TEST_TIMEOUT_ENV):
+            timeout = float(os.environ[c.TEST_TIMEOUT_ENV])
+        if isolated_pool is None:
+            isolated_pool = max_workers or default_worker_count()
+        arguments = (model_name, parameter_set, output_variable_name, setup_variables, spin_up_steps)
+
+        # With fail_fast, the critical tests run first and the rest only if all of them
+        # passed, so a rejected model does not wait for its scenarios to be built.
+        first = [(test, test_forcing) for (test, test_forcing) in scheduled if test.critical] if fail_fast else []
+        (futures, skipped) = self.execute(self.plan_work(first, shared_trajectory, read_only_pool, isolated_pool, timeout),
+                                          arguments, executor, max_workers, fail_fast, timeout)
+        rest = [(test, test_forcing) for (test, test_forcing) in scheduled if not (fail_fast and test.critical)]
+        if skipped or any(self.failed_critically(future, test_names) for (future, test_names) in futures.items()):
+            skipped.extend(test.name for test in scenario_tests)
+            skipped.extend(test.name for (test, _) in rest)
+        else:
+            if scenario_tests:
+                forcings = self.prepare_scenarios(scenario_tests, model_type, executor, max_workers)
+                rest = [(test, forcings[test.name]) for test in scenario_tests] + rest
+            (more, skipped) = self.execute(self.plan_work(rest, shared_trajectory, read_only_pool, isolated_pool, timeout),
+                                           arguments, executor, max_workers, fail_fast, timeout)
+            futures.update(more)
+
+        # Merge the results of every unit of work back into a single result dict.
         result = {}
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            for (testbank_name, values) in temp.items():
-                if (testbank_name == "ScenarioTests"):
-                    if custom_forcing_name is None:
-                        forcings = {}
-                        for test in values.tests:
-                            enum = test.type
-                            if ((enum == TestType.BOTH
-                                 or (model_type == 'Lumped' and enum == TestType.LUMPED)
-                                 or (model_type == 'Distributed' and enum == TestType.DISTRIBUTED))
-                                    and test.enabled):
-                                if model_type == 'Lumped':
-                                    forcings[test.name] = scenarios_util.get_correct_forcing_lumped(test.name)
-                                else:
-                                    forcings[test.name] = scenarios_util.get_correct_forcing_distributed(test.name)
-                        for test in values.tests:
-                            enum = test.type
-                            if ((enum == TestType.BOTH
-                                 or (model_type == 'Lumped' and enum == TestType.LUMPED)
-                                 or (model_type == 'Distributed' and enum == TestType.DISTRIBUTED))
-                                    and test.enabled):
-                                executor.submit(self.run_test_thread, model_name, forcings[test.name], parameter_set, output_variable_name, test, result, setup_variables)
+        for (future, test_names) in futures.items():
+            if future.exception() is not None:
+                # The whole unit failed, e.g. its model could not be started.
+                for name in test_names:
+                    self.record_error(self.get_test(name), result, future.exception())
+                continue
+            part, test_results, *plots = future.result()
+            result.update(part)
+            for (name, test_result) in test_results.items():
+                self.get_test(name).test_result = test_result
+            for specs in plots:
+                get_render_queue().extend(specs)
+        for name in skipped:
+            result[name] = self.get_test(name).skip(c.SKIPPED_MESSAGE)
 
-                else:
-                    for test in values.tests:
-                        enum = test.type
-                        if ((enum == TestType.BOTH
-                                or (model_type == 'Lumped' and enum == TestType.LUMPED)
-                                or (model_type == 'Distributed' and enum == TestType.DISTRIBUTED))
-                                and test.enabled):
-                            executor.submit(self.run_test_thread, model_name, forcing, parameter_set, output_variable_name, test, result, setup_variables)
+        # Render the hydrographs the tests submitted, now that no test runs anymore.
+        # A hydrograph that could not be rendered is left out of the report.
+        for (path, error) in get_render_queue().flush().items():
+            if error is not None:
+                logger.warning("Could not render the hydrograph %s: %s", path, error)
 
         # Checks if tests passed or not
         passed = True
         for test in self.tests.values():
             if test.enabled and test.test_result is not None:
-                if test.critical and not test.test_result.passed:
+                if test.critical and not (test.test_result.passed or test.test_result.skipped):
                     passed = False
 
 
@@ -217,4 +728,63 @@ class TestSuite:
         return result
 
     def __str__(self):
-        return "[TestSuite]\n" + "\n\n".join(str(bank) for bank in self.test_banks.values())
\ No newline at end of file
+        return "[TestSuite]\n" + "\n\n".join(str(bank) for bank in self.test_banks.values())
+
+
+def thread_dir_name() -> str:
+    """
+    gets the prefix of the cfg directories made by the current thread, which is
+    unique across threads and worker processes.
+    """
+    return f"thread_{os.getpid()}_{threading.get_ident()}"
+
+
+def finalize_quietly(model_instance) -> None:
+    """
+    attempts to finalize a model, if it hasn't been already.
+    """
+    try:
+        model_instance.finalize()
+    except Exception:  # pylint:disable=broad-exception-caught
+        pass
+
+
+def run_group_in_process(*args):
+    """
+    runs TestSuite.run_group in a worker process.
+
+    Tests are looked up by name in the worker, so only test banks that are registered
+    when this module is imported (or inherited by forking) can be run this way. The
+    hydrographs the tests submitted in the worker are returned as well, so they are
+    rendered by the render queue of the calling process.
+    """
+    return TestSuite().run_group(*args) + (get_render_queue().drain(),)
+
+
+class ResultStream(dict):
+    """
+    a result dict that sends the result of every test, with its TestResult, as soon
+    as it is written.
+    """
+
+    def __init__(self, send):
+        super().__init__()
+        self.send = send
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        self.send((name, value, TestSuite().get_test(name).test_result))
+
+
+def stream_group(*args, send):
+    """
+    runs TestSuite.run_group in a KillableWorker, sending the result of every test
+    as soon as it finishes.
+
+    Returns the hydrographs the tests submitted in the worker, so they are rendered
+    by the render queue of the calling process. A forked worker starts with a copy of
+    the render queue of the caller, which is emptied first.
+    """
+    get_render_queue().drain()
+    TestSuite().run_group(*args, result=ResultStream(send))
+    return get_render_queue().drain()
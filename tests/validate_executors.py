@@ -0,0 +1,189 @@
+"""
+A module that has tests that test the executor policies of the test suite
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing.executors import (
+    EXECUTOR_POLICIES,
+    SerialExecutor,
+    UnknownExecutorException,
+    default_worker_count,
+    make_executor,
+)
+from ewatercycle_model_testing.run_model_util import RunModelUtil
+from ewatercycle_model_testing.test import ModelAccess, Test
+from ewatercycle_model_testing.test_bank import TestBank
+from ewatercycle_model_testing.test_result import TestResult
+from ewatercycle_model_testing.test_suite import TestSuite
+
+
+def square(number):
+    """
+    function mock that can be pickled and sent to a worker process
+    """
+    return number * number
+
+
+def fail():
+    """
+    function mock that always raises
+    """
+    raise ValueError("failed")
+
+
+def validate_make_executor_policies():
+    """
+    tests if every policy creates the right executor
+    """
+    assert isinstance(make_executor("threads", 2), ThreadPoolExecutor)
+    assert isinstance(make_executor("processes", 2), ProcessPoolExecutor)
+    assert isinstance(make_executor("serial"), SerialExecutor)
+    assert set(EXECUTOR_POLICIES) == {"threads", "processes", "serial"}
+
+
+def validate_unknown_policy():
+    """
+    tests if an unknown policy raises an exception
+    """
+    with pytest.raises(UnknownExecutorException):
+        make_executor("fibers")
+
+
+def validate_default_worker_count(monkeypatch):
+    """
+    tests if the default worker count is small, positive and configurable
+    """
+    monkeypatch.delenv(c.MAX_WORKERS_ENV, raising=False)
+    assert 1 <= default_worker_count() <= c.MAX_WORKERS_DEFAULT
+    monkeypatch.setattr("os.cpu_count", lambda: 64)
+    assert default_worker_count() == c.MAX_WORKERS_DEFAULT
+    monkeypatch.setenv(c.MAX_WORKERS_ENV, "12")
+    assert default_worker_count() == 12
+
+
+@pytest.mark.parametrize("policy", EXECUTOR_POLICIES)
+def validate_results_are_the_same(policy):
+    """
+    tests if every policy gives the same results
+    """
+    with make_executor(policy, 2) as pool:
+        futures = [pool.submit(square, number) for number in range(5)]
+    assert [future.result() for future in futures] == [0, 1, 4, 9, 16]
+
+
+def validate_serial_executor_keeps_exceptions():
+    """
+    tests if the serial executor stores exceptions in the future
+    """
+    future = SerialExecutor().submit(fail)
+    assert isinstance(future.exception(), ValueError)
+
+
+class ProbeModel:
+    """
+    model mock whose discharge is its time, that can be created in a worker process
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.end_time = 5.0
+
+    def setup(self, **_):
+        """
+        mocks the setup of a model
+        """
+        return "cfg", "dir"
+
+    def initialize(self, _):
+        """
+        mocks the initialization of a model
+        """
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        self.time += 1.0
+
+    def get_value(self, _):
+        """
+        returns the discharge
+        """
+        return np.array([self.time])
+
+    def finalize(self):
+        """
+        mocks the finalization of a model
+        """
+
+
+def total_discharge(model, outputvar):
+    """
+    test mock that sums the discharge over a run
+    """
+    total = 0.0
+    while model.time < model.end_time:
+        model.update()
+        total += model.get_value(outputvar)[0]
+    return TestResult(total == 15.0, f"total {total}")
+
+
+def start_time(model, _):
+    """
+    test mock that reads the time of the initialized model
+    """
+    return TestResult(model.time == 0.0, f"time {model.time}")
+
+
+@pytest.fixture(name="probe_suite")
+def probe_suite_fixture(monkeypatch):
+    """
+    fixture that registers tests of every model access on probe models, in
+    registries of their own
+    """
+    monkeypatch.setattr(Test, "boundInstances", {})
+    monkeypatch.setattr(Test, "existingTestNames", set())
+    monkeypatch.setattr(TestBank, "boundInstances", {})
+    monkeypatch.setattr(TestSuite, "_TestSuite__instance", None)
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: ProbeModel()))
+    monkeypatch.setattr(RunModelUtil, "get_lumped_forcing", lambda *_: SimpleNamespace(end_time="2001"))
+    TestBank(name="probes")(SimpleNamespace(
+        isolated_run=Test(name="isolated_run", run=total_discharge),
+        isolated_time=Test(name="isolated_time", critical=True, run=start_time),
+        shared_run_0=Test(name="shared_run_0", access=ModelAccess.SHARED_TRAJECTORY, run=total_discharge),
+        shared_run_1=Test(name="shared_run_1", access=ModelAccess.SHARED_TRAJECTORY, run=total_discharge),
+        read_only_time=Test(name="read_only_time", access=ModelAccess.READ_ONLY, run=start_time)))
+
+
+def validate_run_all_is_the_same_for_every_policy(probe_suite):
+    """
+    tests if run_all gives the same results with every executor policy
+    """
+    results = {policy: TestSuite().run_all("probe", "Lumped", "q", executor=policy, max_workers=2)
+               for policy in EXECUTOR_POLICIES}
+    assert results["serial"][c.SUITE_PASSED_ATTRIBUTE]
+    assert len(results["serial"]) == 6
+    assert all(part["passed"] for (name, part) in results["serial"].items()
+               if name != c.SUITE_PASSED_ATTRIBUTE)
+    assert results["threads"] == results["serial"]
+    assert results["processes"] == results["serial"]
+
+
+def interrupt():
+    """
+    function mock that is interrupted by the user
+    """
+    raise KeyboardInterrupt()
+
+
+def validate_serial_executor_does_not_swallow_interrupts():
+    """
+    tests if Ctrl-C inside a call reaches the caller instead of the future
+    """
+    with pytest.raises(KeyboardInterrupt):
+        SerialExecutor().submit(interrupt)
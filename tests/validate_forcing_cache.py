@@ -0,0 +1,138 @@
+"""
+A module that has tests that test the forcing cache
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from ewatercycle_model_testing.forcing_cache import FileLock, ForcingCache
+
+
+class FakeForcing:
+    """
+    forcing mock that writes a file instead of running a recipe
+    """
+    generated = 0
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @classmethod
+    def generate(cls, dataset, start_time, end_time, shape, directory):
+        """
+        writes a forcing file in a subdirectory, like ESMValTool does
+        """
+        cls.generated += 1
+        forcing_dir = Path(directory) / "work" / "diagnostic"
+        forcing_dir.mkdir(parents=True)
+        (forcing_dir / "pr.nc").write_text(f"{dataset}{start_time}{end_time}{shape}")
+        return cls(forcing_dir)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        loads a forcing from its directory
+        """
+        return cls(directory)
+
+
+class OtherForcing(FakeForcing):
+    """
+    forcing mock of a different class
+    """
+
+
+@pytest.fixture(name="shape")
+def shape_fixture(tmp_path):
+    """
+    fixture that creates a shape file with a sidecar file
+    """
+    shape = tmp_path / "shapes" / "Rhine.shp"
+    shape.parent.mkdir()
+    shape.write_bytes(b"shape")
+    (tmp_path / "shapes" / "Rhine.dbf").write_bytes(b"attributes")
+    FakeForcing.generated = 0
+    return shape
+
+
+def validate_key_depends_on_inputs(shape):
+    """
+    tests if the key changes with every input of the forcing
+    """
+    key = ForcingCache.key(FakeForcing, {"dataset": "A"}, "2000", "2001", shape)
+    assert key == ForcingCache.key(FakeForcing, {"dataset": "A"}, "2000", "2001", shape)
+    assert key != ForcingCache.key(OtherForcing, {"dataset": "A"}, "2000", "2001", shape)
+    assert key != ForcingCache.key(FakeForcing, {"dataset": "B"}, "2000", "2001", shape)
+    assert key != ForcingCache.key(FakeForcing, {"dataset": "A"}, "2000", "2002", shape)
+    (shape.parent / "Rhine.dbf").write_bytes(b"other attributes")
+    assert key != ForcingCache.key(FakeForcing, {"dataset": "A"}, "2000", "2001", shape)
+
+
+def validate_second_generate_is_a_hit(tmp_path, shape):
+    """
+    tests if a forcing is generated once and loaded from the cache afterwards
+    """
+    cache = ForcingCache(tmp_path / "cache")
+    first = cache.generate(FakeForcing, "A", "2000", "2001", shape)
+    second = cache.generate(FakeForcing, "A", "2000", "2001", shape)
+    assert FakeForcing.generated == 1
+    assert first.directory == second.directory
+    assert (second.directory / "pr.nc").exists()
+    assert len(cache.entries()) == 1
+    assert not list((tmp_path / "cache").glob(".*.tmp"))
+
+
+def validate_least_recently_used_is_evicted(tmp_path, shape):
+    """
+    tests if the least recently used entry is evicted when the cache is full
+    """
+    cache = ForcingCache(tmp_path / "cache")
+    old = cache.generate(FakeForcing, "A", "2000", "2001", shape)
+    older = cache.generate(FakeForcing, "B", "2000", "2001", shape)
+    os.utime(old.directory.parents[1] / ".forcing_directory", (1, 1))
+    os.utime(older.directory.parents[1] / ".forcing_directory", (0, 0))
+    cache.max_bytes = cache.size(cache.entries()[-1]) + 1
+    new = cache.generate(FakeForcing, "C", "2000", "2001", shape)
+    assert len(cache.entries()) == 1
+    assert not old.directory.exists() and not older.directory.exists()
+    assert new.directory.exists()
+
+
+def validate_entries_in_use_are_not_evicted(tmp_path, shape):
+    """
+    tests if an entry that a model may still run on, with a scenario written into
+    its directory, survives an eviction while an entry that was used long ago does not
+    """
+    cache = ForcingCache(tmp_path / "cache", in_use_seconds=60)
+    in_use = cache.generate(FakeForcing, "A", "2000", "2001", shape)
+    (in_use.directory / "scenario.npy").write_bytes(b"0" * 1000)
+    unused = cache.generate(FakeForcing, "B", "2000", "2001", shape)
+    os.utime(unused.directory.parents[1] / ".forcing_directory", (0, 0))
+    cache.max_bytes = 1
+    cache.evict()
+    assert (in_use.directory / "scenario.npy").exists()
+    assert not unused.directory.exists()
+    cache.in_use_seconds = 0
+    cache.evict()
+    assert not cache.entries()
+
+
+def validate_file_lock_is_exclusive(tmp_path):
+    """
+    tests if a lock file can only be taken once
+    """
+    lock = FileLock(tmp_path / "entry.lock")
+    assert lock.acquire(blocking=False)
+    assert not FileLock(tmp_path / "entry.lock").acquire(blocking=False)
+    lock.release()
+    assert FileLock(tmp_path / "entry.lock").acquire(blocking=False)
+
+
+def validate_stale_file_lock_is_broken(tmp_path):
+    """
+    tests if a lock file left behind by a crashed process is broken
+    """
+    (tmp_path / "entry.lock").write_text("0")
+    os.utime(tmp_path / "entry.lock", (0, 0))
+    assert FileLock(tmp_path / "entry.lock").acquire(blocking=False)
@@ -0,0 +1,95 @@
+"""
+A module that has tests that test the offline GRDC reader
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import grdc_reader
+
+STATION_FILE = """# Title:                 GRDC STATION DATA FILE
+# missing values are indicated by -999.000
+#
+# GRDC-No.:              1234567
+# Station:               TEST
+# Latitude (DD):       51.5
+# Table Header:
+#     YYYY-MM-DD - Date
+#     hh:mm      - Time
+# DATA
+YYYY-MM-DD;hh:mm; Value
+2000-01-01;--:--;    845.000
+2000-01-02;--:--;   -999.000
+2000-01-03;12:30;    812.000
+2000-01-04;--:--;    796.000
+"""
+
+
+@pytest.fixture(name="station_file")
+def station_file_fixture(tmp_path):
+    """
+    fixture that writes a small station file
+    """
+    path = tmp_path / "1234567_Q_Day.Cmd.txt"
+    path.write_bytes(STATION_FILE.encode("latin-1"))
+    return path
+
+
+def validate_parse_missing_values_and_times(station_file):
+    """
+    tests if missing times and values are parsed as midnight and NaN
+    """
+    series = grdc_reader.parse_grdc_file(station_file)
+    assert list(series.times.astype(str)) == [
+        "2000-01-01T00:00:00.000000000", "2000-01-02T00:00:00.000000000",
+        "2000-01-03T12:30:00.000000000", "2000-01-04T00:00:00.000000000"]
+    assert np.isnan(series.values[1])
+    assert series.values[3] == 796.0
+    assert series.metadata["GRDC-No."] == "1234567"
+    assert series.metadata["Latitude (DD)"] == "51.5"
+    assert "hh" not in series.metadata
+
+
+def validate_second_load_reads_the_cache(station_file, tmp_path, monkeypatch):
+    """
+    tests if an unchanged file is only parsed once
+    """
+    first = grdc_reader.load_grdc_file(station_file, tmp_path / "cache")
+
+    def parse(_):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(grdc_reader, "parse_grdc_file", parse)
+    second = grdc_reader.load_grdc_file(station_file, tmp_path / "cache")
+    assert np.array_equal(first.times, second.times)
+    assert np.array_equal(first.values, second.values, equal_nan=True)
+    assert first.metadata == second.metadata
+
+
+def validate_changed_file_is_parsed_again(station_file, tmp_path):
+    """
+    tests if the cache is keyed by the modification time of the file
+    """
+    grdc_reader.load_grdc_file(station_file, tmp_path / "cache")
+    station_file.write_bytes(STATION_FILE.replace("845.000", "900.000").encode())
+    os.utime(station_file, ns=(0, 10**9))
+    series = grdc_reader.load_grdc_file(station_file, tmp_path / "cache")
+    assert series.values[0] == 900.0
+    assert len(list((tmp_path / "cache").glob("*.npz"))) == 2
+
+
+def validate_get_grdc_data_of_bundled_station(tmp_path, monkeypatch):
+    """
+    tests if the observations of a bundled station are read for a time window
+    """
+    monkeypatch.setenv("EWATERCYCLE_GRDC_CACHE", str(tmp_path / "cache"))
+    directory = Path(__file__).parents[1] / "grdc-observations"
+    (observations, metadata) = grdc_reader.get_grdc_data(
+        "6335020", "1991-01-01T00:00:00Z", "1991-12-31T00:00:00Z", directory=directory)
+    assert len(observations) == 365
+    assert observations.index.name == "time"
+    assert list(observations.columns) == ["GRDC"]
+    assert metadata["Station"] == "REES"
+    with pytest.raises(grdc_reader.GrdcStationNotFoundException):
+        grdc_reader.get_grdc_data("0", None, None, directory=directory)
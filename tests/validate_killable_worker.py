@@ -0,0 +1,102 @@
+"""
+A module that has tests that test the killable worker
+"""
+import os
+import time
+
+import pytest
+
+from ewatercycle_model_testing.killable_worker import KillableWorker, WorkerExitedException
+
+
+def count(limit, send):
+    """
+    call that sends every number up to limit and returns the limit
+    """
+    for number in range(limit):
+        send(number)
+    return limit
+
+
+def hang(path, send):
+    """
+    call that sends a message and then hangs, writing to path when it is stopped
+    """
+    send("started")
+    try:
+        time.sleep(60)
+    finally:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("cleaned up")
+
+
+def swallow(path, send):
+    """
+    call whose test swallows every exception and then goes on to the next test
+    """
+    send("started")
+    try:
+        time.sleep(60)
+    except:  # pylint:disable=bare-except
+        pass
+    send("next test")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("ran the next test")
+
+
+def fail(send):
+    """
+    call that raises
+    """
+    raise ValueError("broken model")
+
+
+def exit_early(send):
+    """
+    call that exits the worker without returning
+    """
+    os._exit(3)
+
+
+def validate_worker_streams_messages_and_returns():
+    """
+    tests if every message arrives in order before the call returns
+    """
+    messages = []
+    assert KillableWorker(count, 3).run(10, messages.append) == (True, 3)
+    assert messages == [0, 1, 2]
+
+
+def validate_worker_is_stopped_at_deadline(tmp_path):
+    """
+    tests if a hanging call is stopped at its deadline and gets to clean up
+    """
+    messages = []
+    worker = KillableWorker(hang, str(tmp_path / "stopped"))
+    start = time.monotonic()
+    assert worker.run(0.5, messages.append) == (False, None)
+    assert time.monotonic() - start < 10
+    assert messages == ["started"]
+    assert not worker.process.is_alive()
+    assert (tmp_path / "stopped").read_text(encoding="utf-8") == "cleaned up"
+
+
+def validate_stopped_worker_does_not_go_on(tmp_path):
+    """
+    tests if a worker whose call swallowed the stop does not run the next test
+    """
+    messages = []
+    worker = KillableWorker(swallow, str(tmp_path / "next"))
+    assert worker.run(0.5, messages.append) == (False, None)
+    assert messages == ["started"]
+    assert not (tmp_path / "next").exists()
+
+
+def validate_worker_errors_reach_the_caller():
+    """
+    tests if an exception of the call and an exit of the worker are raised
+    """
+    with pytest.raises(ValueError, match="broken model"):
+        KillableWorker(fail).run(10, print)
+    with pytest.raises(WorkerExitedException):
+        KillableWorker(exit_early).run(10, print)
@@ -4,13 +4,16 @@ module containing tests for the metric_tests test bank.
 # this is for a false positive because we use dynamic code
 #pylint:disable=no-member
 
+import os
 import unittest
 from unittest import mock
 from unittest.mock import Mock
 
+import numpy as np
 import pandas as pd
 
-from ewatercycle_model_testing import metric_tests
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import metric_tests, render_queue
 from ewatercycle_model_testing.test_suite import TestSuite
 
 
@@ -19,6 +22,15 @@ class TestMetricTests(unittest.TestCase):
     class that contains tests for the metric_tests test bank.
     """
 
+    def setUp(self):
+        """
+        gives every test a render queue of its own, so the hydrographs of the tests
+        are never rendered into the output directory of the package by a later flush
+        """
+        patcher = mock.patch.object(render_queue, "_default_queue", render_queue.RenderQueue(executor="serial"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
 # Commented out because of gitlab eqatercycle problems. NEEDS TO BE CODE AGAIN WHEN PIPELINE IS FIXED.
 #     def validate_nash_sutcliffe_wflow_efficiency_low_Rees(self):
 #         model = RunModelUtil.getwflowmodel()
@@ -48,8 +60,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_rees")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_rees")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_very_good_rees(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is very good when necessary
@@ -69,8 +81,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was 1 , which is '
  'higher than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_rees")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_rees")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_satisfactory_rees(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is satisfactory when necessary
@@ -119,8 +131,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_rees")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_rees")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_very_good_rees(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is very good when necessary
@@ -140,8 +152,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Kling-Gupta efficiency is very good. Kling Gupta was 1.0 , which is higher '
  'than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_rees")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_rees")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_satisfactory_rees(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is satisfactory when necessary
@@ -191,8 +203,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_lobith")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_lobith")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_very_good_lobith(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is very good when necessary
@@ -212,8 +224,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was 1 , which is '
  'higher than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_lobith")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_lobith")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_satisfactory_lobith(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is satisfactory when necessary
@@ -263,8 +275,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_lobith")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_lobith")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_very_good_lobith(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is very good when necessary
@@ -284,8 +296,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Kling-Gupta efficiency is very good. Kling Gupta was 1.0 , which is higher '
                                            'than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_lobith")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_lobith")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_satisfactory_lobith(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is satisfactory when necessary
@@ -336,8 +348,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_schermbeck")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_schermbeck")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_very_good_schermbeck(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is very good when necessary
@@ -357,8 +369,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Nash-Sutcliffe efficiency is very good. Nash Sutcliffe was 1 , which is '
  'higher than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_schermbeck")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_schermbeck")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_nash_sutcliffe_efficiency_satisfactory_schermbeck(self, mockoutput, mockobservation):
         """
         tests if the nash_sutcliffe_efficiency is satisfactory when necessary
@@ -408,8 +420,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertFalse(result["passed"])
         self.assertEqual(result["reason"], "Error occurred, the model did not run correctly")
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_schermbeck")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_schermbeck")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_very_good_schermbeck(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is very good when necessary
@@ -429,8 +441,8 @@ class TestMetricTests(unittest.TestCase):
         self.assertEqual(result["reason"], 'Kling-Gupta efficiency is very good. Kling Gupta was 1.0 , which is higher '
                                            'than 0.75')
 
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data_schermbeck")
-    @mock.patch("ewatercycle_model_testing.metric_tests.get_output_schermbeck")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
     def test_validate_kling_gupta_efficiency_satisfactory_schermbeck(self, mockoutput, mockobservation):
         """
         tests if the kling_gupta_efficiency is satisfactory when necessary
@@ -449,3 +461,47 @@ class TestMetricTests(unittest.TestCase):
         self.assertTrue(result["passed"])
         self.assertEqual(result["reason"], 'Kling-Gupta efficiency is satisfactory. Kling Gupta was 0.5857864376269049 , '
                                            'which is higher than -0.41')
+
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
+    def test_validate_nash_sutcliffe_efficiency_per_period_rees(self, mockoutput, mockobservation):
+        """
+        tests if the nash_sutcliffe_efficiency scores every year and season
+        """
+        times = pd.date_range("1990-12-30", periods=5, freq="D", name="time")
+        mockoutput.return_value = [1, 2, 3, 2, 2]
+        mockobservation.return_value = pd.DataFrame({"GRDC": [1, 3, 3, 2, 1]}, index=times)
+        model = Mock()
+        test_suite = TestSuite()
+        for test in test_suite.tests.values():
+            if test.name == "nash_sutcliffe_efficiency_rees":
+                test.start(model, "RiverRunoff")
+                scores = test.test_result.metrics
+
+        self.assertEqual(list(scores["period"]), ["1990", "1991", "1991-DJF"])
+        self.assertEqual(list(scores["count"]), [2, 3, 5])
+        self.assertAlmostEqual(float(scores["nse"][1]), 0.5)
+
+    @mock.patch.dict(os.environ, {c.METRIC_LOWER_BOUND_ENV: "1"})
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_observation_data")
+    @mock.patch("ewatercycle_model_testing.metric_tests.get_output")
+    def test_validate_nash_sutcliffe_efficiency_lower_bound_rees(self, mockoutput, mockobservation):
+        """
+        tests if the nash_sutcliffe_efficiency judges the lower confidence bound when asked,
+        here of a very good score of 0.76 whose lower bound is only satisfactory
+        """
+        rng = np.random.default_rng(0)
+        observed = 1000 + 500 * np.sin(np.arange(3650) / 58.1)
+        mockoutput.return_value = observed + rng.normal(0, 172, len(observed))
+        mockobservation.return_value = pd.DataFrame({"GRDC": observed})
+        model = Mock()
+        test_suite = TestSuite()
+        result = None
+        for test in test_suite.tests.values():
+            if test.name == "nash_sutcliffe_efficiency_rees":
+                result = test.start(model, "RiverRunoff")
+
+        self.assertTrue(result["passed"])
+        self.assertTrue(result["reason"].startswith("Nash-Sutcliffe efficiency is satisfactory."))
+        self.assertIn("the lower bound of its 90% confidence interval", result["reason"])
+        self.assertTrue(result["reason"].endswith("which is higher than 0.36"))
@@ -0,0 +1,163 @@
+"""
+A module that has tests that test the vectorized metrics
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ewatercycle_model_testing import metrics
+
+
+def loop_nse(output, observations):
+    """
+    the element by element nse the metric tests used before the metrics module
+    """
+    denom = 0
+    omean = (sum(observations["GRDC"]) / len(observations["GRDC"]))
+    for value in observations["GRDC"]:
+        denom = denom + (pow((value - omean), 2))
+    num = 0
+    for subval in observations["GRDC"].sub(output):
+        num += pow(subval, 2)
+    return 1 - (num / denom)
+
+
+def loop_kge(output, observations):
+    """
+    the element by element kge the metric tests used before the metrics module
+    """
+    out_mean = sum(output) / len(output)
+    obs_mean = sum(observations["GRDC"]) / len(observations["GRDC"])
+    (f1, f21, f22) = ([], [], [])
+    for (out, obs) in zip(output, observations["GRDC"]):
+        f1.append((out - out_mean) * (obs - obs_mean))
+        f21.append((out - out_mean) ** 2)
+        f22.append((obs - obs_mean) ** 2)
+    r = sum(f1) / (sum(f21) * sum(f22)) ** 0.5
+    alpha = np.std(output) / np.std(observations["GRDC"])
+    beta = (sum(output) / sum(observations["GRDC"]))
+    return 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+
+
+@pytest.fixture(name="series")
+def series_fixture():
+    """
+    fixture with 40 years of daily discharge at three stations
+    """
+    rng = np.random.default_rng(0)
+    observed = 1000 + 500 * np.sin(np.arange(14610) / 58.1)[:, None] + rng.normal(
+        0, 100, (14610, 3))
+    simulated = 0.9 * observed + rng.normal(0, 200, observed.shape)
+    return simulated, observed
+
+
+def validate_metrics_match_element_wise_loops(series):
+    """
+    tests if the vectorized metrics equal the loops they replace for every station
+    """
+    (simulated, observed) = series
+    nse = metrics.nse(simulated, observed)
+    kge = metrics.kge(simulated, observed)
+    assert nse.shape == kge.shape == (3,)
+    for station in range(3):
+        frame = pd.DataFrame({"GRDC": observed[:, station]})
+        output = list(simulated[:, station])
+        assert nse[station] == pytest.approx(loop_nse(output, frame))
+        assert kge[station] == pytest.approx(loop_kge(output, frame))
+        assert metrics.nse(simulated[:, station], observed[:, station]) == pytest.approx(
+            nse[station])
+
+
+def validate_metrics_of_small_series():
+    """
+    tests the metrics on a series that can be checked by hand
+    """
+    observed = np.array([1.0, 2.0, 3.0, 2.0, 1.0])
+    simulated = np.array([1.0, 2.0, 3.0, 2.0, 2.0])
+    assert metrics.nse(simulated, observed) == pytest.approx(1 - 1 / 2.8)
+    assert metrics.rmse(simulated, observed) == pytest.approx(np.sqrt(1 / 5))
+    assert metrics.pbias(simulated, observed) == pytest.approx(100 / 9)
+    assert metrics.peak_error(simulated, observed) == 0
+    (r, alpha, beta) = metrics.kge_components(observed, observed)
+    assert (r, alpha, beta) == pytest.approx((1, 1, 1))
+    assert metrics.kge(observed, observed) == pytest.approx(1)
+    assert metrics.log_nse(observed, observed) == pytest.approx(1)
+
+
+def validate_metrics_ignore_missing_pairs():
+    """
+    tests if timesteps with a missing value are left out of that column only
+    """
+    observed = np.array([[1.0, 1.0], [2.0, np.nan], [3.0, 3.0], [np.nan, 2.0]])
+    simulated = np.array([[1.0, 1.0], [2.0, 5.0], [3.0, 3.0], [9.0, 2.0]])
+    assert np.allclose(metrics.nse(simulated, observed), [1.0, 1.0])
+    assert np.allclose(metrics.rmse(simulated, observed), [0.0, 0.0])
+    assert np.isnan(metrics.nse([np.nan, 1.0], [1.0, np.nan]))
+
+
+
+def validate_rolling_metrics_match_windows(series):
+    """
+    tests if the running sum metrics equal the metrics of every window by itself
+    """
+    (simulated, observed) = series
+    simulated = simulated.copy()
+    simulated[100:110, 1] = np.nan
+    table = metrics.rolling(simulated, observed, 365, metrics.SUM_METRICS)
+    assert len(table) == len(observed) - 364
+    assert table["nse"].shape == (len(table), 3)
+    for start in (0, 95, 7000, len(table) - 1):
+        window = slice(start, start + 365)
+        assert table["count"][start, 1] == np.sum(~np.isnan(simulated[window, 1]))
+        for name in metrics.SUM_METRICS:
+            assert np.allclose(table[name][start],
+                               getattr(metrics, name)(simulated[window], observed[window]),
+                               rtol=1e-4)
+    with pytest.raises(ValueError):
+        metrics.rolling(simulated, observed, 0)
+    with pytest.raises(ValueError):
+        metrics.rolling(simulated, observed, 10, ("peak_error",))
+
+
+def validate_per_period_metrics():
+    """
+    tests if a series is scored per year and per meteorological season
+    """
+    times = np.arange("1990-12-01", "1992-03-01", dtype="datetime64[D]")
+    observed = 100 + 50 * np.sin(np.arange(len(times)) / 10.0)
+    simulated = observed + np.where(times < np.datetime64("1991-01-01"), 5.0, 0.0)
+    years = metrics.per_period(simulated, observed, times)
+    assert list(years["period"]) == ["1990", "1991", "1992"]
+    assert list(years["count"]) == [31, 365, 60]
+    assert years["nse"][0] < 1 and years["nse"][1] == 1
+    seasons = metrics.per_period(simulated, observed, times, "season", ("kge",))
+    assert list(seasons["period"]) == ["1991-DJF", "1991-MAM", "1991-JJA",
+                                       "1991-SON", "1992-DJF"]
+    assert list(seasons["start"]) == [0, 90, 182, 274, 365]
+    assert seasons["kge"][1] == pytest.approx(1)
+    assert seasons.dtype.names == ("period", "start", "count", "kge")
+    with pytest.raises(ValueError):
+        metrics.period_starts(times, "month")
+
+
+
+def validate_bootstrap_interval(series):
+    """
+    tests if the bootstrap interval holds the estimate and is reproducible
+    """
+    (simulated, observed) = series
+    for metric in ("nse", "kge"):
+        (lower, upper) = metrics.bootstrap(simulated, observed, metric)
+        estimate = getattr(metrics, metric)(simulated, observed)
+        assert lower.shape == upper.shape == (3,)
+        assert np.all(lower < estimate) and np.all(estimate < upper)
+        assert np.array_equal(lower, metrics.bootstrap(simulated, observed, metric)[0])
+    (narrow, _) = metrics.bootstrap(simulated[:, 0], observed[:, 0], confidence=0.5)
+    (wide, _) = metrics.bootstrap(simulated[:, 0], observed[:, 0], confidence=0.99)
+    assert isinstance(narrow, float) and wide < narrow
+    assert metrics.bootstrap(observed[:, 0], observed[:, 0]) == pytest.approx((1, 1))
+    with pytest.raises(ValueError):
+        metrics.bootstrap(simulated, observed, "peak_error")
+    with pytest.raises(ValueError):
+        metrics.bootstrap([], [])
@@ -0,0 +1,120 @@
+"""
+A module that has tests that test the model snapshots
+"""
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing.model_snapshot import (
+    ModelSnapshot,
+    SnapshotException,
+    variable_names,
+)
+
+
+class StateBmi:
+    """
+    bmi mock with a storage that fills up with the precipitation on every update
+    """
+
+    def __init__(self, read_only=False):
+        self.time = 0.0
+        self.state = {"precipitation": np.array([1.0, 2.0]),
+                      "storage": np.array([0.0, np.nan])}
+        self.read_only = read_only
+
+    def get_input_var_names(self):
+        """
+        returns the input variables
+        """
+        return ("precipitation", "storage")
+
+    def get_output_var_names(self):
+        """
+        returns the output variables
+        """
+        return ("storage",)
+
+    def get_current_time(self):
+        """
+        returns the current time
+        """
+        return self.time
+
+    def get_value(self, name):
+        """
+        returns a copy of a variable
+        """
+        return self.state[name].copy()
+
+    def set_value(self, name, value):
+        """
+        sets a variable, ignored by a read only bmi
+        """
+        if not self.read_only:
+            self.state[name][:] = value
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        self.time += 1.0
+        self.state["storage"] += self.state["precipitation"]
+
+
+class StateModel:
+    """
+    model mock around a StateBmi
+    """
+
+    def __init__(self, read_only=False):
+        self.bmi = StateBmi(read_only)
+
+
+def validate_snapshot_captures_every_variable_once():
+    """
+    tests if the time and a copy of every input and output variable are captured
+    """
+    model = StateModel()
+    assert variable_names(model.bmi) == ["precipitation", "storage"]
+    snapshot = ModelSnapshot.take(model)
+    assert snapshot.time == 0.0
+    model.bmi.state["precipitation"][0] = 5.0
+    assert snapshot.values["precipitation"][0] == 1.0
+    assert not snapshot.matches(model)
+
+
+def validate_snapshot_restores_changed_variables():
+    """
+    tests if a model whose variables a test changed is restored to the snapshot
+    """
+    model = StateModel()
+    snapshot = ModelSnapshot.try_take(model)
+    model.bmi.set_value("precipitation", np.array([9.0, 9.0]))
+    assert snapshot.restores_into(model)
+    assert np.array_equal(model.bmi.get_value("precipitation"), [1.0, 2.0])
+
+
+def validate_snapshot_cannot_rewind_time():
+    """
+    tests if a model that was updated does not count as restored
+    """
+    model = StateModel()
+    snapshot = ModelSnapshot.try_take(model)
+    model.bmi.update()
+    assert not snapshot.restores_into(model)
+
+
+def validate_snapshot_of_model_without_round_trip():
+    """
+    tests if a model that ignores set_value is not restored once a test changed it,
+    and if no snapshot is taken of a model without a bmi
+    """
+    model = StateModel(read_only=True)
+    model.bmi.update()
+    snapshot = ModelSnapshot.try_take(model)
+    assert snapshot is not None
+    model.bmi.state["precipitation"][:] = 0.0
+    assert not snapshot.restores_into(model)
+    assert ModelSnapshot.try_take(object()) is None
+    with pytest.raises(SnapshotException):
+        ModelSnapshot.take(object())
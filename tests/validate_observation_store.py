@@ -0,0 +1,75 @@
+"""
+A module that has tests that test the observation store
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import grdc_reader
+from ewatercycle_model_testing.observation_store import ObservationStore, align
+
+from .validate_grdc_reader import STATION_FILE
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path):
+    """
+    fixture with a store of a directory with a single small station file
+    """
+    (tmp_path / "1234567_Q_Day.Cmd.txt").write_bytes(STATION_FILE.encode("latin-1"))
+    return ObservationStore(tmp_path, tmp_path / "cache")
+
+
+def validate_station_is_loaded_once_for_all_threads(store, monkeypatch):
+    """
+    tests if concurrent windows of a station share one loaded series
+    """
+    loads = []
+    load = grdc_reader.load_grdc_file
+
+    def counting_load(*args):
+        loads.append(args)
+        return load(*args)
+    monkeypatch.setattr(grdc_reader, "load_grdc_file", counting_load)
+    with ThreadPoolExecutor(4) as pool:
+        windows = list(pool.map(lambda _: store.window("1234567"), range(8)))
+    assert len(loads) == 1
+    assert all(np.shares_memory(values, windows[0][1]) for (_, values) in windows)
+
+
+def validate_window_is_a_read_only_view(store):
+    """
+    tests if a window is found by time and does not copy the stored series
+    """
+    (times, values) = store.window("1234567", "2000-01-02T00:00:00Z",
+                                   "2000-01-03T12:30:00Z")
+    assert list(times.astype("datetime64[D]").astype(str)) == ["2000-01-02",
+                                                               "2000-01-03"]
+    assert np.shares_memory(values, store.series("1234567").values)
+    assert not values.flags.writeable
+    assert len(store.window("1234567", "2001-01-01", None)[0]) == 0
+    assert len(store.to_dataframe("1234567", None, "2000-01-01")) == 1
+
+
+def validate_align_matches_days():
+    """
+    tests if model timestamps are matched to the observation of their day
+    """
+    observation_times = np.array(["2000-01-01", "2000-01-02", "2000-01-04"],
+                                 dtype="datetime64[ns]")
+    times = np.array(["2000-01-01T12:00", "2000-01-03T12:00", "2000-01-04T12:00",
+                      "2000-01-05T12:00"], dtype="datetime64[ns]")
+    aligned = align(times, observation_times, np.array([1.0, 2.0, 4.0]))
+    assert np.array_equal(aligned, [1.0, np.nan, 4.0, np.nan], equal_nan=True)
+
+
+def validate_aligned_observations_of_station(store):
+    """
+    tests if a store aligns the observations of a station to model timestamps
+    """
+    times = np.array(["2000-01-02T06:00", "2000-01-03T06:00", "2000-01-04T06:00"],
+                     dtype="datetime64[ns]")
+    aligned = store.aligned("1234567", times)
+    assert np.array_equal(aligned, [np.nan, 812.0, 796.0], equal_nan=True)
+    assert len(store.aligned("1234567", [])) == 0
@@ -0,0 +1,146 @@
+"""
+A module that has tests that test the output recorder
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing.output_recorder import OutputRecorder
+
+
+class GridBmi:
+    """
+    bmi mock that writes the discharge into the array it is given
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.destinations = []
+
+    def get_value(self, _, dest):
+        """
+        fills dest with the discharge of every cell
+        """
+        self.destinations.append(dest)
+        dest[:] = self.model.values()
+        return dest
+
+
+class GridModel:
+    """
+    model mock with a 2 by 3 grid whose discharge is time plus the index of the cell
+    """
+
+    def __init__(self, end_time=10.0, time_step=1.0, with_bmi=True):
+        self.time = 0.0
+        self.end_time = end_time
+        self.time_step = time_step
+        self.bmi = GridBmi(self) if with_bmi else None
+        self.arrays = 0
+
+    @property
+    def time_as_datetime(self):
+        """
+        returns the time as a date, counting days from 2000
+        """
+        return datetime(2000, 1, 1) + timedelta(days=self.time)
+
+    def values(self):
+        """
+        returns the flat discharge of the grid
+        """
+        return self.time + np.arange(6.0)
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        self.time += 1.0
+
+    def get_value(self, _):
+        """
+        returns a copy of the flat discharge
+        """
+        return self.values()
+
+    def get_value_as_xarray(self, name):
+        """
+        returns the discharge as a DataArray on the grid
+        """
+        self.arrays += 1
+        return xr.DataArray(self.values().reshape(2, 3), dims=("latitude", "longitude"),
+                            coords={"latitude": [51.0, 52.0], "longitude": [6.0, 6.5, 7.0],
+                                    "time": self.time_as_datetime},
+                            name=name, attrs={"units": "m3 s-1"})
+
+
+def expected(model_end_time):
+    """
+    returns the discharge a run of a GridModel should record
+    """
+    return (np.arange(1.0, model_end_time + 1)[:, None, None]
+            + np.arange(6.0).reshape(2, 3))
+
+
+def validate_recorder_writes_into_preallocated_buffer():
+    """
+    tests if every timestep is written into one buffer without a DataArray per step
+    """
+    model = GridModel()
+    result = OutputRecorder(model, "discharge").run()
+    assert model.arrays == 1
+    assert result.dims == ("time", "latitude", "longitude")
+    assert result.shape == (10, 2, 3)
+    assert np.array_equal(result.values, expected(10))
+    assert all(np.shares_memory(dest, result.values) for dest in model.bmi.destinations)
+    assert result["time"].values[0] == np.datetime64("2000-01-02")
+    assert list(result["longitude"].values) == [6.0, 6.5, 7.0]
+    assert result.attrs["units"] == "m3 s-1"
+    assert result.name == "discharge"
+
+
+def validate_recorder_matches_concatenated_arrays():
+    """
+    tests if the recording equals the concatenation of a DataArray per step
+    """
+    model = GridModel(end_time=5.0)
+    arrays = []
+    while model.time < model.end_time:
+        model.update()
+        arrays.append(model.get_value_as_xarray("discharge"))
+    concatenated = xr.concat(arrays, dim="time")
+    recorded = OutputRecorder(GridModel(end_time=5.0, with_bmi=False), "discharge").run()
+    xr.testing.assert_identical(recorded, concatenated)
+
+
+def validate_recorder_grows_beyond_expected_steps():
+    """
+    tests if a model without a time step is still recorded to its end
+    """
+    model = GridModel(time_step=None)
+    result = OutputRecorder(model, "discharge").run()
+    assert np.array_equal(result.values, expected(10))
+
+
+def validate_recorder_spills_chunks_to_netcdf(tmp_path, monkeypatch):
+    """
+    tests if a recorder with a memory limit writes full chunks to disk
+    """
+    monkeypatch.setenv(c.OUTPUT_RECORDER_MAX_BYTES_ENV, str(3 * 6 * 8))
+    recorder = OutputRecorder(GridModel(), "discharge", spill_dir=tmp_path)
+    result = recorder.run()
+    assert len(recorder.chunks) == 4
+    assert np.array_equal(result.values, expected(10))
+    assert result["time"].values[-1] == np.datetime64("2000-01-11")
+    result.close()
+
+
+def validate_recorder_rejects_unknown_format():
+    """
+    tests if only the supported spill formats are accepted
+    """
+    with pytest.raises(ValueError):
+        OutputRecorder(GridModel(), "discharge", spill_format="csv")
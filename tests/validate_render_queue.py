@@ -0,0 +1,62 @@
+"""
+A module that has tests that test the deferred rendering of hydrographs
+"""
+import ewatercycle.analysis
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from ewatercycle_model_testing.render_queue import PlotSpec, RenderQueue
+
+
+@pytest.fixture(name="hydrograph")
+def hydrograph_fixture(monkeypatch):
+    """
+    fixture that replaces the eWaterCycle hydrograph with a plain line plot
+    """
+    def hydrograph(discharge, reference):
+        if reference not in discharge:
+            raise KeyError(reference)
+        fig, ax = plt.subplots()
+        discharge.plot(ax=ax)
+        return fig, ax
+    monkeypatch.setattr(ewatercycle.analysis, "hydrograph", hydrograph, raising=False)
+
+
+def validate_plot_spec_round_trips_a_dataframe():
+    """
+    tests if a spec holds the columns and index of the discharge it was made from
+    """
+    discharge = pd.DataFrame({"GRDC": [1.0, 2.0], "Model name": [1.5, 2.5]},
+                             index=pd.date_range("2000-01-01", periods=2, name="time"))
+    spec = PlotSpec.from_dataframe("plot.png", discharge)
+    discharge.iloc[0, 0] = 9.0
+    assert spec.series["GRDC"][0] == 1.0
+    assert list(spec.to_dataframe().columns) == ["GRDC", "Model name"]
+    assert spec.to_dataframe().index.name == "time"
+
+
+def validate_flush_renders_queued_specs_once(tmp_path, hydrograph):
+    """
+    tests if flushing renders every queued spec and empties the queue
+    """
+    queue = RenderQueue(executor="serial")
+    series = {"GRDC": np.arange(5.0), "Model name": np.arange(5.0) + 1}
+    queue.submit(PlotSpec(str(tmp_path / "first.png"), series))
+    queue.extend([PlotSpec(str(tmp_path / "second.png"), series, reference="missing")])
+    errors = queue.flush()
+    assert errors[str(tmp_path / "first.png")] is None
+    assert errors[str(tmp_path / "second.png")] is not None
+    assert (tmp_path / "first.png").exists()
+    assert queue.flush() == {}
+
+
+def validate_drain_empties_the_queue():
+    """
+    tests if draining returns the queued specs without rendering them
+    """
+    queue = RenderQueue()
+    queue.submit(PlotSpec("plot.png"))
+    assert [spec.path for spec in queue.drain()] == ["plot.png"]
+    assert queue.drain() == []
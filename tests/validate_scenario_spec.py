@@ -0,0 +1,87 @@
+"""
+A module that has tests that test the scenario spec format
+"""
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import scenario_transforms as st
+from ewatercycle_model_testing.scenario_spec import (
+    ScenarioSpec,
+    ScenarioSpecException,
+    UnknownTransformException,
+    load_scenario_specs,
+)
+
+SPIKE_YAML = """
+name: mid_spike
+seed: 3
+transforms:
+  - transform: noise
+    low: 1
+    high: 100
+    scale: 0.00000001
+  - transform: spike
+    position: 0.5
+    height: 0.001
+"""
+
+
+def validate_yaml_compiles_into_transforms():
+    """
+    tests if a spec gives the same values as the transforms it describes
+    """
+    spec = ScenarioSpec.from_yaml(SPIKE_YAML)
+    expected = st.apply(st.chain(st.noise(1, 100, 0.00000001), st.spike(0.5, 0.001)),
+                        np.ones(20), seed=3)
+    assert (st.apply(spec.compile(), np.ones(20), seed=spec.seed) == expected).all()
+    assert spec.variable == "pr"
+
+
+def validate_nested_period_transforms():
+    """
+    tests if period transforms compile their inner transforms
+    """
+    spec = ScenarioSpec.from_dict({"name": "first_half", "transforms": [
+        {"transform": "period", "start": 0.5, "stop": 1,
+         "inner": [{"transform": "zeroes"}]}]})
+    values = st.apply(spec.compile(), np.ones(4))
+    assert list(values) == [1, 1, 0, 0]
+
+
+def validate_specs_are_hashable_and_stable():
+    """
+    tests if equal specs are equal, hash equally and have the same digest
+    """
+    first = ScenarioSpec.from_yaml(SPIKE_YAML)
+    second = ScenarioSpec.from_dict(first.to_dict())
+    other = ScenarioSpec.from_dict({**first.to_dict(), "seed": 4})
+    assert first == second
+    assert len({first, second, other}) == 2
+    assert first.digest() == second.digest()
+    assert first.digest() != other.digest()
+
+
+def validate_invalid_specs_are_rejected():
+    """
+    tests if unknown transforms, arguments and keys raise an exception
+    """
+    with pytest.raises(UnknownTransformException):
+        ScenarioSpec.from_dict({"name": "a", "transforms": [{"transform": "flood"}]})
+    with pytest.raises(ScenarioSpecException):
+        ScenarioSpec.from_dict({"name": "a", "transforms": [
+            {"transform": "spike", "position": 0.5}]})
+    with pytest.raises(ScenarioSpecException):
+        ScenarioSpec.from_dict({"name": "a", "transform": []})
+
+
+def validate_load_scenario_specs(tmp_path):
+    """
+    tests if a YAML file with a list of specs is loaded by name
+    """
+    path = tmp_path / "scenarios.yaml"
+    path.write_text("- name: zeroes\n  transforms:\n    - transform: zeroes\n"
+                    "- name: ramp\n  transforms:\n    - transform: ramp\n"
+                    "      start: 0\n      step: 1\n")
+    specs = load_scenario_specs(path)
+    assert sorted(specs) == ["ramp", "zeroes"]
+    assert list(st.apply(specs["ramp"].compile(), np.zeros(3))) == [0, 1, 2]
@@ -0,0 +1,172 @@
+"""
+A module that has tests that test scenario sweeps
+"""
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import scenario_sweep, scenarios_util
+from ewatercycle_model_testing.scenario_spec import ScenarioSpecException
+from ewatercycle_model_testing.test import Test
+from ewatercycle_model_testing.test_bank import TestBank
+from ewatercycle_model_testing.test_result import TestResult
+from ewatercycle_model_testing.test_suite import TestSuite
+
+
+class SpikeForcing:
+    """
+    forcing mock that only knows where its spike is
+    """
+
+    def __init__(self, position, height):
+        self.position = position
+        self.height = height
+        self.end_time = 20.0
+
+
+class SpikeModel:
+    """
+    model mock whose discharge peaks two timesteps after the precipitation spike
+    """
+
+    def __init__(self, forcing):
+        self.forcing = forcing
+        self.time = 0.0
+        self.end_time = forcing.end_time
+
+    def setup(self, end_time, cfg_dir):
+        """
+        mocks setting up the model
+        """
+        return "cfg", cfg_dir
+
+    def initialize(self, cfg_file):
+        """
+        mocks initializing the model
+        """
+
+    def update(self):
+        """
+        advances the model by one timestep
+        """
+        self.time += 1.0
+
+    def get_value(self, _):
+        """
+        returns a discharge peak two steps after the spike
+        """
+        peak = int(self.forcing.position * self.end_time) + 2
+        return np.array([self.forcing.height if self.time - 1 == peak else 0.0])
+
+    def finalize(self):
+        """
+        mocks finalizing the model
+        """
+
+
+def spike_forcing(spec, _):
+    """
+    forcing generator mock that reads the spike from the spec
+    """
+    spike = [step for step in spec.to_dict()["transforms"] if step["transform"] == "spike"][0]
+    return SpikeForcing(spike["position"], spike["height"])
+
+
+def peak_after_spike(model, outputvar):
+    """
+    test mock that passes if the discharge ever peaks
+    """
+    while model.time < model.end_time:
+        model.update()
+        if model.get_value(outputvar)[0] > 0:
+            return TestResult(True)
+    return TestResult(False, "no peak")
+
+
+def not_applicable(model, outputvar):
+    """
+    test mock that does not apply to the model
+    """
+    while model.time < model.end_time:
+        model.update()
+    return TestResult(False, "not scored", skipped=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_fixture(monkeypatch):
+    """
+    fixture to reset the test registries and replace forcings and models by mocks
+    """
+    Test.boundInstances.clear()
+    Test.existingTestNames.clear()
+    TestBank.boundInstances.clear()
+    if TestSuite._TestSuite__instance:
+        TestSuite._TestSuite__instance = None
+    monkeypatch.setattr(scenarios_util, "get_scenario_forcing", spike_forcing)
+    monkeypatch.setattr(TestSuite, "make_model_instance",
+                        staticmethod(lambda name, forcing, parameter_set: SpikeModel(forcing)))
+    yield
+
+
+def validate_expand_grid():
+    """
+    tests if a template is expanded into every combination of the grid
+    """
+    variants = scenario_sweep.expand(scenarios_util.SCENARIOS["mid_spike"],
+                                     {"spike.position": [0.1, 0.5], "spike.height": [1, 2, 3]})
+    assert len(variants) == 6
+    assert len({spec for (_, spec) in variants}) == 6
+    (parameters, spec) = variants[-1]
+    assert parameters == {"spike.position": 0.5, "spike.height": 3}
+    assert spec.to_dict()["transforms"][1]["position"] == 0.5
+    with pytest.raises(ScenarioSpecException):
+        scenario_sweep.expand(scenarios_util.SCENARIOS["mid_spike"], {"ramp.step": [1]})
+
+
+def validate_peak_lag():
+    """
+    tests if the peak lag is measured from the spike position
+    """
+    spec = scenarios_util.SCENARIOS["mid_spike"]
+    discharge = np.zeros(100)
+    discharge[53] = 1.0
+    assert scenario_sweep.peak_lag(discharge, spec) == 3.0
+
+
+def validate_run_sweep_gives_response_surface():
+    """
+    tests if a sweep runs every variant and its check on a single model run each
+    """
+    Test(name="peak_after_spike", run=peak_after_spike)
+    surface = scenario_sweep.run_sweep(
+        "spikemock", "Lumped", "discharge", scenarios_util.SCENARIOS["mid_spike"],
+        {"spike.position": [0.1, 0.25, 0.5], "spike.height": [1.0, 2.0]},
+        test_name="peak_after_spike", forcing_executor="serial", max_workers=4)
+    assert surface["response"].dims == ("spike.position", "spike.height")
+    assert (surface["response"].values == 2.0).all()
+    assert surface["passed"].values.all()
+    assert TestSuite().get_test("peak_after_spike").test_result is None
+
+
+def validate_skipped_check_is_not_a_failure():
+    """
+    tests if a check that does not apply is recorded as skipped instead of as failed
+    """
+    Test(name="not_applicable", run=not_applicable)
+    surface = scenario_sweep.run_sweep(
+        "spikemock", "Lumped", "discharge", scenarios_util.SCENARIOS["mid_spike"],
+        {"spike.position": [0.1, 0.5]}, test_name="not_applicable",
+        forcing_executor="serial")
+    assert surface["skipped"].values.all()
+    assert not surface["passed"].values.any()
+
+
+def validate_failed_variant_has_no_response(monkeypatch):
+    """
+    tests if a variant that raises gets a NaN response instead of failing the sweep
+    """
+    monkeypatch.setattr(SpikeModel, "update", lambda self: 1 / 0)
+    surface = scenario_sweep.run_sweep(
+        "spikemock", "Lumped", "discharge", scenarios_util.SCENARIOS["mid_spike"],
+        {"spike.position": [0.1, 0.5]}, forcing_executor="serial")
+    assert np.isnan(surface["response"].values).all()
+    assert "passed" not in surface
@@ -0,0 +1,100 @@
+"""Module containing the tests for the scenario_transforms module."""
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import scenario_transforms as st
+
+
+def distributed(n_time=10, dtype=np.float32):
+    """Create distributed forcing values with some zero and missing cells."""
+    values = np.ones((n_time, 3, 4), dtype=dtype)
+    values[0, 0, 0] = 0
+    values[1, 1, 1] = np.nan
+    return values
+
+
+def validate_shape_and_dtype_are_kept():
+    """Test if every transform keeps the shape and dtype of the values."""
+    transforms = [st.zeroes(), st.noise(1, 100, 0.0000001), st.ramp(0.001, -0.0000001),
+                  st.fill_missing(1, 100, 0.0000001), st.spike(0.5, 0.001),
+                  st.period(0, 0.5, st.zeroes())]
+    for transform in transforms:
+        values = st.apply(transform, distributed(), seed=1)
+        assert values.shape == (10, 3, 4)
+        assert values.dtype == np.float32
+
+
+def validate_seed_makes_noise_reproducible():
+    """Test if the same seed gives the same noise and another seed does not."""
+    first = st.apply(st.noise(1, 100, 0.00000001), distributed(), seed=1)
+    second = st.apply(st.noise(1, 100, 0.00000001), distributed(), seed=1)
+    third = st.apply(st.noise(1, 100, 0.00000001), distributed(), seed=2)
+    assert (first == second).all()
+    assert (first != third).any()
+    assert first.min() >= np.float32(0.00000001) and first.max() <= np.float32(0.00000099)
+
+
+def validate_fill_missing_only_fills_zero_and_nan():
+    """Test if only zero and missing values are replaced."""
+    values = st.apply(st.fill_missing(1, 100, 0.0000001), distributed(), seed=1)
+    assert not np.isnan(values).any()
+    assert 0 < values[0, 0, 0] < 0.00001
+    assert 0 < values[1, 1, 1] < 0.00001
+    assert (values[2:] == 1).all()
+
+
+def validate_ramp_is_linear_in_time():
+    """Test if a ramp matches the timestep based formula for lumped values."""
+    values = st.apply(st.ramp(0.001, -0.0000001), np.ones(5))
+    assert np.allclose(values, [0.001 - 0.0000001 * t for t in range(5)])
+
+
+def validate_spike_positions():
+    """Test if spikes land on the same timesteps as the original scenarios."""
+    for position, expected in ((0.5, 183), (0.1, 36), (0.8, 292)):
+        values = st.apply(st.chain(st.noise(1, 100, 0.00000001),
+                                   st.spike(position, 0.001)), np.ones(366))
+        assert np.argmax(values) == expected
+        assert np.count_nonzero(values == 0.001) == 1
+
+
+def validate_halves_leave_middle_of_odd_length():
+    """Test if the half periods skip the middle timestep of an odd length."""
+    values = st.apply(st.chain(st.period(0, 0.5, st.noise(1, 100, 0.0000001)),
+                               st.period(0.5, 1, st.zeroes())), distributed(n_time=5))
+    assert (values[:2] < 0.00001).all() and (values[:2] > 0).all()
+    assert (values[2, 2:] == 1).all()
+    assert (values[3:] == 0).all()
+
+
+def validate_transform_on_block_matches_whole():
+    """Test if a deterministic transform gives the same result per block of time."""
+    whole = st.apply(st.ramp(0.001, -0.0000001), distributed())
+    blocks = distributed()
+    transform = st.chain(st.ramp(0.001, -0.0000001), st.spike(0.5, 0.001))
+    for start in range(0, 10, 4):
+        block = blocks[start:start + 4]
+        transform(block, np.arange(start, start + len(block)), 10, np.random.default_rng())
+    whole[5] = 0.001
+    assert (blocks == whole).all()
+
+
+def validate_blockwise_matches_whole():
+    """Test if applying a transform per dask block gives the same result as at once."""
+    dask_array = pytest.importorskip("dask.array")
+    transform = st.chain(st.ramp(0.001, -0.0000001), st.spike(0.5, 0.001),
+                         st.period(0.5, 1, st.zeroes()))
+    whole = st.apply(transform, distributed())
+    array = dask_array.from_array(distributed(), chunks=(4, 3, 4))
+    blocks = st.apply_blockwise(transform, array).compute()
+    assert (blocks == whole).all()
+
+
+def validate_blockwise_noise_is_reproducible():
+    """Test if blockwise noise only depends on the seed and the blocks."""
+    dask_array = pytest.importorskip("dask.array")
+    array = dask_array.from_array(distributed(), chunks=(4, 3, 4))
+    first = st.apply_blockwise(st.noise(1, 100, 0.00000001), array, seed=1).compute()
+    second = st.apply_blockwise(st.noise(1, 100, 0.00000001), array, seed=1).compute()
+    assert (first == second).all()
+    assert (first[:4] != first[4:8]).any()
@@ -1,17 +1,119 @@
 """Module containing the tests for the ScenariosUtil module."""
 import math
+from pathlib import Path
 
+import dask.array as da
+import numpy as np
 import pytest
 import xarray as xr
 
+from ewatercycle_model_testing import scenario_transforms as st
 from ewatercycle_model_testing import scenarios_util
+from ewatercycle_model_testing.forcing_cache import ForcingCache
+from ewatercycle_model_testing.scenario_spec import ScenarioSpec
+
+
+class FakeForcing:
+    """Forcing mock that writes a small precipitation file instead of running a recipe."""
+    generated = 0
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.filenames = {'pr': 'pr.nc', 'tas': 'tas.nc'}
+
+    @classmethod
+    def generate(cls, dataset, start_time, end_time, shape, directory):
+        """Write a base forcing with precipitation and temperature."""
+        cls.generated += 1
+        Path(directory).mkdir(parents=True)
+        time = np.arange(10)
+        xr.Dataset({'pr': ('time', np.ones(10))}, coords={'time': time}).to_netcdf(
+            Path(directory) / 'pr.nc')
+        xr.Dataset({'tas': ('time', np.ones(10))}, coords={'time': time}).to_netcdf(
+            Path(directory) / 'tas.nc')
+        return cls(directory)
+
+    @classmethod
+    def load(cls, directory):
+        """Load a forcing from its directory."""
+        return cls(directory)
+
+
+class FakeDistributedForcing(FakeForcing):
+    """Forcing mock that writes a small distributed precipitation file."""
+
+    @classmethod
+    def generate(cls, dataset, start_time, end_time, shape, directory):
+        """Write a base forcing with a precipitation grid."""
+        Path(directory).mkdir(parents=True)
+        pr = np.ones((40, 6, 8), dtype=np.float32)
+        xr.Dataset({'pr': (('time', 'lat', 'lon'), pr)},
+                   coords={'time': np.arange(40)}).to_netcdf(Path(directory) / 'pr.nc')
+        return cls(directory)
+
+
+def validate_scenarios_share_one_base_forcing(tmp_path, monkeypatch):
+    """Test if all scenarios of a builder are derived from a single generated forcing."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    FakeForcing.generated = 0
+    builder = scenarios_util.ScenarioBuilder(FakeForcing)
+    double = ScenarioSpec.from_dict({"name": "double", "transforms": [
+        {"transform": "ramp", "start": 2, "step": 0}]})
+
+    first = builder.build_spec(scenarios_util.SCENARIOS['zeroes'])
+    second = builder.build_spec(double)
+    assert FakeForcing.generated == 1
+    assert first.directory == second.directory
+    assert first.filenames['pr'].startswith('zeroes_')
+    assert second.filenames['tas'] == 'tas.nc'
+    with xr.open_dataset(first.directory / first.filenames['pr']) as data:
+        assert list(data.data_vars) == ['pr']
+        assert (data['pr'].values == 0).all()
+    with xr.open_dataset(second.directory / second.filenames['pr']) as data:
+        assert (data['pr'].values == 2).all()
+    with xr.open_dataset(first.directory / 'pr.nc') as data:
+        assert (data['pr'].values == 1).all()
+
+
+def validate_scenario_files_are_named_after_their_spec(tmp_path, monkeypatch):
+    """Test if scenarios are written to files named after the digest of their spec."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    builder = scenarios_util.ScenarioBuilder(FakeForcing)
+    spec = {"name": "noise", "transforms": [
+        {"transform": "noise", "low": 1, "high": 100, "scale": 0.0000001}]}
+    first = builder.build_spec(ScenarioSpec.from_dict(dict(spec, seed=1)))
+    again = builder.build_spec(ScenarioSpec.from_dict(dict(spec, seed=1)))
+    other = builder.build_spec(ScenarioSpec.from_dict(dict(spec, seed=2)))
+    assert first.filenames['pr'] == again.filenames['pr']
+    assert first.filenames['pr'] != other.filenames['pr']
+    assert first.filenames['pr'] == builder.spec_stem(ScenarioSpec.from_dict(dict(spec, seed=1))) + '.nc'
+    assert not list(first.directory.glob('.*.tmp'))
+
+
+def validate_distributed_scenario_is_chunked_per_timestep(tmp_path, monkeypatch):
+    """Test if distributed scenarios are compressed and stored per timestep."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    builder = scenarios_util.ScenarioBuilder(FakeDistributedForcing, chunk_timesteps=16)
+    spike = ScenarioSpec.from_dict({"name": "spike", "transforms": [
+        {"transform": "zeroes"}, {"transform": "spike", "position": 0.5, "height": 0.001}]})
+    forcing = builder.build_spec(spike)
+    with xr.open_dataset(forcing.directory / forcing.filenames['pr']) as data:
+        assert data['pr'].dtype == np.float32
+        assert data['pr'].shape == (40, 6, 8)
+        assert data['pr'].encoding['chunksizes'] == (1, 6, 8)
+        assert data['pr'].encoding['zlib']
+        assert np.argmax(data['pr'].values[:, 0, 0]) == 20
+
 
 
 @pytest.mark.skip(reason = "fails on pipeline for unknown reasons")
 def validate_get_zeroes_lumped():
     """Test the getZeroesLumpedScenario method."""
     forcing = scenarios_util.get_zeroes_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('zeroes_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     for a in enumerate(data['pr'].values):
@@ -21,7 +123,7 @@ def validate_get_zeroes_lumped():
 def validate_get_zeroes_distributed_scenario():
     """Test the getZeroesDistributedScenario method."""
     forcing = scenarios_util.get_zeroes_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('zeroes_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     for a in enumerate(data['pr'].values):
@@ -33,7 +135,7 @@ def validate_get_zeroes_distributed_scenario():
 def validate_get_non_zeroes_lumped_scenario():
     """Test the getNonZeroesLumpedScenario method."""
     forcing = scenarios_util.get_non_zeroes_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('non_zeroes_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     for a in enumerate(data['pr'].values):
@@ -43,7 +145,7 @@ def validate_get_non_zeroes_lumped_scenario():
 def validate_get_non_zeroes_distributed_scenario():
     """Test the getNonZeroesDistributedScenario method."""
     forcing = scenarios_util.get_non_zeroes_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('non_zeroes_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     for a in enumerate(data['pr'].values):
@@ -55,7 +157,7 @@ def validate_get_non_zeroes_distributed_scenario():
 def validate_get_increasing_scenario():
     """Test the getIncreasingScenario method."""
     forcing = scenarios_util.get_increasing_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('increasing_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.0000001
@@ -67,7 +169,7 @@ def validate_get_increasing_scenario():
 def validate_get_decreasing_scenario():
     """Test the getDecreasingScenario method."""
     forcing = scenarios_util.get_decreasing_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('decreasing_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -79,7 +181,7 @@ def validate_get_decreasing_scenario():
 def validate_get_mid_spike_lumped_scenario():
     """Test the getMidSpikeLumpedScenario method."""
     forcing = scenarios_util.get_mid_spike_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('mid_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -97,7 +199,7 @@ def validate_get_mid_spike_lumped_scenario():
 def validate_get_mid_spike_distributed_scenario():
     """Test the getMidSpikeDistributedScenario method."""
     forcing = scenarios_util.get_mid_spike_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('mid_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -116,7 +218,7 @@ def validate_get_mid_spike_distributed_scenario():
 def validate_get_start_spike_lumped_scenario():
     """Test the getStartSpikeLumpedScenario method."""
     forcing = scenarios_util.get_start_spike_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('start_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -134,7 +236,7 @@ def validate_get_start_spike_lumped_scenario():
 def validate_get_start_spike_distributed_scenario():
     """Test the getStartSpikeDistributedScenario method."""
     forcing = scenarios_util.get_start_spike_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('start_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -153,7 +255,7 @@ def validate_get_start_spike_distributed_scenario():
 def validate_get_end_spike_lumped_scenario():
     """Test the getEndSpikeLumpedScenario method."""
     forcing = scenarios_util.get_end_spike_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('end_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -171,7 +273,7 @@ def validate_get_end_spike_lumped_scenario():
 def validate_get_end_spike_distributed_scenario():
     """Test the getEndSpikeDistributedScenario method."""
     forcing = scenarios_util.get_end_spike_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('end_spike_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     number = 0.001
@@ -190,7 +292,7 @@ def validate_get_end_spike_distributed_scenario():
 def validate_get_second_half_precip_lumped_scenario():
     """Test the getSecondHalfPrecipLumpedScenario method."""
     forcing = scenarios_util.get_second_half_precip_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('second_half_precip_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     length = len(data['pr'].values)
@@ -203,7 +305,7 @@ def validate_get_second_half_precip_lumped_scenario():
 def validate_get_second_half_precip_distributed_scenario():
     """Test the getSecondHalfPrecipDistributedScenario method."""
     forcing = scenarios_util.get_second_half_precip_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('second_half_precip_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     length = len(data['pr'].values)
@@ -220,7 +322,7 @@ def validate_get_second_half_precip_distributed_scenario():
 def validate_get_first_half_precip_lumped_scenario():
     """Test the getFirstHalfPrecipLumpedScenario method."""
     forcing = scenarios_util.get_first_half_precip_lumped_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('first_half_precip_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     length = len(data['pr'].values)
@@ -233,7 +335,7 @@ def validate_get_first_half_precip_lumped_scenario():
 def validate_get_first_half_precip_distributed_scenario():
     """Test the getFirstHalfPrecipDistributedScenario method."""
     forcing = scenarios_util.get_first_half_precip_distributed_scenario()
-    assert forcing.filenames['pr'] == 'data.nc'
+    assert forcing.filenames['pr'].startswith('first_half_precip_')
     path = str(forcing.directory) + "/" + forcing.filenames.get('pr')
     data = xr.open_dataset(path)
     length = len(data['pr'].values)
@@ -245,3 +347,43 @@ def validate_get_first_half_precip_distributed_scenario():
         for grid in data['pr'].values[a]:
             for i in range(0, len(grid)):
                 assert grid[i] ==  0
+
+
+def validate_spec_scenarios_are_reused(tmp_path, monkeypatch):
+    """Test if a scenario spec is only computed once and reused afterwards."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    builder = scenarios_util.ScenarioBuilder(FakeForcing)
+    spec = scenarios_util.SCENARIOS['mid_spike']
+    first = builder.build_spec(spec)
+    path = first.directory / first.filenames['pr']
+    modified = path.stat().st_mtime_ns
+    second = scenarios_util.ScenarioBuilder(FakeForcing).build_spec(spec)
+    assert second.filenames['pr'] == first.filenames['pr']
+    assert path.stat().st_mtime_ns == modified
+    assert first.filenames['pr'].startswith('mid_spike_')
+
+
+def validate_spec_scenario_is_written_once(tmp_path, monkeypatch):
+    """Test if a spec is streamed into its netCDF file only, with the spec's values."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    builder = scenarios_util.ScenarioBuilder(FakeDistributedForcing, chunk_timesteps=16)
+    spec = scenarios_util.SCENARIOS['mid_spike']
+    forcing = builder.build_spec(spec)
+    written = {path.name for path in forcing.directory.iterdir() if path.suffix in ('.nc', '.npy')} - {'pr.nc'}
+    assert written == {forcing.filenames['pr']}
+    with xr.open_dataset(forcing.directory / 'pr.nc') as data:
+        expected = st.apply_blockwise(spec.compile(), da.from_array(data['pr'].values, chunks=(16, 6, 8)),
+                                      spec.seed).compute()
+    assert np.array_equal(scenarios_util.load_scenario_array(forcing), expected)
+
+
+def validate_load_scenario_array(tmp_path, monkeypatch):
+    """Test if the values of a scenario are read from its netCDF file."""
+    cache = ForcingCache(tmp_path / "cache")
+    monkeypatch.setattr(scenarios_util, "get_forcing_cache", lambda: cache)
+    forcing = scenarios_util.ScenarioBuilder(FakeForcing).build_spec(scenarios_util.SCENARIOS['zeroes'])
+    values = scenarios_util.load_scenario_array(forcing)
+    assert values.shape == (10,)
+    assert (values == 0).all()
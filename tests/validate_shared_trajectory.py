@@ -0,0 +1,120 @@
+"""
+A module that has tests that test the shared trajectory execution mode
+"""
+import pytest
+
+from ewatercycle_model_testing.shared_trajectory import SharedTrajectory
+from ewatercycle_model_testing.test import Test
+from ewatercycle_model_testing.test_bank import TestBank
+from ewatercycle_model_testing.test_result import TestResult
+
+
+class CountingModel:
+    """
+    model mock that counts how often it is updated
+    """
+
+    def __init__(self, end_time=10.0, fail_at=None):
+        self.time = 0.0
+        self.end_time = end_time
+        self.updates = 0
+        self.fail_at = fail_at
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        if self.fail_at is not None and self.time >= self.fail_at:
+            raise ValueError("model broke")
+        self.updates += 1
+        self.time += 1.0
+
+    def get_value(self, _):
+        """
+        returns the current time as output
+        """
+        return [self.time]
+
+
+def observe_all(model, outputvar):
+    """
+    test mock that steps to the end and checks every output value
+    """
+    expected = 1.0
+    while model.time < model.end_time:
+        model.update()
+        if model.get_value(outputvar)[0] != expected:
+            return TestResult(False, "unexpected value")
+        expected += 1.0
+    return TestResult(True)
+
+
+def stop_early(model, _):
+    """
+    test mock that stops observing after a few steps
+    """
+    for _ in range(3):
+        model.update()
+    return TestResult(True)
+
+
+def run_to_end(model, _):
+    """
+    test mock that runs the model to the end
+    """
+    try:
+        while model.time < model.end_time:
+            model.update()
+        return TestResult(True)
+    except Exception as e:
+        return TestResult(False, str(e))
+
+
+@pytest.fixture(autouse=True)
+def clean_fixture():
+    """
+    fixture to reset the test registries before each test
+    """
+    Test.boundInstances.clear()
+    Test.existingTestNames.clear()
+    TestBank.boundInstances.clear()
+    yield
+
+
+def validate_model_is_stepped_once():
+    """
+    tests if all subscribers observe every step while the model is updated only once
+    """
+    model = CountingModel()
+    tests = [Test(name="A", run=observe_all), Test(name="B", run=observe_all),
+             Test(name="C", run=run_to_end)]
+    result = {}
+    SharedTrajectory(model).run(tests, "discharge", result)
+    assert model.updates == 10
+    assert all(result[name]["passed"] for name in ("A", "B", "C"))
+
+
+def validate_subscriber_can_stop_early():
+    """
+    tests if a subscriber that stops early does not block the others
+    """
+    model = CountingModel()
+    tests = [Test(name="A", run=stop_early), Test(name="B", run=observe_all)]
+    result = {}
+    SharedTrajectory(model).run(tests, "discharge", result)
+    assert model.updates == 10
+    assert result["A"]["passed"]
+    assert result["B"]["passed"]
+
+
+def validate_update_error_reaches_all_subscribers():
+    """
+    tests if an error during update is raised in every subscriber
+    """
+    model = CountingModel(fail_at=4.0)
+    tests = [Test(name="A", run=run_to_end), Test(name="B", run=run_to_end)]
+    result = {}
+    SharedTrajectory(model).run(tests, "discharge", result)
+    assert not result["A"]["passed"]
+    assert not result["B"]["passed"]
+    assert result["A"]["reason"] == result["B"]["reason"] == "model broke"
@@ -0,0 +1,137 @@
+"""
+A module that has tests that test the spin-up cache
+"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import metric_tests, scenario_tests
+from ewatercycle_model_testing.model_snapshot import ModelSnapshot
+from ewatercycle_model_testing.spin_up import SpinUpCache, SpinUpException, spin_up, spin_up_steps_from_env
+
+from .validate_model_snapshot import StateModel
+
+
+class SpinUpModel(StateModel):
+    """
+    state model mock with a time and an end time
+    """
+
+    def __init__(self, end_time=10.0):
+        super().__init__()
+        self.end_time = end_time
+
+    @property
+    def time(self):
+        """
+        returns the time of the bmi
+        """
+        return self.bmi.time
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        self.bmi.update()
+
+
+def validate_spin_up_stops_at_end_time():
+    """
+    tests if a model is spun up for the warm-up window, but not beyond its end
+    """
+    assert spin_up(SpinUpModel(), 3).values["storage"][0] == 3.0
+    state = spin_up(SpinUpModel(end_time=2.0), 3)
+    assert state.time == 2.0
+    assert state.values["storage"][0] == 2.0
+
+
+def validate_key_covers_everything_that_determines_the_state(tmp_path):
+    """
+    tests if the key is stable, also when the forcing is touched, and changes with the
+    model, the contents of the forcing, the setup and the window
+    """
+    (tmp_path / "pr.nc").write_bytes(b"12")
+    forcing = SimpleNamespace(directory=str(tmp_path), start_time="2000")
+    key = SpinUpCache.key("m", None, forcing, {"a": 1}, 10)
+    assert key == SpinUpCache.key("m", None, forcing, {"a": 1}, 10)
+    assert key != SpinUpCache.key("n", None, forcing, {"a": 1}, 10)
+    assert key != SpinUpCache.key("m", "set", forcing, {"a": 1}, 10)
+    assert key != SpinUpCache.key("m", None, forcing, {"a": 2}, 10)
+    assert key != SpinUpCache.key("m", None, forcing, {"a": 1}, 20)
+    os.utime(tmp_path / "pr.nc", ns=(0, 0))
+    assert key == SpinUpCache.key("m", None, forcing, {"a": 1}, 10)
+    (tmp_path / "pr.nc").write_bytes(b"13")
+    assert key != SpinUpCache.key("m", None, forcing, {"a": 1}, 10)
+
+
+def validate_snapshot_round_trips_through_a_file(tmp_path):
+    """
+    tests if a saved snapshot loads with the same time and values
+    """
+    snapshot = spin_up(SpinUpModel(), 2)
+    snapshot.save(tmp_path / "state.npz")
+    loaded = ModelSnapshot.load(tmp_path / "state.npz")
+    assert loaded.time == snapshot.time
+    assert list(loaded.values) == list(snapshot.values)
+    assert np.array_equal(loaded.values["storage"], [2.0, np.nan], equal_nan=True)
+    assert os.listdir(tmp_path) == ["state.npz"]
+
+
+def validate_cache_spins_up_once(tmp_path):
+    """
+    tests if a later run reads the state instead of spinning up again, and if the
+    state restores into a model at its start time
+    """
+    spun_up = []
+
+    def run_spin_up():
+        spun_up.append(True)
+        return spin_up(SpinUpModel(), 4)
+    cache = SpinUpCache(tmp_path)
+    cache.get("key", run_spin_up)
+    state = SpinUpCache(tmp_path).get("key", run_spin_up)
+    assert len(spun_up) == 1
+    model = SpinUpModel()
+    assert not state.restores_into(model)
+    assert state.restores_into(model, check_time=False)
+    assert model.bmi.get_value("storage")[0] == 4.0
+
+
+def validate_failed_spin_up_is_not_retried(tmp_path):
+    """
+    tests if a spin-up that raised is not run again by the same cache
+    """
+    spun_up = []
+
+    def run_spin_up():
+        spun_up.append(True)
+        raise ValueError("no state")
+    cache = SpinUpCache(tmp_path)
+    with pytest.raises(ValueError):
+        cache.get("key", run_spin_up)
+    with pytest.raises(SpinUpException, match="no state"):
+        cache.get("key", run_spin_up)
+    assert len(spun_up) == 1
+    assert not cache.path("key").exists()
+
+
+def validate_spin_up_steps_from_env(monkeypatch):
+    """
+    tests if the spin-up is off unless its window is configured
+    """
+    monkeypatch.delenv(c.SPIN_UP_STEPS_ENV, raising=False)
+    assert spin_up_steps_from_env() == 0
+    monkeypatch.setenv(c.SPIN_UP_STEPS_ENV, "365")
+    assert spin_up_steps_from_env() == 365
+
+
+def validate_only_metric_tests_spin_up():
+    """
+    tests if the metric tests start from a spun up model and the scenario tests do not
+    """
+    assert metric_tests.MetricTests.tests
+    assert all(test.spin_up for test in metric_tests.MetricTests.tests)
+    assert not any(test.spin_up for test in scenario_tests.ScenarioTests.tests)
@@ -0,0 +1,131 @@
+"""
+A module that has tests that test the station catalog
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from ewatercycle_model_testing import constants as c
+from ewatercycle_model_testing import metric_tests
+from ewatercycle_model_testing.station_catalog import (
+    Station,
+    StationCatalog,
+    get_station_catalog,
+)
+from ewatercycle_model_testing.station_extraction import StationNotSampledException
+
+from .validate_grdc_reader import STATION_FILE
+
+
+class LatLonModel:
+    """
+    model mock with a rectilinear grid
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+
+    def get_latlon_grid(self, _):
+        """
+        returns the cell centres of the grid
+        """
+        return self.lat, self.lon, (len(self.lat), len(self.lon))
+
+
+def validate_default_catalog_has_the_bundled_stations():
+    """
+    tests if the bundled catalog has the stations of the original metric tests
+    """
+    catalog = get_station_catalog()
+    assert [station.name for station in catalog] == ["rees", "lobith", "schermbeck"]
+    assert catalog.get("rees").id == "6335020"
+    assert catalog.get("unknown") is None
+
+
+def validate_from_yaml(tmp_path):
+    """
+    tests if a catalog is loaded from a YAML file
+    """
+    path = tmp_path / "stations.yaml"
+    path.write_text("- {id: 1234567, name: test, lat: 10.5, lon: 20.25, area: 12}\n")
+    (station,) = StationCatalog.from_yaml(path)
+    assert station == Station("1234567", "test", 10.5, 20.25, 12)
+    assert station.title == "test (1234567)"
+
+
+def validate_from_grdc_directory(tmp_path):
+    """
+    tests if a catalog is created from the headers of GRDC station files
+    """
+    (tmp_path / "1234567_Q_Day.Cmd.txt").write_bytes(STATION_FILE.encode("latin-1"))
+    (tmp_path / "7654321_Q_Day.Cmd.txt").write_bytes(STATION_FILE.replace(
+        "1234567", "7654321").replace("# Table", "# Longitude (DD):     6.25\n# Table")
+        .encode("latin-1"))
+    (station,) = StationCatalog.from_grdc_directory(tmp_path)
+    assert station == Station("7654321", "7654321", 51.5, 6.25, station="TEST")
+    catalog = StationCatalog.from_grdc_directory("grdc-observations")
+    assert {station.id for station in catalog} == {station.id for station
+                                                   in get_station_catalog()}
+
+
+def validate_within_searches_overlapping_buckets():
+    """
+    tests if a bounding box query finds exactly the stations inside the box
+    """
+    stations = [Station(str(index), f"s{index}", lat, lon) for (index, (lat, lon))
+                in enumerate([(0.5, 0.5), (1.5, 1.5), (-0.5, 2.5), (40.0, 40.0)])]
+    catalog = StationCatalog(stations, cell_degrees=1.0)
+    assert catalog.within(0.0, 2.0, 0.0, 2.0) == stations[:2]
+    assert catalog.within(-1.0, 2.0, 0.0, 3.0) == stations[:3]
+    assert not catalog.within(10.0, 20.0, 10.0, 20.0)
+
+
+def validate_in_domain_selects_stations_of_the_grid():
+    """
+    tests if only the stations inside a model grid, widened by half a cell, are used
+    """
+    catalog = get_station_catalog()
+    model = LatLonModel(np.arange(51.0, 52.01, 0.1), np.arange(6.0, 6.61, 0.1))
+    assert [station.name for station in catalog.in_domain(model, "discharge")] == [
+        "rees", "lobith"]
+    model = LatLonModel(np.arange(51.0, 52.01, 0.1), np.arange(6.0, 6.91, 0.1))
+    assert len(catalog.in_domain(model, "discharge")) == 3
+    assert len(catalog.in_domain(object(), "discharge")) == 3
+
+
+def validate_station_outside_domain_is_skipped(monkeypatch):
+    """
+    tests if a metric test of a station outside the model grid is reported as skipped
+    """
+    def get_output(*_):
+        raise StationNotSampledException("rees")
+    monkeypatch.setattr(metric_tests, "get_output", get_output)
+    (test,) = [test for test in metric_tests.MetricTests.tests
+               if test.name == "nash_sutcliffe_efficiency_rees"]
+    result = test.start(LatLonModel([0.0], [0.0]), "discharge")
+    assert result["skipped"]
+    assert not result["passed"]
+    assert result["reason"].endswith("The station was not scored.")
+
+
+def validate_tests_are_generated_per_station():
+    """
+    tests if a metric test of every kind is registered for every catalog station, once
+    """
+    names = {test.name for test in metric_tests.MetricTests.tests}
+    for station in get_station_catalog():
+        assert f"nash_sutcliffe_efficiency_{station.name}" in names
+        assert f"kling_gupta_efficiency_{station.name}" in names
+    assert len(metric_tests.MetricTests.tests) == 2 * len(get_station_catalog())
+
+
+def validate_import_does_not_read_the_catalog(tmp_path):
+    """
+    tests if the metric tests can be imported when the station catalog is missing
+    """
+    env = dict(os.environ, **{c.STATION_CATALOG_ENV: str(tmp_path / "missing.yaml")})
+    subprocess.run([sys.executable, "-c", "import ewatercycle_model_testing.metric_tests"],
+                   env=env, check=True)
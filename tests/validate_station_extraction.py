@@ -0,0 +1,242 @@
+"""
+A module that has tests that test the single pass station extraction
+"""
+import dataclasses
+import threading
+
+import numpy as np
+import pytest
+
+from ewatercycle_model_testing import metric_tests
+from ewatercycle_model_testing import render_queue
+from ewatercycle_model_testing.observation_store import ObservationStore
+from ewatercycle_model_testing.shared_trajectory import SharedTrajectory
+from ewatercycle_model_testing.station_catalog import StationCatalog, get_station_catalog
+from ewatercycle_model_testing.station_extraction import (
+    StationExtraction,
+    get_station_indices,
+    get_station_outputs,
+)
+from ewatercycle_model_testing.test_result import TestResult
+
+from .validate_grdc_reader import STATION_FILE
+
+STATIONS = StationCatalog.coordinates(get_station_catalog())
+
+
+class GaugeModel:
+    """
+    model mock with a discharge of time plus the index of the station
+    """
+
+    def __init__(self, end_time=10.0, time_step=1.0, fail_at=None):
+        self.time = 0.0
+        self.end_time = end_time
+        self.time_step = time_step
+        self.fail_at = fail_at
+        self.updates = 0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        if self.fail_at is not None and self.time >= self.fail_at:
+            raise ValueError("model broke")
+        self.updates += 1
+        self.time += 1.0
+
+    def get_value_at_coords(self, _, lon, lat):
+        """
+        returns the discharge at every requested station
+        """
+        with self._lock:
+            self.samples += 1
+        latitudes = [latitude for (latitude, _) in STATIONS.values()]
+        return np.array([self.time + latitudes.index(value) for value in lat])
+
+
+def validate_extraction_samples_all_stations_in_one_pass():
+    """
+    tests if every station is sampled on every timestep of a single run
+    """
+    model = GaugeModel()
+    output = StationExtraction().run(model, "discharge")
+    assert output.shape == (10, 3)
+    assert model.updates == 10
+    assert model.samples == 10
+    assert np.array_equal(output[:, 1], np.arange(1, 11) + 1)
+
+
+def validate_extraction_grows_beyond_expected_steps():
+    """
+    tests if a model without a time step is still sampled to its end
+    """
+    model = GaugeModel(time_step=None)
+    output = StationExtraction({"rees": STATIONS["rees"]}).run(model, "discharge")
+    assert output.shape == (10, 1)
+    assert np.array_equal(output[:, 0], np.arange(1, 11))
+
+
+def validate_metric_outputs_share_one_trajectory_pass():
+    """
+    tests if the outputs of all stations observed on one trajectory cost one run
+    """
+    model = GaugeModel()
+    catalog = get_station_catalog()
+    outputs = {}
+
+    class Observer:
+        """
+        subscriber that stores the output of a station
+        """
+        def __init__(self, name):
+            self.name = name
+
+        def start(self, view, outvar):
+            """
+            gets the output of the station of the observer
+            """
+            outputs[self.name] = metric_tests.get_output(view, outvar,
+                                                         catalog.get(self.name))
+            return TestResult(True)
+
+    SharedTrajectory(model).run([Observer(name) for name in STATIONS], "discharge", {})
+    assert model.updates == 10
+    assert model.samples == 10
+    for (index, name) in enumerate(STATIONS):
+        assert np.array_equal(outputs[name], np.arange(1, 11) + index)
+
+
+def validate_extraction_error_is_shared():
+    """
+    tests if an error of the model is raised for every station
+    """
+    model = GaugeModel(fail_at=3.0)
+    with pytest.raises(ValueError):
+        get_station_outputs(model, "discharge")
+    with pytest.raises(ValueError):
+        metric_tests.get_output(model, "discharge", get_station_catalog().get("lobith"))
+    assert model.updates == 3
+
+
+class GridBmi:
+    """
+    bmi mock with a discharge of time plus the flat index of the cell
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.reads = 0
+
+    def get_var_grid(self, _):
+        """
+        returns the only grid of the mock
+        """
+        return 0
+
+    def get_value_at_indices(self, _, dest, indices):
+        """
+        writes the discharge of the given cells into dest
+        """
+        self.reads += 1
+        dest[:] = self.model.time + indices
+        return dest
+
+
+class GridModel(GaugeModel):
+    """
+    model mock on a rectilinear grid of 0.1 degree around the stations
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.bmi = GridBmi(self)
+        self.grid_lookups = 0
+
+    def get_latlon_grid(self, _):
+        """
+        returns the latitudes, longitudes and shape of the grid
+        """
+        self.grid_lookups += 1
+        return (np.arange(51.0, 52.0, 0.1), np.arange(6.0, 7.0, 0.1), (10, 10))
+
+
+def validate_station_indices_are_resolved_once():
+    """
+    tests if stations are resolved to the nearest cells once per model and grid
+    """
+    model = GridModel()
+    first = get_station_indices(model, "discharge", STATIONS)
+    second = get_station_indices(model, "discharge", STATIONS)
+    assert model.grid_lookups == 1
+    assert first is second
+    assert list(first) == [8 * 10 + 4, 8 * 10 + 1, 7 * 10 + 9]
+
+
+def validate_extraction_reads_station_cells_only():
+    """
+    tests if the extraction samples the cells of the stations through the bmi
+    """
+    model = GridModel()
+    output = StationExtraction().run(model, "discharge")
+    assert model.bmi.reads == 10
+    assert model.samples == 0
+    assert np.array_equal(output[:, 0], np.arange(1, 11) + 84)
+
+
+def validate_extraction_records_model_times():
+    """
+    tests if the time of every sampled timestep is recorded when the model has one
+    """
+    class DatedModel(GaugeModel):
+        """
+        model mock that reports its time as a datetime of days since 2000
+        """
+        @property
+        def time_as_datetime(self):
+            """
+            returns the current time as a datetime
+            """
+            return np.datetime64("2000-01-01") + np.timedelta64(int(self.time), "D")
+
+    extraction = StationExtraction()
+    extraction.run(DatedModel(), "discharge")
+    assert str(extraction.times[0].astype("datetime64[D]")) == "2000-01-02"
+    extraction.run(GaugeModel(), "discharge")
+    assert np.isnat(extraction.times).all()
+
+
+def validate_observations_are_aligned_to_model_times(tmp_path, monkeypatch):
+    """
+    tests if the observations of a metric test are matched to the model output by
+    date, and if timesteps without an observation are left out of the comparison
+    """
+    class DatedModel(GaugeModel):
+        """
+        model mock that reports its time as a datetime of days since 2000
+        """
+        @property
+        def time_as_datetime(self):
+            """
+            returns the current time as a datetime
+            """
+            return np.datetime64("2000-01-01") + np.timedelta64(int(self.time), "D")
+
+    (tmp_path / "1234567_Q_Day.Cmd.txt").write_bytes(STATION_FILE.encode("latin-1"))
+    monkeypatch.setattr(metric_tests, "get_observation_store", lambda: ObservationStore(tmp_path))
+    # The hydrograph goes to a queue of this test, so no later flush renders it.
+    queue = render_queue.RenderQueue(executor="serial")
+    monkeypatch.setattr(render_queue, "_default_queue", queue)
+    station = dataclasses.replace(get_station_catalog().get("rees"), id="1234567")
+    model = DatedModel(end_time=5.0)
+    observations = metric_tests.get_observation_data(model, "discharge", station)
+    assert list(observations.index.strftime("%m-%d")) == ["01-02", "01-03", "01-04", "01-05", "01-06"]
+    assert np.array_equal(observations["GRDC"], [np.nan, 812.0, 796.0, np.nan, np.nan], equal_nan=True)
+    (output, observed) = metric_tests.compare_with_observations(model, "discharge", station, "aligned")
+    expected = metric_tests.get_output(model, "discharge", station)[1:3]
+    assert np.array_equal(output, expected)
+    assert list(observed["GRDC"]) == [812.0, 796.0]
+    (spec,) = queue.drain()
+    assert spec.path.endswith("aligned.png")
@@ -196,3 +196,25 @@ def validate_decorator():
     assert test_bank1 is test_bank2
     assert test_bank1.name == ExampleClass.__name__
     assert test_bank1.tests == [test1, test2, test3]
+
+def validate_loader():
+    """
+    tests if the tests of the loader are added the first time the tests are read, once
+    """
+    calls = []
+
+    def loader():
+        calls.append(None)
+        return [Test(name="B")]
+
+    test1 = Test(name="A")
+
+    class ExampleClass:
+        attr1 = test1
+
+    test_bank = TestBank(timeout=5, loader=loader)(ExampleClass)
+    assert not calls
+    assert [test.name for test in test_bank.tests] == ["A", "B"]
+    assert [test.name for test in test_bank.tests] == ["A", "B"]
+    assert len(calls) == 1
+    assert test_bank.tests[1].timeout == 5
@@ -1,14 +1,26 @@
 """
 A module that has tests that test the test suite class
 """
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 
 from ewatercycle_model_testing import constants as c
-from ewatercycle_model_testing.test import Test
+from ewatercycle_model_testing import killable_worker, render_queue, scenarios_util, test_suite
+from ewatercycle_model_testing.killable_worker import WorkerStoppedException
+from ewatercycle_model_testing.run_model_util import RunModelUtil
+from ewatercycle_model_testing.shared_trajectory import SharedTrajectory
+from ewatercycle_model_testing.spin_up import SpinUpCache
+from ewatercycle_model_testing.test import ModelAccess, Test
 from ewatercycle_model_testing.test_bank import TestBank
 from ewatercycle_model_testing.test_result import TestResult
 from ewatercycle_model_testing.test_suite import TestSuite
 
+from .validate_model_snapshot import StateBmi
+
 
 def example_test() -> TestResult:
     """
@@ -56,6 +68,16 @@ def validate_get_test():
     assert test_suite.get_test("B") is None
     assert test_suite.get_test("C") is None
 
+def validate_lazily_added_tests_are_listed():
+    """
+    tests if the tests a test bank adds lazily are listed once the suite lists its tests
+    """
+    TestBank(name="Lazy", loader=lambda: [Test(name="A", run=example_test)])
+    test_suite = TestSuite()
+    assert "A" not in Test.boundInstances
+    assert "A" in test_suite.tests
+    assert test_suite.get_test("A") is not None
+
 def validate_get_test_bank():
     """
     tests get_test_bank() method
@@ -125,3 +147,444 @@ def validate_disable_all():
     assert not test2.enabled
     assert not test3.enabled
     assert not test4.enabled
+
+def validate_prepare_scenarios(monkeypatch):
+    """
+    tests if prepare_scenarios builds the forcing of every scenario test
+    """
+    monkeypatch.setattr(scenarios_util, "get_correct_forcing_lumped", lambda name: "lumped " + name)
+    monkeypatch.setattr(scenarios_util, "get_correct_forcing_distributed", lambda name: "distributed " + name)
+    tests = [Test(name="zero_precipitation"), Test(name="mid_spike")]
+    for executor in ("threads", "serial"):
+        forcings = TestSuite.prepare_scenarios(tests, "Lumped", executor, max_workers=2)
+        assert forcings == {"zero_precipitation": "lumped zero_precipitation",
+                            "mid_spike": "lumped mid_spike"}
+    forcings = TestSuite.prepare_scenarios(tests, "Distributed")
+    assert forcings["mid_spike"] == "distributed mid_spike"
+
+def validate_prepare_scenarios_shares_forcing_per_spec(monkeypatch):
+    """
+    tests if tests that reference the same scenario spec share a single forcing
+    """
+    built = []
+
+    def get_scenario_forcing(spec, model_type):
+        built.append(spec.name)
+        return object()
+
+    monkeypatch.setattr(scenarios_util, "get_scenario_forcing", get_scenario_forcing)
+    tests = [Test(name="A", scenario=scenarios_util.SCENARIOS["zeroes"]),
+             Test(name="B", scenario=scenarios_util.SCENARIOS["zeroes"]),
+             Test(name="C", scenario=scenarios_util.SCENARIOS["mid_spike"])]
+    forcings = TestSuite.prepare_scenarios(tests, "Lumped")
+    assert forcings["A"] is forcings["B"]
+    assert forcings["A"] is not forcings["C"]
+    assert sorted(built) == ["mid_spike", "zeroes"]
+
+
+class CountingModel:
+    """
+    model mock that counts how often models are initialized
+    """
+    initialized = []
+
+    def setup(self, **_):
+        """
+        mocks the setup of a model
+        """
+        return "cfg", "dir"
+
+    def initialize(self, _):
+        """
+        mocks the initialization of a model
+        """
+        self.initialized.append(self)
+
+    def finalize(self):
+        """
+        mocks the finalization of a model
+        """
+
+
+@pytest.fixture(name="counting")
+def counting_fixture(monkeypatch):
+    """
+    fixture that makes the test suite create counting models on a small forcing
+    """
+    CountingModel.initialized = []
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: CountingModel()))
+    monkeypatch.setattr(RunModelUtil, "get_lumped_forcing", lambda *_: SimpleNamespace(end_time="2001"))
+    return CountingModel.initialized
+
+def read_only_tests(models, count):
+    """
+    makes read-only tests that store the model they ran on
+    """
+    def run(model, _):
+        models.append(model)
+        return TestResult(True)
+    return [Test(name=f"read_only_{index}", access=ModelAccess.READ_ONLY, run=run)
+            for index in range(count)]
+
+def validate_read_only_tests_share_a_warm_model(counting):
+    """
+    tests if read-only tests run on one initialized model and others on their own
+    """
+    models = []
+    TestBank(name="bank")(SimpleNamespace(**{test.name: test for test in read_only_tests(models, 3)},
+                                          isolated=Test(name="isolated", run=lambda *_: TestResult(True))))
+    result = TestSuite().run_all("m", "Lumped", "q", executor="serial")
+    assert result["read_only_0"]["passed"] and result["isolated"]["passed"]
+    assert len(counting) == 2
+    assert len(set(map(id, models))) == 1
+    TestSuite().run_all("m", "Lumped", "q", executor="serial", read_only_pool=2)
+    assert len(counting) == 5
+    TestSuite().run_all("m", "Lumped", "q", executor="serial", read_only_pool=0)
+    assert len(counting) == 9
+
+def validate_render_errors_are_logged(counting, monkeypatch, tmp_path, caplog):
+    """
+    tests if run_all logs the hydrographs that could not be rendered
+    """
+    monkeypatch.setattr(render_queue, "_default_queue", render_queue.RenderQueue(executor="serial"))
+    monkeypatch.setattr(render_queue, "render", lambda specs: {spec.path: "no axes" for spec in specs})
+
+    def plot(*_):
+        render_queue.get_render_queue().submit(render_queue.PlotSpec(str(tmp_path / "broken.png")))
+        return TestResult(True)
+    TestBank(name="bank")(SimpleNamespace(plot=Test(name="plot", run=plot)))
+    result = TestSuite().run_all("m", "Lumped", "q", executor="serial")
+    assert result["plot"]["passed"]
+    assert any(str(tmp_path / "broken.png") in record.message for record in caplog.records)
+
+def validate_read_only_test_that_raises_gets_model_replaced(counting):
+    """
+    tests if a read-only test that raised fails and the tests after it get a new model
+    """
+    models = []
+    tests = read_only_tests(models, 2)
+
+    def broken(model, _):
+        models.append(model)
+        raise ValueError("broke the model")
+    tests.insert(1, Test(name="broken", access=ModelAccess.READ_ONLY, run=broken))
+    (result, _) = TestSuite().run_group(ModelAccess.READ_ONLY, "m", SimpleNamespace(end_time="2001"), None, "q",
+                                        [test.name for test in tests], {})
+    assert list(result) == ["read_only_0", "broken", "read_only_1"]
+    assert not result["broken"]["passed"]
+    assert len(counting) == 2
+    assert models[0] is models[1] and models[1] is not models[2]
+
+
+def validate_raising_critical_read_only_test_fails_the_suite(counting):
+    """
+    tests if a critical read-only test that raises is reported and fails the suite
+    """
+    def broken(*_):
+        raise ValueError("broke the model")
+    TestBank(name="bank")(SimpleNamespace(
+        broken=Test(name="broken", critical=True, access=ModelAccess.READ_ONLY, run=broken),
+        fine=Test(name="fine", critical=True, access=ModelAccess.READ_ONLY, run=lambda *_: TestResult(True))))
+    result = TestSuite().run_all("m", "Lumped", "q", executor="serial")
+    assert not result["broken"]["passed"]
+    assert result["broken"]["reason"] == c.UNIT_ERROR_MESSAGE.format("broke the model")
+    assert result["fine"]["passed"]
+    assert not result[c.SUITE_PASSED_ATTRIBUTE]
+
+class SnapshotModel(CountingModel):
+    """
+    counting model mock whose state can be captured and restored through its bmi
+    """
+
+    def __init__(self):
+        self.bmi = StateBmi()
+
+
+def validate_isolated_tests_reuse_a_restored_model(counting, monkeypatch):
+    """
+    tests if isolated tests start from a snapshot instead of a new initialization,
+    unless a test changed the model in a way the snapshot cannot restore
+    """
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: SnapshotModel()))
+    seen = []
+
+    def change(model, _):
+        seen.append((model, model.bmi.get_value("precipitation")[0]))
+        model.bmi.set_value("precipitation", np.array([9.0, 9.0]))
+        return TestResult(True)
+
+    def advance(model, _):
+        seen.append((model, model.bmi.get_value("precipitation")[0]))
+        model.bmi.update()
+        return TestResult(True)
+    tests = [Test(name="change_0", run=change), Test(name="change_1", run=change),
+             Test(name="advance", run=advance), Test(name="change_2", run=change)]
+    (result, _) = TestSuite().run_group(ModelAccess.ISOLATED, "m", SimpleNamespace(end_time="2001"), None, "q",
+                                        [test.name for test in tests], {})
+    assert len(result) == 4
+    assert len(counting) == 2
+    assert [value for (_, value) in seen] == [1.0, 1.0, 1.0, 1.0]
+    assert seen[0][0] is seen[2][0] and seen[2][0] is not seen[3][0]
+
+
+
+class FinalizingModel(SnapshotModel):
+    """
+    snapshot model mock that remembers if it was finalized, which a snapshot cannot see
+    """
+    finalized = False
+
+    def finalize(self):
+        """
+        mocks the finalization of a model
+        """
+        self.finalized = True
+
+
+def validate_model_is_not_reused_after_a_finalize_test(counting, monkeypatch):
+    """
+    tests if an isolated test after a test that finalizes its model gets a new model
+    """
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: FinalizingModel()))
+
+    def finalize(model, _):
+        model.finalize()
+        return TestResult(True)
+
+    def time(model, _):
+        return TestResult(not model.finalized, "error occurred")
+    tests = [Test(name="finalize", run=finalize, fresh_instance=True), Test(name="time", run=time)]
+    (result, _) = TestSuite().run_group(ModelAccess.ISOLATED, "m", SimpleNamespace(end_time="2001"), None, "q",
+                                        [test.name for test in tests], {})
+    assert result["finalize"]["passed"] and result["time"]["passed"]
+    assert len(counting) == 2
+
+
+def validate_raising_isolated_test_is_reported(counting, monkeypatch):
+    """
+    tests if an isolated test that raises fails and the test after it gets a new model
+    """
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: SnapshotModel()))
+
+    def broken(*_):
+        raise ValueError("broke the model")
+    tests = [Test(name="broken", critical=True, run=broken), Test(name="fine", run=lambda *_: TestResult(True))]
+    (result, test_results) = TestSuite().run_group(ModelAccess.ISOLATED, "m", SimpleNamespace(end_time="2001"),
+                                                   None, "q", [test.name for test in tests], {})
+    assert result["broken"]["reason"] == c.UNIT_ERROR_MESSAGE.format("broke the model")
+    assert not test_results["broken"].passed
+    assert result["fine"]["passed"]
+    assert len(counting) == 2
+
+@pytest.mark.parametrize("access", [ModelAccess.ISOLATED, ModelAccess.SHARED_TRAJECTORY])
+def validate_stopped_test_finalizes_its_model(counting, monkeypatch, access):
+    """
+    tests if the model of a test that is stopped is still finalized
+    """
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: FinalizingModel()))
+
+    def stop(*_):
+        raise WorkerStoppedException()
+    monkeypatch.setattr(SharedTrajectory, "run", stop)
+    Test(name="stopped", access=access, run=stop)
+    with pytest.raises(WorkerStoppedException):
+        TestSuite().run_group(access, "m", SimpleNamespace(end_time="2001"), None, "q", ["stopped"], {})
+    assert [model.finalized for model in counting] == [True]
+
+def validate_fresh_instance_tests_are_units_of_their_own():
+    """
+    tests if tests that initialize or finalize their model never share a unit of work
+    """
+    forcing = SimpleNamespace(end_time="2001")
+    tests = [Test(name="time", critical=True), Test(name="finalize", critical=True, fresh_instance=True),
+             Test(name="read_only", critical=True, access=ModelAccess.READ_ONLY, fresh_instance=True)]
+    work = TestSuite().plan_work([(test, forcing) for test in tests])
+    assert sorted(names for (_, _, names) in work) == [["finalize"], ["read_only"], ["time"]]
+    assert all(access == ModelAccess.ISOLATED for (access, _, _) in work)
+
+class SpinUpSuiteModel(SnapshotModel):
+    """
+    snapshot model mock that can be stepped to an end time
+    """
+    end_time = 10.0
+
+    @property
+    def time(self):
+        """
+        returns the time of the bmi
+        """
+        return self.bmi.time
+
+    def update(self):
+        """
+        advances the model by one time step
+        """
+        self.bmi.update()
+
+
+def validate_spin_up_tests_start_from_cached_state(counting, monkeypatch, tmp_path):
+    """
+    tests if tests with spin_up start from the spun up state at the start time, if the
+    spin-up runs only once, and if tests without spin_up start cold
+    """
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(lambda *_: SpinUpSuiteModel()))
+    monkeypatch.setattr(test_suite, "get_spin_up_cache", lambda: SpinUpCache(tmp_path))
+    seen = []
+
+    def observe(model, _):
+        seen.append((model.time, model.bmi.get_value("storage")[0]))
+        return TestResult(True)
+    Test(name="warm_0", spin_up=True, run=observe)
+    Test(name="warm_1", spin_up=True, run=observe)
+    Test(name="cold", run=observe)
+    forcing = SimpleNamespace(end_time="2001")
+    TestSuite().run_group(ModelAccess.ISOLATED, "m", forcing, None, "q", ["warm_0"], {}, 3)
+    assert len(counting) == 2
+    TestSuite().run_group(ModelAccess.ISOLATED, "m", forcing, None, "q", ["warm_1"], {}, 3)
+    assert len(counting) == 3
+    TestSuite().run_group(ModelAccess.ISOLATED, "m", forcing, None, "q", ["warm_1", "cold"], {}, 3)
+    assert seen == [(0.0, 3.0), (0.0, 3.0), (0.0, 0.0), (0.0, 0.0)]
+
+
+def validate_failed_spin_up_is_logged_once(counting, monkeypatch, tmp_path, caplog):
+    """
+    tests if tests with spin_up start cold when the model cannot be spun up, and if the
+    error is logged and the spin-up is not tried again for the next unit
+    """
+    monkeypatch.setattr(test_suite, "get_spin_up_cache", lambda cache=SpinUpCache(tmp_path): cache)
+    monkeypatch.setattr(test_suite, "spin_up", lambda *_: 1 / 0)
+    Test(name="warm_0", spin_up=True, run=lambda *_: TestResult(True))
+    Test(name="warm_1", spin_up=True, run=lambda *_: TestResult(True))
+    forcing = SimpleNamespace(end_time="2001")
+    for name in ("warm_0", "warm_1"):
+        (result, _) = TestSuite().run_group(ModelAccess.ISOLATED, "m", forcing, None, "q", [name], {}, 3)
+        assert result[name]["passed"]
+    assert len(counting) == 3
+    assert len([record for record in caplog.records if "Could not spin up m" in record.message]) == 1
+
+
+def validate_critical_and_cheap_work_starts_first():
+    """
+    tests if units with critical tests start first, then the cheapest units
+    """
+    forcing = SimpleNamespace(end_time="2001")
+    tests = [Test(name="metric", access=ModelAccess.SHARED_TRAJECTORY, spin_up=True),
+             Test(name="isolated"),
+             Test(name="read_only", access=ModelAccess.READ_ONLY),
+             Test(name="critical", critical=True),
+             Test(name="critical_read_only", critical=True, access=ModelAccess.READ_ONLY)]
+    work = TestSuite().plan_work([(test, forcing) for test in tests])
+    assert [names for (_, _, names) in work] == [["critical_read_only"], ["critical"], ["read_only"],
+                                                 ["isolated"], ["metric"]]
+
+
+def order_tests(ran, critical_passes):
+    """
+    makes a bank with a critical test and two other tests that store their name when they run
+    """
+    def run(model, _):
+        ran.append(model.name)
+        return TestResult(model.name != "critical" or critical_passes)
+    tests = {name: Test(name=name, critical=name == "critical", access=access,
+                        run=lambda model, q, name=name: run(SimpleNamespace(name=name), q))
+             for (name, access) in (("critical", ModelAccess.ISOLATED), ("read_only", ModelAccess.READ_ONLY),
+                                    ("isolated", ModelAccess.ISOLATED))}
+    TestBank(name="bank")(SimpleNamespace(**tests))
+
+
+@pytest.mark.parametrize("executor", ["serial", "threads"])
+def validate_fail_fast_skips_tests_after_critical_failure(counting, executor):
+    """
+    tests if a failed critical test runs first and the other tests are reported as
+    skipped instead of run, unless fail_fast is off
+    """
+    ran = []
+    order_tests(ran, critical_passes=False)
+    result = TestSuite().run_all("m", "Lumped", "q", executor=executor, fail_fast=True)
+    assert ran == ["critical"]
+    assert not result[c.SUITE_PASSED_ATTRIBUTE]
+    assert not result["critical"]["skipped"]
+    assert result["isolated"]["skipped"] and not result["isolated"]["passed"]
+    assert result["read_only"]["reason"] == c.SKIPPED_MESSAGE
+    assert TestSuite().get_test("isolated").test_result is None
+    ran.clear()
+    result = TestSuite().run_all("m", "Lumped", "q", executor=executor)
+    assert ran[0] == "critical" and sorted(ran) == ["critical", "isolated", "read_only"]
+    assert not any(result[name]["skipped"] for name in ran)
+
+
+def validate_fail_fast_cancels_pending_work(counting):
+    """
+    tests if units that have not started when a critical test fails are cancelled
+    """
+    ran = []
+
+    def later(_, __):
+        ran.append(True)
+        time.sleep(0.05)
+        return TestResult(True)
+    Test(name="critical", critical=True, run=lambda *_: TestResult(False))
+    for index in range(4):
+        Test(name=f"later_{index}", critical=True, run=later)
+    TestBank(name="bank")(SimpleNamespace(**Test.boundInstances))
+    result = TestSuite().run_all("m", "Lumped", "q", executor="threads", max_workers=1, isolated_pool=0,
+                                 fail_fast=True)
+    assert result["critical"]["passed"] is False
+    assert len(ran) <= 1
+    assert sum(result[f"later_{index}"]["skipped"] for index in range(4)) == 4 - len(ran)
+
+
+def validate_tests_that_time_out_are_stopped(counting, monkeypatch, tmp_path):
+    """
+    tests if a hanging test is stopped at the timeout of its bank with a timeout
+    result, while the tests before and after it on the same model get their own
+    results, and if the cfg directories of the stopped worker are removed
+    """
+    monkeypatch.chdir(tmp_path)
+    # The tests and model mocks of this test only exist in this process.
+    monkeypatch.setattr(killable_worker, "START_METHOD", "fork")
+
+    def hang(_, __):
+        os.makedirs(f"thread_{os.getpid()}_left_behind")
+        time.sleep(60)
+    TestBank(name="bank", timeout=0.5)(SimpleNamespace(
+        fast=Test(name="fast", run=lambda *_: TestResult(True)),
+        hanging=Test(name="hanging", run=hang),
+        later=Test(name="later", run=lambda *_: TestResult(True)),
+        patient=Test(name="patient", timeout=30, run=lambda *_: TestResult(True))))
+    assert TestSuite().get_test("patient").timeout == 30
+    start = time.monotonic()
+    result = TestSuite().run_all("m", "Lumped", "q", executor="serial", isolated_pool=1)
+    assert time.monotonic() - start < 10
+    assert result["fast"]["passed"] and result["later"]["passed"] and result["patient"]["passed"]
+    assert not result["hanging"]["passed"]
+    assert result["hanging"]["reason"] == c.TIMEOUT_MESSAGE.format(0.5)
+    assert TestSuite().get_test("hanging").test_result == TestResult(False, c.TIMEOUT_MESSAGE.format(0.5))
+    assert not os.listdir(tmp_path)
+
+
+def validate_spawned_worker_runs_package_tests(monkeypatch, tmp_path):
+    """
+    tests if a worker started with spawn finds a test of the package on its own and
+    starts its model, whose mock rejects the cfg of the test suite
+    """
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError, match="Invalid config"):
+        TestSuite().run_group_with_timeout(60, ModelAccess.READ_ONLY, "basicbmimock", SimpleNamespace(end_time="2001"),
+                                           None, "q", ["correct_start_time"], {})
+
+def validate_tests_of_a_failed_unit_are_reported(counting, monkeypatch):
+    """
+    tests if every test of a unit of work whose model cannot be started is reported
+    as failed instead of missing from the result
+    """
+    def broken(*_):
+        raise RuntimeError("no container")
+    monkeypatch.setattr(TestSuite, "make_model_instance", staticmethod(broken))
+    TestBank(name="bank")(SimpleNamespace(**{test.name: test for test in read_only_tests([], 2)},
+                                          critical=Test(name="critical", critical=True, run=lambda *_: TestResult(True))))
+    result = TestSuite().run_all("m", "Lumped", "q", executor="serial")
+    assert not result[c.SUITE_PASSED_ATTRIBUTE]
+    for name in ("read_only_0", "read_only_1", "critical"):
+        assert not result[name]["passed"]
+        assert result[name]["reason"] == c.UNIT_ERROR_MESSAGE.format("no container")